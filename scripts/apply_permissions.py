@@ -1,9 +1,24 @@
-import boto3
 import yaml
 import os
 import sys
 import logging
 
+from plano_sql import (
+    compilar_concessoes_postgres,
+    compilar_concessoes_mysql,
+    expandir_permissoes_postgres,
+    expandir_permissoes_mysql,
+    executar_instrucoes,
+    descrever_plano,
+    emitir_plano,
+)
+from catalogo import ler_privilegios_postgres, ler_privilegios_mysql, ler_relacoes_postgres
+from credenciais import obter_credenciais
+from drivers import DriverSincrono
+from execucao import PoliticaExecucao, contar_idas_e_voltas
+from medicao import MEDIDOR, finalizar
+from yaml_io import safe_load
+
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -87,6 +102,7 @@ def conectar_mysql(host, port, user, password, database):
     """Conecta ao MySQL com tratamento de erro."""
     try:
         import pymysql
+        from pymysql.constants import CLIENT
         return pymysql.connect(
             host=host,
             port=port,
@@ -94,144 +110,272 @@ def conectar_mysql(host, port, user, password, database):
             password=password,
             database=database,
             ssl={"ssl": {}},
-            connect_timeout=30
+            connect_timeout=30,
+            # Necessário para enviar o plano de GRANTs em uma única ida e volta
+            client_flag=CLIENT.MULTI_STATEMENTS
         )
     except Exception as e:
         logger.error(f"Erro ao conectar MySQL: {e}")
         raise
 
-def aplicar_permissoes_postgres_granular(conn, username, schema_nome, tabelas):
-    """Aplica permissões PostgreSQL granulares (por tabela)."""
-    with conn.cursor() as cur:
-        # Aplicar USAGE no schema automaticamente para permissões granulares
-        cur.execute(f'GRANT USAGE ON SCHEMA {schema_nome} TO "{username}";')
-        logger.info(f"Aplicada permissão USAGE no schema {schema_nome}")
-        
-        for tabela in tabelas:
-            nome_tabela = tabela["nome"]
-            logger.info(f"Processando tabela: {schema_nome}.{nome_tabela}")
-            
-            for permissao in tabela["permissions"]:
-                permissao_upper = permissao.upper()
-                
-                if permissao_upper in ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]:
-                    cur.execute(f'GRANT {permissao_upper} ON {schema_nome}.{nome_tabela} TO "{username}";')
-                elif permissao_upper == "ALL PRIVILEGES":
-                    cur.execute(f'GRANT ALL PRIVILEGES ON {schema_nome}.{nome_tabela} TO "{username}";')
-                else:
-                    # Para permissões que não se aplicam a tabelas específicas, aplicar no schema
-                    if permissao_upper == "EXECUTE":
-                        cur.execute(f'GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} TO "{username}";')
-                    elif permissao_upper in ["USAGE", "CREATE"]:
-                        cur.execute(f'GRANT {permissao_upper} ON SCHEMA {schema_nome} TO "{username}";')
-                    elif permissao_upper == "TEMP":
-                        cur.execute(f'GRANT TEMP ON DATABASE {conn.info.dbname} TO "{username}";')
-                    elif permissao_upper == "CONNECT":
-                        cur.execute(f'GRANT CONNECT ON DATABASE {conn.info.dbname} TO "{username}";')
-                
-                logger.info(f"Aplicada permissão {permissao_upper} na tabela {schema_nome}.{nome_tabela}")
+# Driver padrão dos scripts: as funções de conexão acima (bloqueantes)
+DRIVER = DriverSincrono(conectar_postgres, conectar_mysql)
 
-def aplicar_permissoes_postgres_simples(conn, username, schema_nome, permissions):
-    """Aplica permissões PostgreSQL simples (schema completo)."""
-    with conn.cursor() as cur:
-        for permissao in permissions:
-            permissao_upper = permissao.upper()
-            
-            if permissao_upper in ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]:
-                cur.execute(f'GRANT {permissao_upper} ON ALL TABLES IN SCHEMA {schema_nome} TO "{username}";')
-            elif permissao_upper == "EXECUTE":
-                cur.execute(f'GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} TO "{username}";')
-            elif permissao_upper in ["USAGE", "CREATE"]:
-                cur.execute(f'GRANT {permissao_upper} ON SCHEMA {schema_nome} TO "{username}";')
-            elif permissao_upper == "TEMP":
-                cur.execute(f'GRANT TEMP ON DATABASE {conn.info.dbname} TO "{username}";')
-            elif permissao_upper == "CONNECT":
-                cur.execute(f'GRANT CONNECT ON DATABASE {conn.info.dbname} TO "{username}";')
-            elif permissao_upper == "ALL PRIVILEGES":
-                cur.execute(f'GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA {schema_nome} TO "{username}";')
-            
-            logger.info(f"Aplicada permissão {permissao_upper} no schema {schema_nome}")
+def registrar_plano(instrucoes):
+    """Registra no log as instruções do plano compilado."""
+    for instrucao in instrucoes:
+        if instrucao.get("otimizacao"):
+            logger.info(f"  → {instrucao['sql']}  [otimização: {instrucao['otimizacao']}]")
+        else:
+            logger.info(f"  → {instrucao['sql']}")
+
+def contar_ignoradas(instrucoes, instrucoes_completas):
+    """Conta e registra as instruções que o modo diff deixou de emitir."""
+    ignoradas = max(0, len(instrucoes_completas) - len(instrucoes))
+    logger.info(f"Modo diff: {ignoradas} instrução(ões) ignorada(s) por já estarem em vigor no banco")
+    return ignoradas
+
+def compilar_permissoes_postgres(username, schemas, dbname, catalogo=None, relacoes=None):
+    """Compila e registra no log o plano PostgreSQL; retorna (instrucoes, ignoradas).
+
+    Com as relações existentes nos schemas (relacoes) os schemas granulares
+    que cobrem todas as tabelas viram ALL TABLES IN SCHEMA. Com o catálogo
+    atual do role (modo diff) apenas os GRANTs ausentes são emitidos.
+    """
+    logger.info(f"Criando/verificando usuário: {username}")
+    for schema in schemas:
+        logger.info(f"Processando schema: {schema['nome']}")
+
+    instrucoes = compilar_concessoes_postgres(username, schemas, dbname, catalogo, relacoes)
+    ignoradas = 0
+    if catalogo is not None:
+        relacoes_completas = relacoes if relacoes is not None else catalogo["relacoes"]
+        ignoradas = contar_ignoradas(instrucoes, compilar_concessoes_postgres(
+            username, schemas, dbname, relacoes=relacoes_completas))
+    logger.info(f"Plano compilado com {len(instrucoes)} instrução(ões):")
+    registrar_plano(instrucoes)
+    return instrucoes, ignoradas
+
+def compilar_permissoes_mysql(username, database, schemas, catalogo=None):
+    """Compila e registra no log o plano MySQL; retorna (instrucoes, ignoradas).
+
+    Com o catálogo atual do usuário (modo diff) apenas os GRANTs ausentes
+    são emitidos.
+    """
+    logger.info(f"Criando/verificando usuário: {username}")
+    for schema in schemas:
+        logger.info(f"Processando schema: {schema['nome']}")
+
+    instrucoes = compilar_concessoes_mysql(username, database, schemas, catalogo)
+    ignoradas = 0
+    if catalogo is not None:
+        ignoradas = contar_ignoradas(instrucoes, compilar_concessoes_mysql(username, database, schemas))
+    logger.info(f"Plano compilado com {len(instrucoes)} instrução(ões):")
+    registrar_plano(instrucoes)
+    return instrucoes, ignoradas
+
+def aplicar_permissoes_postgres(conn, username, schemas, catalogo=None, relacoes=None):
+    """Aplica permissões PostgreSQL (suporta formato granular e simples).
 
-def aplicar_permissoes_postgres(conn, username, schemas):
-    """Aplica permissões PostgreSQL (suporta formato granular e simples)."""
+    O plano (criação do role + GRANTs agrupados) é enviado em lotes com
+    SAVEPOINT e lock_timeout (lock ocupado repete só o lote) e confirmado em
+    uma única transação. Retorna o número de instruções ignoradas pelo modo
+    diff.
+    """
     try:
-        with conn.cursor() as cur:
-            # Criar usuário se não existir
-            logger.info(f"Criando/verificando usuário: {username}")
-            cur.execute(f"DO $$ BEGIN IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = '{username}') THEN CREATE ROLE \"{username}\" WITH LOGIN; END IF; END $$;")
-            
-            for schema in schemas:
-                schema_nome = schema['nome']
-                logger.info(f"Processando schema: {schema_nome}")
-                
-                # Verificar se é granular ou simples
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    aplicar_permissoes_postgres_granular(conn, username, schema_nome, schema["tabelas"])
-                else:
-                    aplicar_permissoes_postgres_simples(conn, username, schema_nome, schema["permissions"])
-            
-            conn.commit()
-            logger.info("Transação commitada com sucesso")
+        instrucoes, ignoradas = compilar_permissoes_postgres(username, schemas, conn.info.dbname, catalogo, relacoes)
+
+        executar_instrucoes(conn, instrucoes, "postgres")
+
+        conn.commit()
+        logger.info("Transação commitada com sucesso")
+        return ignoradas
             
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro ao aplicar permissões PostgreSQL: {e}")
         raise
 
-def aplicar_permissoes_mysql_granular(conn, username, database, schema_nome, tabelas):
-    """Aplica permissões MySQL granulares (por tabela)."""
-    with conn.cursor() as cur:
-        for tabela in tabelas:
-            nome_tabela = tabela["nome"]
-            logger.info(f"Processando tabela: {database}.{nome_tabela}")
-            
-            for permissao in tabela["permissions"]:
-                cur.execute(f'GRANT {permissao.upper()} ON `{database}`.`{nome_tabela}` TO \'{username}\'@\'%\';')
-                logger.info(f"Aplicada permissão {permissao.upper()} na tabela {database}.{nome_tabela}")
-
-def aplicar_permissoes_mysql_simples(conn, username, database, schema_nome, permissions):
-    """Aplica permissões MySQL simples (schema completo)."""
-    with conn.cursor() as cur:
-        for permissao in permissions:
-            cur.execute(f'GRANT {permissao.upper()} ON `{database}`.`{schema_nome}` TO \'{username}\'@\'%\';')
-            logger.info(f"Aplicada permissão {permissao.upper()} no schema {schema_nome}")
-
-def aplicar_permissoes_mysql(conn, username, database, schemas):
-    """Aplica permissões MySQL (suporta formato granular e simples)."""
+def aplicar_permissoes_mysql(conn, username, database, schemas, catalogo=None):
+    """Aplica permissões MySQL (suporta formato granular e simples).
+
+    O plano (criação do usuário + GRANTs agrupados por tabela) é enviado em
+    uma única ida e volta, com lock_wait_timeout (lock ocupado retoma da
+    instrução que falhou). Retorna o número de instruções ignoradas pelo
+    modo diff.
+    """
     try:
-        with conn.cursor() as cur:
-            # Criar usuário se não existir
-            logger.info(f"Criando/verificando usuário: {username}")
-            cur.execute(f"CREATE USER IF NOT EXISTS '{username}'@'%' IDENTIFIED VIA AWSAuthenticationPlugin AS 'RDS';")
-            
-            for schema in schemas:
-                schema_nome = schema['nome']
-                logger.info(f"Processando schema: {schema_nome}")
-                
-                # Verificar se é granular ou simples
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    aplicar_permissoes_mysql_granular(conn, username, database, schema_nome, schema["tabelas"])
-                else:
-                    aplicar_permissoes_mysql_simples(conn, username, database, schema_nome, schema["permissions"])
-            
-            conn.commit()
-            logger.info("Transação commitada com sucesso")
+        instrucoes, ignoradas = compilar_permissoes_mysql(username, database, schemas, catalogo)
+
+        executar_instrucoes(conn, instrucoes, "mysql")
+
+        conn.commit()
+        logger.info("Transação commitada com sucesso")
+        return ignoradas
             
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro ao aplicar permissões MySQL: {e}")
         raise
 
-def aplicar_permissoes(caminho_yaml):
-    """Função principal para aplicar permissões."""
+def carregar_dados(caminho_yaml):
+    """Carrega e valida um arquivo YAML de permissões."""
+    with open(caminho_yaml, 'r', encoding='utf-8') as arquivo:
+        dados = safe_load(arquivo)
+
+    validar_yaml(dados)
+    return dados
+
+def obter_porta(dados):
+    """Retorna a porta do banco, usando o padrão do engine quando ausente."""
+    engine = dados["engine"].lower()
+    return int(dados.get("port", 5432 if "postgres" in engine else 3306))
+
+def conectar(engine, host, port, user, password, dbname):
+    """Abre conexão com o banco de acordo com o engine (com o tempo de conexão e das instruções medido)."""
+    return DRIVER.conectar(engine, host, port, user, password, dbname)
+
+def ler_catalogos(conn, lista_dados):
+    """Lê em uma consulta o catálogo atual dos usuários de arquivos do mesmo banco.
+
+    Em caso de falha o modo diff é desativado (retorna None) e todas as
+    permissões são reaplicadas.
+    """
+    engine = lista_dados[0]["engine"].lower()
+    usernames = [dados["user"] for dados in lista_dados]
+    try:
+        if "postgres" in engine:
+            schemas = [schema["nome"] for dados in lista_dados for schema in dados["schemas"]]
+            return ler_privilegios_postgres(conn, usernames, schemas)
+        return ler_privilegios_mysql(conn, usernames, lista_dados[0]["database"])
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Não foi possível ler o catálogo, aplicando todas as permissões: {e}")
+        return None
+
+def ler_relacoes(conn, lista_dados):
+    """Lê em uma consulta as relações dos schemas granulares de arquivos do mesmo banco.
+
+    Usadas para comprimir GRANTs por tabela em ALL TABLES IN SCHEMA; só o
+    PostgreSQL é comprimido. Retorna None (sem compressão) quando não há
+    schemas granulares ou a leitura falha.
+    """
+    if "postgres" not in lista_dados[0]["engine"].lower():
+        return None
+    schemas = [
+        schema["nome"] for dados in lista_dados for schema in dados["schemas"]
+        if schema.get("tipo") == "granular"
+    ]
+    if not schemas:
+        return None
+    try:
+        return ler_relacoes_postgres(conn, schemas)
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Não foi possível ler as relações dos schemas, mantendo GRANTs por tabela: {e}")
+        return None
+
+def compilar_dados(dados, catalogo=None, relacoes=None):
+    """Compila o plano de um YAML já carregado; retorna (instrucoes, ignoradas)."""
+    engine = dados["engine"].lower()
+    if "postgres" in engine:
+        return compilar_permissoes_postgres(dados["user"], dados["schemas"], dados["database"], catalogo, relacoes)
+    elif "mysql" in engine:
+        return compilar_permissoes_mysql(dados["user"], dados["database"], dados["schemas"], catalogo)
+    else:
+        raise ValueError(f"Engine não suportado: {engine}")
+
+def aplicar_dados(conn, dados, catalogo=None, relacoes=None):
+    """Aplica as permissões de um YAML já carregado usando uma conexão aberta.
+
+    Retorna o número de instruções ignoradas pelo modo diff.
+    """
+    engine = dados["engine"].lower()
+    if "postgres" in engine:
+        return aplicar_permissoes_postgres(conn, dados["user"], dados["schemas"], catalogo, relacoes)
+    elif "mysql" in engine:
+        return aplicar_permissoes_mysql(conn, dados["user"], dados["database"], dados["schemas"], catalogo)
+    else:
+        raise ValueError(f"Engine não suportado: {engine}")
+
+def registrar_resumo(dados):
+    """Registra no log o resumo das permissões aplicadas."""
+    target_user = dados["user"]
+    logger.info("="*50)
+    logger.info("PERMISSÕES APLICADAS COM SUCESSO!")
+    logger.info(f"Usuário: {target_user}")
+    logger.info(f"Banco: {dados['database']}")
+    logger.info(f"Engine: {dados['engine'].lower()}")
+    logger.info("Schemas e permissões aplicadas:")
+    for schema in dados["schemas"]:
+        if "tipo" in schema and schema["tipo"] == "granular":
+            logger.info(f"  - Schema: {schema['nome']} (granular)")
+            for tabela in schema["tabelas"]:
+                permissoes = ", ".join([p.upper() for p in tabela["permissions"]])
+                logger.info(f"    └── Tabela: {tabela['nome']} → Permissões: {permissoes}")
+        else:
+            permissoes = ", ".join([p.upper() for p in schema["permissions"]])
+            logger.info(f"  - Schema: {schema['nome']} → Permissões: {permissoes}")
+    logger.info("="*50)
+
+def planejar_permissoes(caminho_yaml, diff=False):
+    """Compila o plano de um arquivo sem conectar ao banco (modo --plan).
+
+    Retorna a descrição do plano (plano_sql.descrever_plano) com as
+    instruções na ordem exata de execução. Sem conexão não há catálogo:
+    no modo diff o plano lista todas as concessões (as já em vigor só são
+    descartadas na execução) e a compressão em ALL TABLES IN SCHEMA não é
+    avaliada.
+    """
+    dados = carregar_dados(caminho_yaml)
+    engine = dados["engine"].lower()
+
+    if "postgres" in engine:
+        instrucoes = compilar_concessoes_postgres(dados["user"], dados["schemas"], dados["database"])
+        concessoes = expandir_permissoes_postgres(dados["schemas"])
+    elif "mysql" in engine:
+        instrucoes = compilar_concessoes_mysql(dados["user"], dados["database"], dados["schemas"])
+        concessoes = expandir_permissoes_mysql(dados["database"], dados["schemas"])
+    else:
+        raise ValueError(f"Engine não suportado: {engine}")
+
+    idas_e_voltas = {}
+    observacoes = []
+    if diff:
+        idas_e_voltas["leitura_catalogo"] = 1
+        observacoes.append("Modo diff: as concessões já em vigor só são conhecidas na execução; o plano lista todas")
+    granulares = any(schema.get("tipo") == "granular" for schema in dados["schemas"])
+    if "postgres" in engine and granulares:
+        if not diff:
+            idas_e_voltas["leitura_relacoes"] = 1
+        observacoes.append("Schemas granulares que cobrem todas as tabelas podem virar ALL TABLES IN SCHEMA na execução (depende das relações do banco)")
+    politica = PoliticaExecucao.do_ambiente()
+    idas_e_voltas["envio_plano"] = contar_idas_e_voltas(len(instrucoes), engine, politica)
+    idas_e_voltas["commit"] = 1
+    observacoes.append(f"Lock ocupado: {politica.descrever()} (idas e voltas extras não incluídas)")
+
+    if "postgres" in engine:
+        envio = f"lotes de até {politica.tamanho_lote} instrução(ões) com SAVEPOINT, commit único ao final"
+    else:
+        envio = "todas as instruções em uma única ida e volta, retomando da instrução que falhar"
+    agrupamento = {
+        "concessoes_atomicas": len(concessoes),
+        "instrucoes": len(instrucoes),
+        "envio": envio
+    }
+    return descrever_plano("aplicar", dados, obter_porta(dados), instrucoes, idas_e_voltas, agrupamento, observacoes)
+
+def aplicar_permissoes(caminho_yaml, diff=False):
+    """Função principal para aplicar permissões.
+
+    Com diff=True os privilégios atuais são lidos do catálogo e apenas os
+    GRANTs ausentes são emitidos.
+    """
     try:
         logger.info(f"Iniciando aplicação de permissões: {caminho_yaml}")
         
         # Carregar e validar arquivo YAML
-        with open(caminho_yaml, 'r', encoding='utf-8') as arquivo:
-            dados = yaml.safe_load(arquivo)
-
-        validar_yaml(dados)
+        dados = carregar_dados(caminho_yaml)
 
         # Extrair informações
         engine = dados["engine"].lower()
@@ -239,27 +383,26 @@ def aplicar_permissoes(caminho_yaml):
         password = os.environ.get("DB_PASS")
         host = dados["host"]
         dbname = dados["database"]
-        target_user = dados["user"]
-        schemas = dados["schemas"]
-        port = int(dados.get("port", 5432 if "postgres" in engine else 3306))
+        port = obter_porta(dados)
 
-        # Validar variáveis de ambiente
+        # Sem variáveis de ambiente, buscar no Parameter Store (cache em memória)
         if not user or not password:
-            raise ValueError("Variáveis DB_USER e DB_PASS devem estar definidas")
+            user, password = obter_credenciais(dbname, dados["engine"])
 
         logger.info(f"Configuração: Engine={engine}, Host={host}, Porta={port}, Banco={dbname}")
 
         # Conectar e aplicar permissões
         conn = None
         try:
-            if "postgres" in engine:
-                conn = conectar_postgres(host, port, user, password, dbname)
-                aplicar_permissoes_postgres(conn, target_user, schemas)
-            elif "mysql" in engine:
-                conn = conectar_mysql(host, port, user, password, dbname)
-                aplicar_permissoes_mysql(conn, target_user, dbname, schemas)
-            else:
-                raise ValueError(f"Engine não suportado: {engine}")
+            conn = conectar(engine, host, port, user, password, dbname)
+            catalogo = None
+            relacoes = None
+            if diff:
+                catalogos = ler_catalogos(conn, [dados])
+                catalogo = catalogos[dados["user"]] if catalogos else None
+            if catalogo is None:
+                relacoes = ler_relacoes(conn, [dados])
+            aplicar_dados(conn, dados, catalogo, relacoes)
 
         finally:
             if conn:
@@ -267,22 +410,7 @@ def aplicar_permissoes(caminho_yaml):
                 logger.info("Conexão fechada")
 
         # Relatório final
-        logger.info("="*50)
-        logger.info("PERMISSÕES APLICADAS COM SUCESSO!")
-        logger.info(f"Usuário: {target_user}")
-        logger.info(f"Banco: {dbname}")
-        logger.info(f"Engine: {engine}")
-        logger.info("Schemas e permissões aplicadas:")
-        for schema in schemas:
-            if "tipo" in schema and schema["tipo"] == "granular":
-                logger.info(f"  - Schema: {schema['nome']} (granular)")
-                for tabela in schema["tabelas"]:
-                    permissoes = ", ".join([p.upper() for p in tabela["permissions"]])
-                    logger.info(f"    └── Tabela: {tabela['nome']} → Permissões: {permissoes}")
-            else:
-                permissoes = ", ".join([p.upper() for p in schema["permissions"]])
-                logger.info(f"  - Schema: {schema['nome']} → Permissões: {permissoes}")
-        logger.info("="*50)
+        registrar_resumo(dados)
 
     except FileNotFoundError:
         logger.error(f"Arquivo não encontrado: {caminho_yaml}")
@@ -298,8 +426,21 @@ def aplicar_permissoes(caminho_yaml):
         sys.exit(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Uso: python apply_permissions.py <caminho_arquivo.yml>")
+    argumentos = [arg for arg in sys.argv[1:] if arg not in ("--diff", "--plan")]
+    if len(argumentos) != 1:
+        print("Uso: python apply_permissions.py [--diff] [--plan] <caminho_arquivo.yml>")
         sys.exit(1)
-    
-    aplicar_permissoes(sys.argv[1])
\ No newline at end of file
+
+    if "--plan" in sys.argv[1:]:
+        # Apenas compila e imprime o plano em JSON, sem conectar ao banco
+        try:
+            emitir_plano(planejar_permissoes(argumentos[0], diff="--diff" in sys.argv[1:]))
+        except (OSError, yaml.YAMLError, ValueError, KeyError) as e:
+            logger.error(f"Erro ao compilar o plano: {e}")
+            sys.exit(1)
+    else:
+        try:
+            with MEDIDOR.contexto(arquivo=argumentos[0]):
+                aplicar_permissoes(argumentos[0], diff="--diff" in sys.argv[1:])
+        finally:
+            finalizar()
\ No newline at end of file
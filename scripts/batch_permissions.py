@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Script de Aplicação em Lote - Database Access Control
+Aplica e revoga permissões de vários arquivos YAML em um único processo,
+reutilizando uma conexão por banco de dados (engine, host, porta, banco) e
+processando hosts diferentes em paralelo
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from apply_permissions import (
+    DRIVER,
+    carregar_dados,
+    obter_porta,
+    ler_catalogos,
+    ler_relacoes,
+    aplicar_dados,
+    registrar_resumo,
+)
+from revoke_permissions import (
+    calcular_permissoes_revogadas,
+    revogar_permissoes_postgres,
+    revogar_permissoes_mysql,
+)
+import revoke_all_permissions
+from reconcile_permissions import mesma_identidade, reconciliar_dados
+from credenciais import obter_provedor
+from drivers import tipo_engine
+from medicao import MEDIDOR, finalizar
+from yaml_io import safe_load
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+OPERACAO_APLICAR = "aplicar"
+OPERACAO_REVOGAR_TUDO = "revogar_tudo"
+
+MAX_WORKERS_PADRAO = 8
+MAX_POR_HOST_PADRAO = 2
+
+def carregar_manifesto(caminho_manifesto, operacao=OPERACAO_APLICAR):
+    """Carrega o manifesto do lote.
+
+    Cada linha contém o caminho do arquivo YAML e, opcionalmente, separado por
+    TAB, o caminho do estado anterior do arquivo (usado para revogar o diff).
+    Linhas vazias e comentários (#) são ignorados.
+    """
+    entradas = []
+    with open(caminho_manifesto, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            linha = linha.rstrip("\r\n")
+            if not linha.strip() or linha.lstrip().startswith("#"):
+                continue
+            partes = linha.split("\t")
+            entradas.append({
+                "arquivo": partes[0].strip(),
+                "antes": partes[1].strip() if len(partes) > 1 and partes[1].strip() else None,
+                "operacao": operacao
+            })
+    return entradas
+
+def criar_resolvedor_credenciais():
+    """Cria a função que resolve as credenciais do owner para (banco, engine).
+
+    Usa o provedor do Parameter Store (lido uma vez, em memória) quando
+    configurado; caso contrário, usa DB_USER e DB_PASS para todos os bancos.
+    """
+    provedor = obter_provedor()
+    if provedor is not None:
+        return provedor.obter
+
+    credencial = os.environ.get("DB_USER")
+    senha = os.environ.get("DB_PASS")
+
+    def resolver(database, engine):
+        if not credencial or not senha:
+            raise ValueError("Variáveis DB_USER e DB_PASS devem estar definidas")
+        return credencial, senha
+
+    return resolver
+
+def chave_banco(dados, porta):
+    """Chave do banco de um arquivo: (engine normalizado, host, porta, banco).
+
+    postgres, postgresql e aurora são o mesmo engine e o host não diferencia
+    maiúsculas, então arquivos do mesmo banco caem sempre no mesmo grupo.
+    """
+    return (engine_conexao(dados["engine"]), str(dados["host"]).lower(), porta, dados["database"])
+
+def agrupar_por_banco(entradas):
+    """Carrega os arquivos do lote e agrupa por banco (chave_banco).
+
+    Retorna os grupos (na ordem em que aparecem no manifesto) e a lista de
+    resultados das entradas que falharam já no carregamento. Dentro de um
+    grupo os arquivos mantêm a ordem das entradas, e cada grupo é processado
+    por um único worker: as revogações totais e aplicações de um mesmo banco
+    nunca rodam ao mesmo tempo.
+    """
+    grupos = {}
+    falhas = []
+
+    for indice, entrada in enumerate(entradas):
+        revogar_tudo = entrada.get("operacao") == OPERACAO_REVOGAR_TUDO
+        try:
+            if revogar_tudo:
+                dados = revoke_all_permissions.carregar_dados(entrada["arquivo"])
+            else:
+                dados = carregar_dados(entrada["arquivo"])
+            dados_antes = None
+            if entrada.get("antes"):
+                with open(entrada["antes"], 'r', encoding='utf-8') as arquivo:
+                    dados_antes = safe_load(arquivo) or {}
+            porta = revoke_all_permissions.obter_porta(dados) if revogar_tudo else obter_porta(dados)
+            chave = chave_banco(dados, porta)
+        except FileNotFoundError as e:
+            falhas.append(criar_resultado(indice, entrada, False, f"Arquivo não encontrado: {e}"))
+            continue
+        except yaml.YAMLError as e:
+            falhas.append(criar_resultado(indice, entrada, False, f"Erro ao processar YAML: {e}"))
+            continue
+        except (ValueError, TypeError, AttributeError) as e:
+            falhas.append(criar_resultado(indice, entrada, False, f"Erro de validação: {e}"))
+            continue
+
+        grupos.setdefault(chave, []).append({
+            "indice": indice,
+            "entrada": entrada,
+            "dados": dados,
+            "dados_antes": dados_antes
+        })
+
+    return grupos, falhas
+
+def criar_resultado(indice, entrada, sucesso, erro=None, ignoradas=0):
+    """Monta o resultado do processamento de um arquivo."""
+    return {
+        "indice": indice,
+        "arquivo": entrada["arquivo"],
+        "operacao": entrada.get("operacao", OPERACAO_APLICAR),
+        "sucesso": sucesso,
+        "erro": erro,
+        "instrucoes_ignoradas": ignoradas
+    }
+
+def revogar_diff(conn, dados_antes, dados):
+    """Revoga as permissões removidas entre o estado anterior e o atual.
+
+    Usado quando o estado anterior é de outro usuário ou banco e, por isso,
+    não pode ser reconciliado. Retorna True quando alguma revogação foi executada.
+    """
+    if not dados_antes or "schemas" not in dados_antes:
+        return False
+
+    revogar_schemas = calcular_permissoes_revogadas(dados_antes["schemas"], dados["schemas"])
+    if not revogar_schemas:
+        logger.info("Nenhuma permissão a ser revogada.")
+        return False
+
+    engine = dados["engine"].lower()
+    if "postgres" in engine:
+        revogar_permissoes_postgres(conn, dados_antes["user"], revogar_schemas)
+    else:
+        revogar_permissoes_mysql(conn, dados_antes["user"], dados_antes["database"], revogar_schemas)
+    return True
+
+def engine_conexao(engine):
+    """Engine da conexão ('postgres' ou 'mysql'); aurora só é aceito pela revogação total, como PostgreSQL."""
+    engine = engine.lower()
+    return tipo_engine("postgres" if engine == "aurora" else engine)
+
+def credenciais_grupo(resolver_credenciais, dbname, itens):
+    """Credenciais do owner para o grupo.
+
+    Tenta os engines dos arquivos na ordem do grupo (ex.: aurora e
+    postgresql no mesmo banco) até um ter credencial cadastrada.
+    """
+    erro = None
+    for engine in dict.fromkeys(item["dados"]["engine"] for item in itens):
+        try:
+            return resolver_credenciais(dbname, engine)
+        except Exception as e:
+            erro = erro or e
+    raise erro
+
+def conectar_grupo(driver, engine, host, port, credencial, senha, dbname):
+    """Abre a conexão do grupo com o driver (síncrono)."""
+    return driver.conectar(engine, host, port, credencial, senha, dbname)
+
+def processar_grupo(chave, itens, resolver_credenciais, diff=False, driver=DRIVER):
+    """Processa, em ordem, todos os arquivos de um mesmo banco usando uma única conexão.
+
+    Arquivos com estado anterior do mesmo usuário e banco são reconciliados
+    (REVOKEs e GRANTs em uma única transação). No modo diff o catálogo dos
+    demais usuários do grupo é lido em uma única consulta; usuários que
+    tiveram permissões revogadas são relidos. As relações dos schemas
+    granulares (para ALL TABLES IN SCHEMA) também são lidas uma vez por grupo.
+    """
+    engine, host, port, dbname = chave
+    resultados = []
+
+    logger.info(f"Configuração: Engine={engine}, Host={host}, Porta={port}, Banco={dbname} ({len(itens)} arquivo(s))")
+
+    conn = None
+    try:
+        credencial, senha = credenciais_grupo(resolver_credenciais, dbname, itens)
+        conn = conectar_grupo(driver, engine, host, port, credencial, senha, dbname)
+    except Exception as e:
+        logger.error(f"Erro ao conectar em {host}/{dbname}: {e}")
+        return [criar_resultado(item["indice"], item["entrada"], False, f"Erro de conexão: {e}") for item in itens]
+
+    try:
+        aplicacoes = [
+            item["dados"] for item in itens
+            if item["entrada"].get("operacao") != OPERACAO_REVOGAR_TUDO
+            and not mesma_identidade(item["dados_antes"], item["dados"])
+        ]
+        catalogos = ler_catalogos(conn, aplicacoes) if diff and aplicacoes else None
+        # Fora do modo diff as relações dos schemas vêm de uma consulta própria (o catálogo já as traz)
+        relacoes = ler_relacoes(conn, aplicacoes) if aplicacoes and catalogos is None else None
+        revogados = set()
+
+        for item in itens:
+            arquivo = item["entrada"]["arquivo"]
+            with MEDIDOR.contexto(arquivo=arquivo):
+                logger.info(f"Processando arquivo: {arquivo}")
+
+                if item["entrada"].get("operacao") == OPERACAO_REVOGAR_TUDO:
+                    try:
+                        revoke_all_permissions.revogar_dados(conn, item["dados"])
+                        revogados.add(item["dados"]["user"])
+                        resultados.append(criar_resultado(item["indice"], item["entrada"], True))
+                    except Exception as e:
+                        logger.error(f"Erro ao revogar permissões de {arquivo}: {e}")
+                        resultados.append(criar_resultado(item["indice"], item["entrada"], False, str(e)))
+                    continue
+
+                if mesma_identidade(item["dados_antes"], item["dados"]):
+                    try:
+                        reconciliar_dados(conn, item["dados_antes"], item["dados"])
+                        revogados.add(item["dados"]["user"])
+                        registrar_resumo(item["dados"])
+                        resultados.append(criar_resultado(item["indice"], item["entrada"], True))
+                    except Exception as e:
+                        logger.error(f"Erro ao reconciliar permissões de {arquivo}: {e}")
+                        resultados.append(criar_resultado(item["indice"], item["entrada"], False, str(e)))
+                    continue
+
+                try:
+                    if revogar_diff(conn, item["dados_antes"], item["dados"]):
+                        revogados.add(item["dados"]["user"])
+                except Exception as e:
+                    logger.warning(f"Erro na revogação de {arquivo}, mas continuando com aplicação: {e}")
+
+                catalogo = None
+                if catalogos is not None:
+                    if item["dados"]["user"] in revogados:
+                        releitura = ler_catalogos(conn, [item["dados"]])
+                        catalogo = releitura[item["dados"]["user"]] if releitura else None
+                    else:
+                        catalogo = catalogos[item["dados"]["user"]]
+
+                try:
+                    ignoradas = aplicar_dados(conn, item["dados"], catalogo, relacoes)
+                    registrar_resumo(item["dados"])
+                    resultados.append(criar_resultado(item["indice"], item["entrada"], True, ignoradas=ignoradas))
+                except Exception as e:
+                    logger.error(f"Erro ao aplicar permissões de {arquivo}: {e}")
+                    resultados.append(criar_resultado(item["indice"], item["entrada"], False, str(e)))
+    finally:
+        conn.close()
+        logger.info(f"Conexão fechada: {host}/{dbname}")
+
+    return resultados
+
+def distribuir_por_host(grupos, max_por_host):
+    """Distribui os grupos em filas de trabalho, no máximo max_por_host por host.
+
+    As filas de um mesmo host compartilham os grupos pendentes daquele host e
+    são intercaladas entre hosts, para que todos comecem o quanto antes.
+    """
+    pendentes_por_host = {}
+    for chave, itens in grupos.items():
+        pendentes_por_host.setdefault(chave[1], deque()).append((chave, itens))
+
+    filas = []
+    for rodada in range(max_por_host):
+        for pendentes in pendentes_por_host.values():
+            if rodada < len(pendentes):
+                filas.append(pendentes)
+    return filas
+
+def processar_lote(entradas, resolver_credenciais=None, diff=False,
+                   max_workers=MAX_WORKERS_PADRAO, max_por_host=MAX_POR_HOST_PADRAO, driver=DRIVER):
+    """Processa todas as entradas, abrindo uma conexão por banco.
+
+    Bancos de hosts diferentes são processados em paralelo (até max_workers
+    conexões no total e max_por_host por host, uma thread por conexão); os
+    arquivos de um mesmo banco seguem a ordem das entradas. Retorna um
+    resultado por arquivo, na mesma ordem das entradas.
+    """
+    if resolver_credenciais is None:
+        resolver_credenciais = criar_resolvedor_credenciais()
+
+    grupos, resultados = agrupar_por_banco(entradas)
+    filas = distribuir_por_host(grupos, max(1, max_por_host))
+    hosts = len({chave[1] for chave in grupos})
+    logger.info(f"Lote com {len(entradas)} arquivo(s) em {len(grupos)} banco(s) de {hosts} host(s)")
+
+    trava = threading.Lock()
+
+    def consumir(pendentes):
+        parciais = []
+        while True:
+            with trava:
+                if not pendentes:
+                    return parciais
+                chave, itens = pendentes.popleft()
+            parciais.extend(processar_grupo(chave, itens, resolver_credenciais, diff, driver))
+
+    if filas:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(filas))), thread_name_prefix="lote") as executor:
+            for parciais in executor.map(consumir, filas):
+                resultados.extend(parciais)
+
+    return sorted(resultados, key=lambda resultado: resultado["indice"])
+
+def registrar_resultados(resultados):
+    """Registra no log o resumo do processamento do lote."""
+    sucessos = sum(1 for resultado in resultados if resultado["sucesso"])
+    erros = len(resultados) - sucessos
+
+    logger.info("="*50)
+    logger.info("RESUMO DO PROCESSAMENTO:")
+    for resultado in resultados:
+        if resultado["sucesso"]:
+            logger.info(f"  ✅ [{resultado['operacao']}] {resultado['arquivo']}")
+        else:
+            logger.info(f"  ❌ [{resultado['operacao']}] {resultado['arquivo']}: {resultado['erro']}")
+    logger.info(f"Sucessos: {sucessos}")
+    logger.info(f"Erros: {erros}")
+    logger.info(f"Instruções ignoradas (já em vigor): {sum(resultado['instrucoes_ignoradas'] for resultado in resultados)}")
+    logger.info("="*50)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Aplicação e revogação de permissões em lote")
+    parser.add_argument("arquivos", nargs="*", help="Arquivos YAML a aplicar")
+    parser.add_argument("--manifesto", help="Arquivo com um YAML por linha (opcionalmente seguido de TAB e o estado anterior)")
+    parser.add_argument("--revogar-tudo", metavar="MANIFESTO",
+                        help="Arquivo com o estado anterior de um YAML deletado por linha (revogação total)")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS_PADRAO,
+                        help=f"Máximo de conexões simultâneas no total (padrão: {MAX_WORKERS_PADRAO})")
+    parser.add_argument("--max-por-host", type=int, default=MAX_POR_HOST_PADRAO,
+                        help=f"Máximo de conexões simultâneas por host (padrão: {MAX_POR_HOST_PADRAO})")
+    parser.add_argument("--resultado", help="Arquivo JSON de saída com o resultado por arquivo")
+    parser.add_argument("--diff", action="store_true", help="Ler os privilégios atuais e emitir apenas os GRANTs ausentes")
+    parser.add_argument("--tempos", help="Arquivo JSON de saída com os tempos de conexão e de cada instrução (padrão: $TIMINGS_FILE)")
+
+    args = parser.parse_args()
+
+    # Revogações totais entram primeiro: um arquivo renomeado para o mesmo
+    # banco e usuário é revogado antes de ser reaplicado
+    entradas = []
+    try:
+        if args.revogar_tudo:
+            entradas.extend(carregar_manifesto(args.revogar_tudo, OPERACAO_REVOGAR_TUDO))
+        entradas.extend({"arquivo": arquivo, "antes": None, "operacao": OPERACAO_APLICAR} for arquivo in args.arquivos)
+        if args.manifesto:
+            entradas.extend(carregar_manifesto(args.manifesto))
+    except FileNotFoundError as e:
+        logger.error(f"Manifesto não encontrado: {e.filename}")
+        sys.exit(1)
+
+    if not entradas:
+        logger.error("Nenhum arquivo informado")
+        parser.print_usage()
+        sys.exit(1)
+
+    try:
+        resultados = processar_lote(entradas, diff=args.diff, max_workers=args.max_workers,
+                                    max_por_host=args.max_por_host)
+    finally:
+        finalizar(args.tempos)
+    registrar_resultados(resultados)
+
+    if args.resultado:
+        with open(args.resultado, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+
+    if any(not resultado["sucesso"] for resultado in resultados):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark de YAML - Database Access Control
+Gera uma árvore users-access-requests sintética e compara leitura e escrita
+com a implementação Python pura e com o libyaml (yaml_io), verificando que a
+saída do dump é idêntica byte a byte
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+import yaml
+
+import yaml_io
+
+ENVIRONMENTS = ["development", "staging", "production"]
+DATABASES = ["vendas", "estoque", "financeiro", "clientes", "logistica"]
+POSTGRES_PERMS = ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER", "USAGE", "EXECUTE"]
+MYSQL_PERMS = ["SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "INDEX", "ALTER"]
+NAMES = ["joão", "maria", "ana", "josé", "conceição", "pedro", "lúcia", "andré"]
+
+def build_document(rng, environment, engine, database, email):
+    """Monta um arquivo de permissões no formato dos wizards."""
+    perms = POSTGRES_PERMS if engine == "postgres" else MYSQL_PERMS
+    schemas = []
+    for index in range(rng.randint(1, 4)):
+        if rng.random() < 0.4:
+            schemas.append({
+                "nome": f"schema_{index}",
+                "tipo": "granular",
+                "tabelas": [
+                    {"nome": f"tabela_{t}", "permissions": rng.sample(perms, rng.randint(1, 3))}
+                    for t in range(rng.randint(1, 6))
+                ]
+            })
+        else:
+            schemas.append({"nome": f"schema_{index}", "permissions": rng.sample(perms, rng.randint(1, 4))})
+
+    return {
+        "host": f"{database}.{environment}.rds.amazonaws.com",
+        "user": email,
+        "database": database,
+        "engine": engine,
+        "region": "us-east-1",
+        "port": 5432 if engine == "postgres" else 3306,
+        "schemas": schemas,
+        "metadata": {
+            "solicitante": f"{rng.choice(NAMES).title()} da Silva",
+            "justificativa": "Acesso para análise de relatórios mensais de operação e conciliação financeira",
+            "ticket": f"ACC-{rng.randint(1000, 99999)}"
+        }
+    }
+
+def generate_tree(base_path, total_files, seed=42):
+    """Gera total_files arquivos YAML em base_path e retorna a lista de caminhos."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(total_files):
+        environment = ENVIRONMENTS[index % len(ENVIRONMENTS)]
+        engine = "postgres" if index % 2 else "mysql"
+        database = DATABASES[(index // 6) % len(DATABASES)]
+        email = f"{rng.choice(NAMES)}.{index}@empresa.com"
+
+        directory = os.path.join(base_path, environment, engine, database)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{email}.yml")
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.dump(build_document(rng, environment, engine, database, email), f,
+                      default_flow_style=False, allow_unicode=True, sort_keys=False)
+        paths.append(path)
+    return paths
+
+def timed(label, func, baseline=None):
+    """Executa func, imprime o tempo e retorna (resultado, segundos)."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<28} {elapsed:8.3f}s{speedup}")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de leitura/escrita YAML (Python puro x libyaml)")
+    parser.add_argument("--files", type=int, default=10000, help="Quantidade de arquivos gerados (padrão: 10000)")
+    parser.add_argument("--dir", help="Diretório onde gerar a árvore (padrão: diretório temporário)")
+    args = parser.parse_args()
+
+    print(f"📦 libyaml disponível: {'sim' if yaml_io.LIBYAML else 'não'}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_path = args.dir or temp_dir
+        print(f"🏗️ Gerando {args.files} arquivo(s) em {base_path}...")
+        paths = generate_tree(base_path, args.files)
+
+        def read_all(load):
+            documents = []
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    documents.append(load(f))
+            return documents
+
+        print("📖 Leitura:")
+        pure_docs, pure_load = timed("yaml.safe_load", lambda: read_all(yaml.safe_load))
+        fast_docs, _ = timed("yaml_io.safe_load", lambda: read_all(yaml_io.safe_load), pure_load)
+
+        print("✍️ Escrita:")
+        pure_out, pure_dump = timed("yaml.dump", lambda: [
+            yaml.dump(doc, default_flow_style=False, allow_unicode=True, sort_keys=False) for doc in pure_docs
+        ])
+        fast_out, _ = timed("yaml_io.dump", lambda: [yaml_io.dump(doc) for doc in pure_docs], pure_dump)
+
+    load_mismatches = sum(1 for a, b in zip(pure_docs, fast_docs) if a != b)
+    dump_mismatches = sum(1 for a, b in zip(pure_out, fast_out) if a != b)
+
+    print(f"🔍 Documentos lidos diferentes: {load_mismatches}")
+    print(f"🔍 Dumps diferentes (byte a byte): {dump_mismatches}")
+
+    if load_mismatches or dump_mismatches:
+        print("❌ yaml_io diverge da implementação Python pura")
+        sys.exit(1)
+    print("✅ Saída idêntica à implementação Python pura")
+
+if __name__ == "__main__":
+    main()
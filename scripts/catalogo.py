@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Leitura de Catálogo - Database Access Control
+Lê em lote os privilégios atuais dos usuários no banco para que apenas os
+GRANTs ausentes sejam emitidos (modo diff) e, na revogação total, tudo o que
+um usuário tem no banco, independente do YAML
+"""
+
+import logging
+
+from execucao import codigo_erro
+
+logger = logging.getLogger(__name__)
+
+PG_TABLE_PERMS = {"SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"}
+
+# Privilégios que ALL PRIVILEGES representa em uma tabela MySQL
+MYSQL_TABLE_ALL_PERMS = {
+    "SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP",
+    "REFERENCES", "INDEX", "ALTER", "CREATE VIEW", "SHOW VIEW", "TRIGGER"
+}
+
+# Tipos de relação afetados por GRANT ... ON ALL TABLES IN SCHEMA
+PG_RELKINDS_TABELAS = ("r", "p", "v", "m", "f")
+
+CONSULTA_PRIVILEGIOS_POSTGRES = """
+SELECT 'usuario', r.rolname, NULL, NULL, NULL
+  FROM pg_roles r
+ WHERE r.rolname = ANY(%(usuarios)s)
+UNION ALL
+SELECT 'tabela', g.grantee, g.table_schema, g.table_name, g.privilege_type
+  FROM information_schema.role_table_grants g
+ WHERE g.grantee = ANY(%(usuarios)s)
+   AND g.table_schema = ANY(%(schemas)s)
+UNION ALL
+SELECT 'schema', r.rolname, n.nspname, NULL, a.privilege_type
+  FROM pg_namespace n
+ CROSS JOIN LATERAL aclexplode(n.nspacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE r.rolname = ANY(%(usuarios)s)
+   AND n.nspname = ANY(%(schemas)s)
+UNION ALL
+SELECT 'database', r.rolname, NULL, d.datname, a.privilege_type
+  FROM pg_database d
+ CROSS JOIN LATERAL aclexplode(d.datacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE d.datname = current_database()
+   AND r.rolname = ANY(%(usuarios)s)
+UNION ALL
+SELECT 'relacao', NULL, n.nspname, c.relname, NULL
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+ WHERE c.relkind = ANY(%(relkinds)s)
+   AND n.nspname = ANY(%(schemas)s)
+"""
+
+CONSULTA_RELACOES_POSTGRES = """
+SELECT n.nspname, c.relname
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+ WHERE c.relkind = ANY(%(relkinds)s)
+   AND n.nspname = ANY(%(schemas)s)
+"""
+
+CONSULTA_PRIVILEGIOS_MYSQL = """
+SELECT 'usuario', CONCAT('''', User, '''@''', Host, ''''), NULL, NULL
+  FROM mysql.user
+ WHERE CONCAT('''', User, '''@''', Host, '''') IN %(grantees)s
+UNION ALL
+SELECT 'tabela', GRANTEE, TABLE_NAME, PRIVILEGE_TYPE
+  FROM information_schema.TABLE_PRIVILEGES
+ WHERE GRANTEE IN %(grantees)s
+   AND TABLE_SCHEMA = %(database)s
+UNION ALL
+SELECT 'schema', GRANTEE, NULL, PRIVILEGE_TYPE
+  FROM information_schema.SCHEMA_PRIVILEGES
+ WHERE GRANTEE IN %(grantees)s
+   AND TABLE_SCHEMA = %(database)s
+"""
+
+# Tipos de objeto em que o role tem algum privilégio, por schema, e no banco atual
+CONSULTA_PRIVILEGIOS_ROLE_POSTGRES = """
+SELECT 'role', NULL
+  FROM pg_roles r
+ WHERE r.rolname = %(usuario)s
+UNION
+SELECT 'schema', n.nspname
+  FROM pg_namespace n
+ CROSS JOIN LATERAL aclexplode(n.nspacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE r.rolname = %(usuario)s
+UNION
+SELECT CASE WHEN c.relkind = 'S' THEN 'sequencia' ELSE 'tabela' END, n.nspname
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+ CROSS JOIN LATERAL aclexplode(c.relacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE r.rolname = %(usuario)s
+UNION
+SELECT 'funcao', n.nspname
+  FROM pg_proc p
+  JOIN pg_namespace n ON n.oid = p.pronamespace
+ CROSS JOIN LATERAL aclexplode(p.proacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE r.rolname = %(usuario)s
+UNION
+SELECT 'banco', NULL
+  FROM pg_database d
+ CROSS JOIN LATERAL aclexplode(d.datacl) a
+  JOIN pg_roles r ON r.oid = a.grantee
+ WHERE d.datname = current_database()
+   AND r.rolname = %(usuario)s
+"""
+
+CONSULTA_GRANTS_MYSQL = "SHOW GRANTS FOR %(usuario)s@%(host)s"
+
+# ER_NONEXISTING_GRANT: SHOW GRANTS de um usuário que não existe
+ERRO_MYSQL_SEM_GRANTS = 1141
+
+def _catalogo_vazio():
+    """Estrutura do catálogo de um usuário sem nenhum privilégio."""
+    return {
+        "usuario_existe": False,
+        "tabelas": {},
+        "schemas": {},
+        "database": set(),
+        "relacoes": {}
+    }
+
+def parametros_privilegios_postgres(usernames, schemas):
+    """Parâmetros de CONSULTA_PRIVILEGIOS_POSTGRES (sem repetições, na ordem recebida)."""
+    return {
+        "usuarios": list(dict.fromkeys(usernames)),
+        "schemas": list(dict.fromkeys(schemas)),
+        "relkinds": list(PG_RELKINDS_TABELAS)
+    }
+
+def montar_catalogos_postgres(linhas, usernames):
+    """Monta o catálogo de cada role a partir das linhas de CONSULTA_PRIVILEGIOS_POSTGRES."""
+    usernames = list(dict.fromkeys(usernames))
+    catalogos = {username: _catalogo_vazio() for username in usernames}
+    relacoes = {}
+
+    for tipo, username, schema, objeto, privilegio in linhas:
+        if tipo == "relacao":
+            relacoes.setdefault(schema, set()).add(objeto)
+            continue
+
+        catalogo = catalogos.get(username)
+        if catalogo is None:
+            continue
+
+        if tipo == "usuario":
+            catalogo["usuario_existe"] = True
+        elif tipo == "tabela":
+            catalogo["tabelas"].setdefault((schema, objeto), set()).add(privilegio)
+        elif tipo == "schema":
+            catalogo["schemas"].setdefault(schema, set()).add(privilegio)
+        elif tipo == "database":
+            # aclexplode usa TEMPORARY para o privilégio TEMP
+            catalogo["database"].add("TEMP" if privilegio == "TEMPORARY" else privilegio)
+
+    for catalogo in catalogos.values():
+        catalogo["relacoes"] = relacoes
+
+    logger.info(f"Catálogo PostgreSQL lido: {len(linhas)} linha(s) para {len(usernames)} role(s)")
+    return catalogos
+
+def ler_privilegios_postgres(conn, usernames, schemas):
+    """Lê em uma única consulta os privilégios atuais dos roles no banco.
+
+    Retorna um catálogo por role com os privilégios por tabela
+    (role_table_grants), por schema e no banco (ACLs de pg_namespace e
+    pg_database), além das relações existentes em cada schema.
+    """
+    with conn.cursor() as cur:
+        cur.execute(CONSULTA_PRIVILEGIOS_POSTGRES, parametros_privilegios_postgres(usernames, schemas))
+        linhas = cur.fetchall()
+
+    return montar_catalogos_postgres(linhas, usernames)
+
+def parametros_relacoes_postgres(schemas):
+    """Parâmetros de CONSULTA_RELACOES_POSTGRES."""
+    return {
+        "schemas": list(dict.fromkeys(schemas)),
+        "relkinds": list(PG_RELKINDS_TABELAS)
+    }
+
+def montar_relacoes_postgres(linhas, schemas):
+    """Agrupa por schema as linhas (schema, relação) de CONSULTA_RELACOES_POSTGRES."""
+    relacoes = {}
+    for schema, relacao in linhas:
+        relacoes.setdefault(schema, set()).add(relacao)
+
+    logger.info(f"Relações PostgreSQL lidas: {len(linhas)} em {len(set(schemas))} schema(s)")
+    return relacoes
+
+def ler_relacoes_postgres(conn, schemas):
+    """Lê em uma única consulta as relações existentes em cada schema.
+
+    São as mesmas relações atingidas por GRANT ... ON ALL TABLES IN SCHEMA;
+    schemas sem nenhuma relação não aparecem no resultado.
+    """
+    with conn.cursor() as cur:
+        cur.execute(CONSULTA_RELACOES_POSTGRES, parametros_relacoes_postgres(schemas))
+        linhas = cur.fetchall()
+
+    return montar_relacoes_postgres(linhas, schemas)
+
+def _grantees_mysql(usernames):
+    """Grantee no formato do information_schema ('usuario'@'%') de cada usuário."""
+    return {f"'{username}'@'%'": username for username in dict.fromkeys(usernames)}
+
+def parametros_privilegios_mysql(usernames, database):
+    """Parâmetros de CONSULTA_PRIVILEGIOS_MYSQL."""
+    return {
+        "grantees": list(_grantees_mysql(usernames)),
+        "database": database
+    }
+
+def montar_catalogos_mysql(linhas, usernames, database):
+    """Monta o catálogo de cada usuário a partir das linhas de CONSULTA_PRIVILEGIOS_MYSQL."""
+    usernames = list(dict.fromkeys(usernames))
+    catalogos = {username: _catalogo_vazio() for username in usernames}
+    por_grantee = _grantees_mysql(usernames)
+
+    for tipo, grantee, objeto, privilegio in linhas:
+        catalogo = catalogos.get(por_grantee.get(grantee))
+        if catalogo is None:
+            continue
+
+        if tipo == "usuario":
+            catalogo["usuario_existe"] = True
+        elif tipo == "tabela":
+            catalogo["tabelas"].setdefault((database, objeto), set()).add(privilegio)
+        elif tipo == "schema":
+            catalogo["schemas"].setdefault(database, set()).add(privilegio)
+
+    logger.info(f"Catálogo MySQL lido: {len(linhas)} linha(s) para {len(usernames)} usuário(s)")
+    return catalogos
+
+def ler_privilegios_mysql(conn, usernames, database):
+    """Lê em uma única consulta os privilégios atuais dos usuários no banco.
+
+    Usa information_schema.TABLE_PRIVILEGES e SCHEMA_PRIVILEGES; privilégios
+    concedidos no banco inteiro cobrem todas as tabelas dele.
+    """
+    with conn.cursor() as cur:
+        cur.execute(CONSULTA_PRIVILEGIOS_MYSQL, parametros_privilegios_mysql(usernames, database))
+        linhas = cur.fetchall()
+
+    return montar_catalogos_mysql(linhas, usernames, database)
+
+def parametros_privilegios_role_postgres(username):
+    """Parâmetros de CONSULTA_PRIVILEGIOS_ROLE_POSTGRES."""
+    return {"usuario": username}
+
+def montar_privilegios_role_postgres(linhas):
+    """Resume as linhas de CONSULTA_PRIVILEGIOS_ROLE_POSTGRES.
+
+    Retorna se o role existe, os tipos de objeto (tabela, sequencia, funcao,
+    schema) em que ele tem privilégio em cada schema e se tem privilégio no banco.
+    """
+    privilegios = {"existe": False, "schemas": {}, "banco": False}
+    for tipo, schema in linhas:
+        if tipo == "role":
+            privilegios["existe"] = True
+        elif tipo == "banco":
+            privilegios["banco"] = True
+        else:
+            privilegios["schemas"].setdefault(schema, set()).add(tipo)
+
+    logger.info(f"Catálogo do role lido: privilégios em {len(privilegios['schemas'])} schema(s)"
+                f"{' e no banco' if privilegios['banco'] else ''}")
+    return privilegios
+
+def ler_privilegios_role_postgres(conn, username):
+    """Lê em uma única consulta onde o role tem privilégios no banco (de qualquer concedente)."""
+    with conn.cursor() as cur:
+        cur.execute(CONSULTA_PRIVILEGIOS_ROLE_POSTGRES, parametros_privilegios_role_postgres(username))
+        linhas = cur.fetchall()
+
+    return montar_privilegios_role_postgres(linhas)
+
+def parametros_grants_mysql(username):
+    """Parâmetros de CONSULTA_GRANTS_MYSQL (conta 'usuario'@'%')."""
+    return {"usuario": username, "host": "%"}
+
+def montar_grants_mysql(linhas):
+    """GRANTs de SHOW GRANTS, uma linha cada."""
+    grants = [linha[0] for linha in linhas]
+    logger.info(f"SHOW GRANTS: {len(grants)} linha(s)")
+    return grants
+
+def sem_grants_mysql(erro):
+    """Indica se o erro de SHOW GRANTS significa que o usuário não existe."""
+    return codigo_erro(erro) == ERRO_MYSQL_SEM_GRANTS
+
+def ler_grants_mysql(conn, username):
+    """Lê os GRANTs atuais do usuário com SHOW GRANTS (lista vazia se ele não existe)."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CONSULTA_GRANTS_MYSQL, parametros_grants_mysql(username))
+            linhas = cur.fetchall()
+    except Exception as e:
+        if not sem_grants_mysql(e):
+            raise
+        return []
+
+    return montar_grants_mysql(linhas)
+
+def _possui_privilegio_tabela_postgres(privilegios, permissao):
+    """Verifica se o conjunto de privilégios de uma tabela cobre a permissão."""
+    if permissao == "ALL PRIVILEGES":
+        return PG_TABLE_PERMS <= privilegios
+    return permissao in privilegios
+
+def concessao_existente_postgres(concessao, catalogo):
+    """Indica se uma concessão atômica PostgreSQL já está em vigor no catálogo.
+
+    EXECUTE em todas as funções não é verificado e é sempre reemitido.
+    """
+    escopo, schema, objeto, permissao = concessao
+
+    if escopo == "tabela":
+        return _possui_privilegio_tabela_postgres(catalogo["tabelas"].get((schema, objeto), set()), permissao)
+    if escopo == "todas_tabelas":
+        return all(
+            _possui_privilegio_tabela_postgres(catalogo["tabelas"].get((schema, tabela), set()), permissao)
+            for tabela in catalogo["relacoes"].get(schema, ())
+        )
+    if escopo == "schema":
+        return permissao in catalogo["schemas"].get(schema, set())
+    if escopo == "database":
+        return permissao in catalogo["database"]
+    return False
+
+def concessao_existente_mysql(concessao, catalogo):
+    """Indica se uma concessão atômica MySQL já está em vigor no catálogo.
+
+    USAGE não é verificado e é sempre reemitido.
+    """
+    escopo, database, tabela, permissao = concessao
+
+    privilegios = catalogo["tabelas"].get((database, tabela), set()) | catalogo["schemas"].get(database, set())
+    if permissao == "ALL PRIVILEGES":
+        return MYSQL_TABLE_ALL_PERMS <= privilegios
+    if permissao == "USAGE":
+        return False
+    return permissao in privilegios
+
+def filtrar_concessoes_existentes(concessoes, catalogo, engine):
+    """Remove as concessões atômicas que já estão em vigor no banco."""
+    existente = concessao_existente_mysql if "mysql" in engine else concessao_existente_postgres
+    return [concessao for concessao in concessoes if not existente(concessao, catalogo)]
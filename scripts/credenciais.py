@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Provedor de Credenciais - Database Access Control
+Busca o parâmetro rds-access-control do Parameter Store uma única vez por
+processo e atende em memória as consultas de credenciais dos bancos
+(<banco>-<engine>-user / <banco>-<engine>-password), com expiração (TTL)
+"""
+
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PARAMETRO_PADRAO = "rds-access-control"
+TTL_PADRAO = 300
+
+# Sufixos das chaves do parâmetro e o campo correspondente no índice
+SUFIXOS = {
+    "-user": "usuario",
+    "-password": "senha"
+}
+
+def carregar_configuracao_credenciais(conteudo):
+    """Converte o conteúdo do Parameter Store (linhas chave=valor) em dicionário."""
+    configuracao = {}
+    for linha in conteudo.splitlines():
+        linha = linha.strip()
+        if not linha or "=" not in linha:
+            continue
+        chave, valor = linha.split("=", 1)
+        configuracao[chave.strip()] = valor.strip()
+    return configuracao
+
+def indexar_credenciais(configuracao):
+    """Indexa as credenciais por prefixo <banco>-<engine>.
+
+    Chaves que não terminam em -user ou -password são ignoradas.
+    """
+    indice = {}
+    for chave, valor in configuracao.items():
+        for sufixo, campo in SUFIXOS.items():
+            if chave.endswith(sufixo):
+                indice.setdefault(chave[:-len(sufixo)], {})[campo] = valor
+                break
+    return indice
+
+def mascarar_valores(valores):
+    """Registra os valores como segredos no GitHub Actions (::add-mask::)."""
+    if os.environ.get("GITHUB_ACTIONS") != "true":
+        return
+    for valor in valores:
+        if valor:
+            print(f"::add-mask::{valor}", flush=True)
+
+def ler_parameter_store(nome=PARAMETRO_PADRAO, regiao=None):
+    """Lê o conteúdo (descriptografado) de um parâmetro do Parameter Store."""
+    # Importado aqui para que o provedor em arquivo funcione sem boto3
+    import boto3
+
+    cliente = boto3.client("ssm", region_name=regiao)
+    resposta = cliente.get_parameter(Name=nome, WithDecryption=True)
+    return resposta["Parameter"]["Value"]
+
+def ler_arquivo(caminho):
+    """Lê o conteúdo do parâmetro a partir de um arquivo local (uso offline)."""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+class ProvedorCredenciais:
+    """Cache em memória das credenciais do Parameter Store.
+
+    O conteúdo é lido uma vez e reutilizado até expirar o TTL; o acesso é
+    protegido por trava para uso pelas threads do processamento em lote.
+    """
+
+    def __init__(self, ler_conteudo, ttl=TTL_PADRAO, origem=PARAMETRO_PADRAO):
+        self.ler_conteudo = ler_conteudo
+        self.ttl = ttl
+        self.origem = origem
+        self._indice = None
+        self._carregado_em = 0.0
+        self._trava = threading.Lock()
+
+    def _expirado(self):
+        return self._indice is None or time.monotonic() - self._carregado_em >= self.ttl
+
+    def _carregar(self):
+        conteudo = self.ler_conteudo()
+        if not conteudo or not conteudo.strip():
+            raise ValueError(f"Parâmetro {self.origem} retornou conteúdo vazio")
+
+        configuracao = carregar_configuracao_credenciais(conteudo)
+        mascarar_valores(configuracao.values())
+        self._indice = indexar_credenciais(configuracao)
+        self._carregado_em = time.monotonic()
+        logger.info(f"Credenciais carregadas de {self.origem}: {len(self._indice)} banco(s)")
+
+    def invalidar(self):
+        """Descarta o cache; a próxima consulta relê o parâmetro."""
+        with self._trava:
+            self._indice = None
+
+    def obter(self, database, engine):
+        """Retorna (usuário, senha) do owner para o banco e engine informados."""
+        with self._trava:
+            if self._expirado():
+                self._carregar()
+            entrada = self._indice.get(f"{database}-{engine}", {})
+
+        if not entrada.get("usuario") or not entrada.get("senha"):
+            raise ValueError(f"Credenciais não encontradas para {database}-{engine}")
+        return entrada["usuario"], entrada["senha"]
+
+def criar_provedor():
+    """Cria o provedor a partir das variáveis de ambiente.
+
+    RDS_ACCESS_CONTROL_FILE usa um arquivo local no formato do parâmetro;
+    RDS_ACCESS_CONTROL_PARAMETER usa o Parameter Store (região em AWS_REGION).
+    RDS_ACCESS_CONTROL_TTL define a expiração em segundos. Retorna None
+    quando nenhuma origem está configurada.
+    """
+    ttl = float(os.environ.get("RDS_ACCESS_CONTROL_TTL", TTL_PADRAO))
+
+    caminho = os.environ.get("RDS_ACCESS_CONTROL_FILE")
+    if caminho:
+        return ProvedorCredenciais(lambda: ler_arquivo(caminho), ttl, caminho)
+
+    nome = os.environ.get("RDS_ACCESS_CONTROL_PARAMETER")
+    if nome:
+        regiao = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+        return ProvedorCredenciais(lambda: ler_parameter_store(nome, regiao), ttl, nome)
+
+    return None
+
+_provedor = None
+_trava_provedor = threading.Lock()
+
+def obter_provedor():
+    """Retorna o provedor compartilhado do processo (None se não configurado)."""
+    global _provedor
+    with _trava_provedor:
+        if _provedor is None:
+            _provedor = criar_provedor()
+        return _provedor
+
+def obter_credenciais(database, engine):
+    """Consulta as credenciais do owner no provedor compartilhado do processo."""
+    provedor = obter_provedor()
+    if provedor is None:
+        raise ValueError("Variáveis DB_USER e DB_PASS devem estar definidas "
+                         "(ou RDS_ACCESS_CONTROL_PARAMETER / RDS_ACCESS_CONTROL_FILE)")
+    return provedor.obter(database, engine)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Adaptadores de Driver - Database Access Control
+Camada única de conexão com os bancos: o lote, a aplicação e as revogações
+abrem conexões por um driver (conectar(engine, host, porta, usuário, senha,
+banco)); DriverSincrono usa psycopg2/pymysql e os testes usam um driver
+falso em memória com a mesma interface
+"""
+
+from medicao import MEDIDOR
+
+def tipo_engine(engine):
+    """'postgres' ou 'mysql' para o engine do arquivo (o lote já trata aurora como postgres)."""
+    engine = engine.lower()
+    if "postgres" in engine:
+        return "postgres"
+    if "mysql" in engine:
+        return "mysql"
+    raise ValueError(f"Engine não suportado: {engine}")
+
+class DriverSincrono:
+    """Conexões bloqueantes, abertas pelas funções de conexão dos scripts (psycopg2/pymysql)."""
+
+    def __init__(self, conectar_postgres, conectar_mysql):
+        self._conectores = {"postgres": conectar_postgres, "mysql": conectar_mysql}
+
+    def conectar(self, engine, host, port, user, password, dbname):
+        """Abre a conexão do engine com o tempo de conexão e das instruções medido."""
+        conectar = self._conectores[tipo_engine(engine)]
+        return MEDIDOR.medir_conexao(host, dbname, conectar, host, port, user, password, dbname)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Execução de Planos com Timeouts - Database Access Control
+Envia as instruções do plano com lock_timeout/statement_timeout (PostgreSQL)
+ou lock_wait_timeout (MySQL) e, quando uma instrução esbarra em um lock
+ocupado, desfaz só o trecho que falhou e tenta de novo com espera
+exponencial com jitter, a partir da instrução que falhou (no PostgreSQL, o
+início do lote desfeito é repetido uma vez)
+"""
+
+import os
+import math
+import time
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Padrões (sobrescritos pelas variáveis de ambiente abaixo)
+LOCK_TIMEOUT_PADRAO = 5
+STATEMENT_TIMEOUT_PADRAO = 120
+TENTATIVAS_PADRAO = 4
+TAMANHO_LOTE_PADRAO = 50
+ESPERA_BASE = 1.0
+ESPERA_MAXIMA = 30.0
+
+# Nome do savepoint de cada lote no PostgreSQL
+SAVEPOINT = "plano_lote"
+
+# Depois que um lote falha: savepoint de cada instrução e marcador (SET LOCAL) da instrução em andamento
+SAVEPOINT_INSTRUCAO = "plano_instrucao"
+MARCADOR_INSTRUCAO = "plano.instrucao"
+CONSULTA_MARCADOR = "SELECT current_setting(%(marcador)s);"
+
+# Erros de lock/timeout que justificam uma nova tentativa
+ERROS_POSTGRES_RETENTAVEIS = {
+    "55P03",  # lock_not_available (lock_timeout)
+    "57014",  # query_canceled (statement_timeout)
+    "40P01",  # deadlock_detected
+    "40001",  # serialization_failure
+}
+ERROS_MYSQL_RETENTAVEIS = {
+    1205,  # ER_LOCK_WAIT_TIMEOUT (lock_wait_timeout / innodb_lock_wait_timeout)
+    1213,  # ER_LOCK_DEADLOCK
+}
+
+class PoliticaExecucao:
+    """Timeouts (em segundos), tentativas e tamanho dos lotes do PostgreSQL."""
+
+    __slots__ = ("lock_timeout", "statement_timeout", "tentativas", "tamanho_lote")
+
+    def __init__(self, lock_timeout=LOCK_TIMEOUT_PADRAO, statement_timeout=STATEMENT_TIMEOUT_PADRAO,
+                 tentativas=TENTATIVAS_PADRAO, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        self.lock_timeout = float(lock_timeout)
+        self.statement_timeout = float(statement_timeout)
+        self.tentativas = int(tentativas)
+        self.tamanho_lote = max(1, int(tamanho_lote))
+
+    @classmethod
+    def do_ambiente(cls):
+        """Política a partir de GRANT_LOCK_TIMEOUT, GRANT_STATEMENT_TIMEOUT, GRANT_MAX_RETRIES e GRANT_BATCH_SIZE."""
+        return cls(
+            os.environ.get("GRANT_LOCK_TIMEOUT", LOCK_TIMEOUT_PADRAO),
+            os.environ.get("GRANT_STATEMENT_TIMEOUT", STATEMENT_TIMEOUT_PADRAO),
+            os.environ.get("GRANT_MAX_RETRIES", TENTATIVAS_PADRAO),
+            os.environ.get("GRANT_BATCH_SIZE", TAMANHO_LOTE_PADRAO)
+        )
+
+    def descrever(self):
+        """Resumo da política para o log e para o plano (--plan)."""
+        return (f"lock_timeout {self.lock_timeout:g}s, statement_timeout {self.statement_timeout:g}s, "
+                f"até {self.tentativas} nova(s) tentativa(s) com espera exponencial com jitter")
+
+def espera_com_jitter(tentativa, aleatorio=random):
+    """Espera antes da tentativa (1, 2, ...): metade fixa e metade aleatória de base * 2^(tentativa-1)."""
+    teto = min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** (tentativa - 1))
+    return teto / 2 + aleatorio.uniform(0, teto / 2)
+
+def codigo_erro(erro):
+    """Código do erro do driver: SQLSTATE no psycopg2, número no pymysql."""
+    codigo = getattr(erro, "pgcode", None)
+    if codigo is None and getattr(erro, "args", None) and isinstance(erro.args[0], int):
+        codigo = erro.args[0]
+    return codigo
+
+def erro_retentavel(erro, engine):
+    """Indica se o erro é de lock ocupado/timeout (vale tentar de novo)."""
+    retentaveis = ERROS_MYSQL_RETENTAVEIS if "mysql" in engine else ERROS_POSTGRES_RETENTAVEIS
+    return codigo_erro(erro) in retentaveis
+
+def contar_idas_e_voltas(total_instrucoes, engine, politica=None):
+    """Idas e voltas esperadas para enviar o plano sem contenção."""
+    if not total_instrucoes:
+        return 0
+    if "mysql" in engine:
+        return 1
+    politica = politica or PoliticaExecucao.do_ambiente()
+    return math.ceil(total_instrucoes / politica.tamanho_lote)
+
+def preparacao_postgres(politica):
+    """SET LOCAL dos timeouts, válidos até o fim da transação (inclusive após ROLLBACK TO SAVEPOINT)."""
+    return [
+        f"SET LOCAL lock_timeout = {int(politica.lock_timeout * 1000)};",
+        f"SET LOCAL statement_timeout = {int(politica.statement_timeout * 1000)};"
+    ]
+
+def preparacao_mysql(politica):
+    """Timeouts de lock da sessão (o MySQL não tem timeout de instrução para GRANT/REVOKE)."""
+    segundos = max(1, math.ceil(politica.lock_timeout))
+    return [
+        f"SET SESSION lock_wait_timeout = {segundos};",
+        f"SET SESSION innodb_lock_wait_timeout = {segundos};"
+    ]
+
+def _aguardar(erro, descricao, tentativa, politica, dormir, aleatorio):
+    espera = espera_com_jitter(tentativa, aleatorio)
+    logger.warning(f"Lock ocupado em {descricao} ({codigo_erro(erro)}: {str(erro).strip()}); "
+                   f"nova tentativa {tentativa}/{politica.tentativas} em {espera:.1f}s")
+    dormir(espera)
+
+def _lotes_postgres(instrucoes, politica):
+    """Lotes do plano PostgreSQL: (posição da primeira instrução no plano, SQL das instruções)."""
+    for inicio in range(0, len(instrucoes), politica.tamanho_lote):
+        yield inicio, [instrucao["sql"] for instrucao in instrucoes[inicio:inicio + politica.tamanho_lote]]
+
+def _lote_retomavel_postgres(lote, inicio):
+    """Restante do lote a partir de inicio, cada instrução em um savepoint precedido do marcador com o seu índice.
+
+    Termina com o RELEASE do savepoint do lote, que continua estabelecido
+    depois do ROLLBACK TO SAVEPOINT.
+    """
+    corpo = []
+    for indice in range(inicio, len(lote)):
+        corpo += [f"SET LOCAL {MARCADOR_INSTRUCAO} = '{indice}';", f"SAVEPOINT {SAVEPOINT_INSTRUCAO};",
+                  lote[indice], f"RELEASE SAVEPOINT {SAVEPOINT_INSTRUCAO};"]
+    return corpo + [f"RELEASE SAVEPOINT {SAVEPOINT};"]
+
+def executar_postgres(conn, instrucoes, politica, dormir=time.sleep, aleatorio=random):
+    """Executa o plano em lotes, cada um protegido por um SAVEPOINT.
+
+    Cada lote segue em um único execute (SAVEPOINT, instruções, RELEASE); os
+    timeouts vão junto com o primeiro. Se um lote esbarra em lock ocupado,
+    apenas ele é desfeito (ROLLBACK TO SAVEPOINT); os lotes anteriores
+    continuam na transação. Como o ROLLBACK TO SAVEPOINT desfaz também as
+    instruções do lote anteriores à que falhou, a nova tentativa as repete
+    uma vez, agora com um savepoint e o marcador por instrução: nas falhas
+    seguintes só a instrução que falhou é desfeita e o envio continua a
+    partir dela. O savepoint por instrução fica restrito ao lote que falhou
+    porque cada subtransação com escrita ocupa o cache de 64 subtransações
+    do backend até o commit. Retorna (idas_e_voltas, retentativas).
+    """
+    preparacao = preparacao_postgres(politica)
+    idas_e_voltas = 0
+    retentativas = 0
+
+    with conn.cursor() as cur:
+        for posicao, lote in _lotes_postgres(instrucoes, politica):
+            # None: o lote inteiro em um savepoint; depois da primeira falha, índice da próxima instrução
+            retomada = None
+            tentativa = 0
+
+            while True:
+                if retomada is None:
+                    corpo = [f"SAVEPOINT {SAVEPOINT};", *lote, f"RELEASE SAVEPOINT {SAVEPOINT};"]
+                else:
+                    corpo = _lote_retomavel_postgres(lote, retomada)
+                idas_e_voltas += 1
+                try:
+                    cur.execute("\n".join(preparacao + corpo))
+                    break
+                except Exception as erro:
+                    if not erro_retentavel(erro, "postgres"):
+                        raise
+                    if retomada is None:
+                        # O savepoint vem depois dos SET LOCAL: eles continuam valendo
+                        cur.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT};")
+                        descricao = f"instruções {posicao + 1}-{posicao + len(lote)}"
+                        retomada = 0
+                    else:
+                        # O marcador foi definido antes do savepoint da instrução: sobrevive ao ROLLBACK TO
+                        cur.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT_INSTRUCAO};\n"
+                                    f"RELEASE SAVEPOINT {SAVEPOINT_INSTRUCAO};")
+                        cur.execute(CONSULTA_MARCADOR, {"marcador": MARCADOR_INSTRUCAO})
+                        idas_e_voltas += 1
+                        falhou = int(cur.fetchall()[0][0])
+                        if falhou > retomada:
+                            tentativa = 0
+                        retomada = falhou
+                        descricao = f"instrução {posicao + retomada + 1}"
+                    idas_e_voltas += 1
+                    tentativa += 1
+                    if tentativa > politica.tentativas:
+                        raise
+                    retentativas += 1
+                    _aguardar(erro, descricao, tentativa, politica, dormir, aleatorio)
+                finally:
+                    preparacao = []
+
+    return idas_e_voltas, retentativas
+
+def executar_mysql(conn, instrucoes, politica, dormir=time.sleep, aleatorio=random):
+    """Executa o plano em um único execute multi-statement, retomando da instrução que falhou.
+
+    Cada GRANT/REVOKE do MySQL confirma implicitamente, então as instruções
+    anteriores à que falhou (contadas pelos resultados consumidos) já estão
+    aplicadas; a nova tentativa reenvia só a partir dela. A conexão precisa
+    de CLIENT.MULTI_STATEMENTS. Retorna (idas_e_voltas, retentativas).
+    """
+    preparacao = preparacao_mysql(politica)
+    idas_e_voltas = 0
+    retentativas = 0
+    inicio = 0
+    tentativa = 0
+
+    with conn.cursor() as cur:
+        while inicio < len(instrucoes):
+            enviadas = preparacao + [instrucao["sql"] for instrucao in instrucoes[inicio:]]
+            concluidas = 0
+            idas_e_voltas += 1
+            try:
+                cur.execute("\n".join(enviadas))
+                concluidas = 1
+                # Consumir todos os resultados propaga erros de instruções intermediárias
+                while cur.nextset():
+                    concluidas += 1
+                break
+            except Exception as erro:
+                executadas = concluidas - len(preparacao)
+                if executadas < 0 or not erro_retentavel(erro, "mysql"):
+                    raise
+                preparacao = []
+                if executadas:
+                    inicio += executadas
+                    tentativa = 0
+                tentativa += 1
+                if tentativa > politica.tentativas:
+                    raise
+                retentativas += 1
+                _aguardar(erro, f"instrução {inicio + 1}", tentativa, politica, dormir, aleatorio)
+
+    return idas_e_voltas, retentativas
+
+def executar_plano(conn, instrucoes, engine, politica=None, dormir=time.sleep, aleatorio=random):
+    """Executa as instruções do plano com timeouts e novas tentativas limitadas.
+
+    O limite de tentativas vale por instrução (recomeça quando o envio
+    avança), o que limita a espera total em vez de falhar o lote inteiro no
+    primeiro lock ocupado. Não confirma a transação.
+    """
+    if not instrucoes:
+        return 0, 0
+    politica = politica or PoliticaExecucao.do_ambiente()
+    if "mysql" in engine:
+        return executar_mysql(conn, instrucoes, politica, dormir, aleatorio)
+    return executar_postgres(conn, instrucoes, politica, dormir, aleatorio)
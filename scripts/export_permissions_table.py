@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Exportação Colunar de Permissões - Database Access Control
+Achata a árvore users-access-requests em uma tabela colunar (um registro por
+privilégio) com colunas de texto codificadas por dicionário. Grava Parquet
+quando o pyarrow está instalado, com fallback para CSV da biblioteca padrão,
+e responde consultas como "quem tem DELETE em production" sem reler os YAMLs
+"""
+
+import os
+import sys
+import csv
+import gzip
+import time
+import argparse
+from array import array
+
+from yaml_cache import open_cache
+from permission_index import PermissionIndex
+from permission_records import RECORD_FIELDS, iter_permission_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW = True
+except ImportError:
+    PYARROW = False
+
+# Código das células vazias (ex.: table em schemas simples)
+NULL_CODE = -1
+
+class DictionaryColumn:
+    """Coluna de texto codificada por dicionário: valores distintos + códigos int32."""
+
+    def __init__(self, name):
+        self.name = name
+        self.dictionary = []
+        self.codes = array('i')
+        self._lookup = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(NULL_CODE)
+            return
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        self.codes.append(code)
+
+    def code_of(self, value):
+        """Código de um valor (None se o valor não aparece na coluna)."""
+        if value is None:
+            return NULL_CODE
+        return self._lookup.get(value)
+
+    def value(self, row):
+        code = self.codes[row]
+        return None if code == NULL_CODE else self.dictionary[code]
+
+    def __len__(self):
+        return len(self.codes)
+
+class PermissionTable:
+    """Tabela colunar de permissões com as colunas de RECORD_FIELDS."""
+
+    def __init__(self):
+        self.columns = {name: DictionaryColumn(name) for name in RECORD_FIELDS}
+
+    @classmethod
+    def from_records(cls, records):
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    def append(self, record):
+        for name, column in self.columns.items():
+            column.append(record.get(name))
+
+    def __len__(self):
+        return len(self.columns[RECORD_FIELDS[0]])
+
+    def where(self, **criteria):
+        """Índices das linhas em que cada coluna é igual ao valor pedido.
+
+        Os valores são traduzidos para códigos uma única vez, então a busca
+        compara apenas inteiros.
+        """
+        rows = range(len(self))
+        for name, value in criteria.items():
+            column = self.columns[name]
+            code = column.code_of(value)
+            if code is None:
+                return []
+            codes = column.codes
+            rows = [row for row in rows if codes[row] == code]
+        return list(rows)
+
+    def distinct(self, name, rows=None):
+        """Valores distintos de uma coluna (opcionalmente nas linhas informadas), em ordem alfabética."""
+        column = self.columns[name]
+        codes = column.codes if rows is None else (column.codes[row] for row in rows)
+        return sorted(column.dictionary[code] for code in set(codes) if code != NULL_CODE)
+
+    def row(self, index):
+        """Registro completo de uma linha (dicionário coluna → valor)."""
+        return {name: column.value(index) for name, column in self.columns.items()}
+
+    def to_arrow(self):
+        """Converte para pyarrow.Table com colunas DictionaryArray (int32 → string)."""
+        arrays = []
+        for column in self.columns.values():
+            indices = pa.array([None if code == NULL_CODE else code for code in column.codes], type=pa.int32())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(column.dictionary, type=pa.string())))
+        return pa.Table.from_arrays(arrays, names=list(self.columns))
+
+    @classmethod
+    def from_arrow(cls, arrow_table):
+        table = cls()
+        for name, column in table.columns.items():
+            encoded = arrow_table.column(name).combine_chunks()
+            if not pa.types.is_dictionary(encoded.type):
+                encoded = encoded.dictionary_encode()
+            column.dictionary = encoded.dictionary.to_pylist()
+            column._lookup = {value: code for code, value in enumerate(column.dictionary)}
+            column.codes = array('i', (NULL_CODE if code is None else code for code in encoded.indices.to_pylist()))
+        return table
+
+def _open_text(path, mode):
+    """Abre um arquivo CSV (compactado com gzip se terminar em .gz)."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def write_csv(table, path):
+    """Grava a tabela em CSV com cabeçalho; células vazias representam None."""
+    with _open_text(path, 'w') as f:
+        writer = csv.writer(f)
+        writer.writerow(RECORD_FIELDS)
+        columns = [table.columns[name] for name in RECORD_FIELDS]
+        for index in range(len(table)):
+            writer.writerow(['' if value is None else value for value in (column.value(index) for column in columns)])
+
+def read_csv(path):
+    """Lê uma tabela gravada por write_csv."""
+    with _open_text(path, 'r') as f:
+        reader = csv.DictReader(f)
+        return PermissionTable.from_records(
+            {name: (value or None) for name, value in row.items()} for row in reader
+        )
+
+def write_table(table, path):
+    """Grava em Parquet (.parquet, requer pyarrow) ou CSV (.csv/.csv.gz); retorna o caminho gravado."""
+    if path.endswith('.parquet'):
+        if not PYARROW:
+            raise RuntimeError("pyarrow é necessário para gravar arquivos .parquet (use .csv ou .csv.gz)")
+        pq.write_table(table.to_arrow(), path, use_dictionary=True, compression='zstd')
+        return path
+    write_csv(table, path)
+    return path
+
+def read_table(path):
+    """Lê uma tabela exportada (Parquet ou CSV, pela extensão)."""
+    if path.endswith('.parquet'):
+        if not PYARROW:
+            raise RuntimeError("pyarrow é necessário para ler arquivos .parquet")
+        return PermissionTable.from_arrow(pq.read_table(path))
+    return read_csv(path)
+
+def parse_criteria(items):
+    """Converte ["campo=valor", ...] em {campo: valor}, validando os nomes de coluna."""
+    criteria = {}
+    for item in items or []:
+        name, sep, value = item.partition('=')
+        if not sep or name not in RECORD_FIELDS:
+            raise ValueError(f"Filtro inválido: {item} (use coluna=valor; colunas: {', '.join(RECORD_FIELDS)})")
+        criteria[name] = value
+    return criteria
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação colunar das permissões (Parquet ou CSV)")
+    parser.add_argument("--base-path", default="users-access-requests", help="Diretório da árvore de permissões")
+    parser.add_argument("--output", default="permissoes.parquet",
+                        help="Arquivo de saída: .parquet (requer pyarrow), .csv ou .csv.gz")
+    parser.add_argument("--query", help="Consultar uma tabela já exportada em vez de exportar")
+    parser.add_argument("--where", action="append", metavar="COLUNA=VALOR",
+                        help="Filtro da consulta (repetível), ex.: --where environment=production --where privilege=DELETE")
+    parser.add_argument("--distinct", default="user", choices=RECORD_FIELDS,
+                        help="Coluna listada na consulta (padrão: user)")
+    parser.add_argument("--no-cache", action="store_true", help="Não usar o cache de leitura dos arquivos YAML")
+    args = parser.parse_args()
+
+    try:
+        criteria = parse_criteria(args.where)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.query:
+        started = time.perf_counter()
+        table = read_table(args.query)
+        loaded = time.perf_counter()
+        rows = table.where(**criteria)
+        values = table.distinct(args.distinct, rows)
+        elapsed = (time.perf_counter() - loaded) * 1000
+        for value in values:
+            print(value)
+        print(f"🔍 {len(rows)} registro(s), {len(values)} valor(es) distinto(s) de {args.distinct} "
+              f"(consulta em {elapsed:.1f} ms, leitura em {(loaded - started) * 1000:.0f} ms)", file=sys.stderr)
+        return
+
+    if args.output.endswith('.parquet') and not PYARROW:
+        parser.error(f"pyarrow não instalado; não é possível gravar {args.output} (use .csv ou .csv.gz)")
+
+    cache = open_cache(not args.no_cache)
+    try:
+        index = PermissionIndex(args.base_path, cache=cache)
+        table = PermissionTable.from_records(iter_permission_records(index))
+        if cache is not None:
+            cache.prune(args.base_path)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    output = write_table(table, args.output)
+    print(f"✅ {len(table)} registro(s) exportado(s) para: {output}")
+    print(f"📁 Tamanho do arquivo: {os.path.getsize(output):,} bytes")
+
+if __name__ == "__main__":
+    main()
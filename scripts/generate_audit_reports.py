@@ -8,10 +8,17 @@ import os
 import sys
 import yaml
 import json
+import re
 import argparse
+import zipfile
 from datetime import datetime
 from collections import defaultdict
-import glob
+from concurrent.futures import ProcessPoolExecutor
+
+from yaml_cache import open_cache
+from grant_model import json_default
+from permission_index import PermissionIndex
+from report_output import open_output, write_chunks
 
 # Configurar encoding para Windows
 if sys.platform == "win32":
@@ -20,91 +27,93 @@ if sys.platform == "win32":
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
 
 class AuditReportGenerator:
-    def __init__(self, base_path="users-access-requests"):
+    def __init__(self, base_path="users-access-requests", cache=None, index=None):
         self.base_path = base_path
         self.environments = ["development", "staging", "production"]
-        
-    def load_user_permissions(self, environment):
-        """Carrega todas as permissões de usuários de um ambiente."""
+        self.cache = cache
+        self._index = index
+        
+    @property
+    def index(self):
+        """Índice da árvore de permissões (montado em uma única varredura, sob demanda)."""
+        if self._index is None:
+            self._index = PermissionIndex(self.base_path, self.environments, self.cache)
+        return self._index
+
+    def load_user_permissions(self, environment, user_email=None, database_name=None):
+        """Carrega as permissões de usuários de um ambiente.
+
+        Com user_email apenas os arquivos <email>.yml desse usuário são lidos;
+        database_name restringe aos bancos cujo nome contém o filtro.
+        """
         permissions_data = defaultdict(lambda: defaultdict(dict))
         
-        env_path = os.path.join(self.base_path, environment)
-        if not os.path.exists(env_path):
-            print(f"⚠️ Ambiente {environment} não encontrado em {env_path}")
-            return permissions_data
-            
-        # Percorrer engines (mysql, postgres, aurora) - apenas se existirem
-        try:
-            engine_dirs = [d for d in os.listdir(env_path) if os.path.isdir(os.path.join(env_path, d)) and d != "audit"]
-        except OSError:
-            print(f"⚠️ Erro ao acessar diretório {env_path}")
+        if environment in self.index.missing_environments:
+            print(f"⚠️ Ambiente {environment} não encontrado em {os.path.join(self.base_path, environment)}")
             return permissions_data
+        
+        if user_email:
+            entries = self.index.entries_for_user(user_email, environment)
+        else:
+            entries = self.index.entries_for_environment(environment)
+        
+        if database_name:
+            entries = [entry for entry in entries if database_name.lower() in entry.database.lower()]
             
-        if not engine_dirs:
-            print(f"ℹ️ Nenhum engine encontrado em {environment} (estrutura ainda não criada)")
-            return permissions_data
-            
-        for engine in engine_dirs:
-            engine_path = os.path.join(env_path, engine)
-            
-            # Percorrer bancos dentro de cada engine - apenas se existirem
+        for entry in entries:
             try:
-                database_dirs = [d for d in os.listdir(engine_path) if os.path.isdir(os.path.join(engine_path, d))]
-            except OSError:
-                print(f"⚠️ Erro ao acessar diretório {engine_path}")
-                continue
+                user_data = self.index.load_access(entry)
+                    
+                # Extrair email do usuário do arquivo ou nome do arquivo
+                user_email_data = user_data.get('user') or entry.user
                 
-            if not database_dirs:
-                print(f"ℹ️ Nenhum banco encontrado em {engine} (estrutura ainda não criada)")
-                continue
+                # Chave única para identificar banco: engine-database
+                db_key = f"{entry.engine}-{entry.database}"
                 
-            for database in database_dirs:
-                db_path = os.path.join(engine_path, database)
+                permissions_data[user_email_data][db_key] = {
+                    'engine': entry.engine,
+                    'database': entry.database,
+                    'host': user_data.get('host', ''),
+                    'port': user_data.get('port', ''),
+                    'region': user_data.get('region', ''),
+                    'schemas': list(user_data.schemas.values()),
+                    'metadata': user_data.get('metadata', {}),
+                    'file_path': entry.path,
+                    'environment': environment
+                }
                 
-                # Percorrer arquivos de usuários (formato: usuario@email.com.yml)
-                try:
-                    user_files = glob.glob(os.path.join(db_path, "*.yml"))
-                except OSError:
-                    print(f"⚠️ Erro ao acessar diretório {db_path}")
-                    continue
-                    
-                if not user_files:
-                    print(f"ℹ️ Nenhum usuário encontrado em {engine}/{database}")
-                    continue
-                    
-                for user_file in user_files:
-                    try:
-                        with open(user_file, 'r', encoding='utf-8') as f:
-                            user_data = yaml.safe_load(f)
-                            
-                        # Extrair email do usuário do arquivo ou nome do arquivo
-                        user_email = user_data.get('user')
-                        if not user_email:
-                            # Fallback: extrair do nome do arquivo
-                            user_email = os.path.basename(user_file).replace('.yml', '')
-                        
-                        # Chave única para identificar banco: engine-database
-                        db_key = f"{engine}-{database}"
-                        
-                        permissions_data[user_email][db_key] = {
-                            'engine': engine,
-                            'database': database,
-                            'host': user_data.get('host', ''),
-                            'port': user_data.get('port', ''),
-                            'region': user_data.get('region', ''),
-                            'schemas': user_data.get('schemas', []),
-                            'metadata': user_data.get('metadata', {}),
-                            'file_path': user_file,
-                            'environment': environment
-                        }
-                        
-                    except Exception as e:
-                        print(f"❌ Erro ao processar {user_file}: {e}")
+            except Exception as e:
+                print(f"❌ Erro ao processar {entry.path}: {e}")
                         
         return permissions_data
 
+    def load_users_permissions(self, users=None, database_name=None):
+        """Carrega de uma vez as permissões de vários usuários em todos os ambientes.
+
+        Retorna {ambiente: permissões por usuário}; sem users carrega todos.
+        Cada arquivo é interpretado uma única vez.
+        """
+        permissions_by_env = {}
+        for env in self.environments:
+            if users is None:
+                permissions_by_env[env] = self.load_user_permissions(env, database_name=database_name)
+                continue
+            permissions_data = defaultdict(lambda: defaultdict(dict))
+            for user_email in users:
+                permissions_data.update(self.load_user_permissions(env, user_email, database_name))
+            permissions_by_env[env] = permissions_data
+        return permissions_by_env
+
     def generate_user_all_permissions_report(self, user_email, output_format='html'):
         """Gera relatório completo de um usuário em todos os bancos."""
+        return self.render_report(self.build_user_all_permissions_data(user_email), output_format)
+
+    def build_user_all_permissions_data(self, user_email, permissions_by_env=None):
+        """Monta os dados do relatório completo de um usuário.
+
+        permissions_by_env (de load_users_permissions) evita reler a árvore
+        quando vários relatórios são gerados na mesma execução.
+        """
         user_report = {
             'user': user_email,
             'generated_at': datetime.now().isoformat(),
@@ -118,7 +127,10 @@ class AuditReportGenerator:
         engines_used = set()
         
         for env in self.environments:
-            permissions_data = self.load_user_permissions(env)
+            if permissions_by_env is not None:
+                permissions_data = permissions_by_env.get(env, {})
+            else:
+                permissions_data = self.load_user_permissions(env, user_email)
             user_permissions = permissions_data.get(user_email, {})
             
             if user_permissions:
@@ -135,8 +147,7 @@ class AuditReportGenerator:
                     
                     # Contar tabelas
                     for schema in schemas:
-                        tabelas = schema.get('tabelas', [])
-                        total_tables += len(tabelas)
+                        total_tables += len(schema.tables)
         
         user_report['summary'] = {
             'total_databases': total_databases,
@@ -146,13 +157,14 @@ class AuditReportGenerator:
             'engines_used': sorted(list(engines_used))
         }
         
-        if output_format == 'json':
-            return self._generate_json_report(user_report)
-        else:
-            return self._generate_html_report(user_report)
+        return user_report
 
     def generate_user_database_permissions_report(self, user_email, database_name, output_format='html'):
         """Gera relatório de um usuário em um banco específico."""
+        return self.render_report(self.build_user_database_permissions_data(user_email, database_name), output_format)
+
+    def build_user_database_permissions_data(self, user_email, database_name, permissions_by_env=None):
+        """Monta os dados do relatório de um usuário em um banco específico."""
         user_report = {
             'user': user_email,
             'database_filter': database_name,
@@ -164,7 +176,10 @@ class AuditReportGenerator:
         total_matches = 0
         
         for env in self.environments:
-            permissions_data = self.load_user_permissions(env)
+            if permissions_by_env is not None:
+                permissions_data = permissions_by_env.get(env, {})
+            else:
+                permissions_data = self.load_user_permissions(env, user_email, database_name)
             user_permissions = permissions_data.get(user_email, {})
             
             # Filtrar por banco específico
@@ -185,17 +200,29 @@ class AuditReportGenerator:
             'database_searched': database_name
         }
         
+        return user_report
+
+    def render_report(self, data, output_format='html'):
+        """Renderiza os dados de um relatório no formato pedido."""
+        return ''.join(self.iter_report(data, output_format))
+
+    def iter_report(self, data, output_format='html'):
+        """Renderiza o relatório em partes, para gravação direta no arquivo de saída."""
         if output_format == 'json':
-            return self._generate_json_report(user_report)
+            yield self._generate_json_report(data)
         else:
-            return self._generate_html_report(user_report)
+            yield from self.iter_html_report(data)
 
     def _generate_json_report(self, data):
         """Gera relatório em formato JSON."""
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return json.dumps(data, indent=2, ensure_ascii=False, default=json_default)
 
     def _generate_html_report(self, data):
         """Gera relatório em formato HTML melhorado."""
+        return ''.join(self.iter_html_report(data))
+
+    def iter_html_report(self, data):
+        """Gera o relatório HTML em partes: início do template, seções e rodapé."""
         html_template = """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
@@ -478,18 +505,23 @@ class AuditReportGenerator:
 </body>
 </html>"""
         
-        content = self._generate_html_content(data)
         report_type_label = "Todas as Permissões" if data.get('report_type') == 'all_permissions' else f"Banco Específico: {data.get('database_filter', 'N/A')}"
+        html_head, html_footer = html_template.split("{content}")
         
-        return html_template.format(
+        yield html_head.format(
             user=data.get('user', 'N/A'),
             generated_at=datetime.fromisoformat(data.get('generated_at')).strftime('%d/%m/%Y às %H:%M:%S'),
-            report_type_label=report_type_label,
-            content=content
+            report_type_label=report_type_label
         )
+        yield from self._iter_html_content(data)
+        yield html_footer.format()
 
     def _generate_html_content(self, data):
         """Gera o conteúdo HTML específico para relatórios de usuário."""
+        return ''.join(self._iter_html_content(data))
+
+    def _iter_html_content(self, data):
+        """Gera o conteúdo HTML em partes: resumo, e uma linha da tabela por banco."""
         user_email = data.get('user', 'N/A')
         environments = data.get('environments', {})
         summary = data.get('summary', {})
@@ -540,10 +572,11 @@ class AuditReportGenerator:
             """
         
         content += "</div>"
+        yield content
         
         # Gerar seções por ambiente
         if not environments:
-            content += """
+            yield """
             <div class="no-data">
                 <h3>📭 Nenhuma permissão encontrada</h3>
                 <p>Este usuário não possui permissões configuradas ou o filtro não retornou resultados.</p>
@@ -552,7 +585,7 @@ class AuditReportGenerator:
         else:
             for env_name, env_data in environments.items():
                 if env_data.get('total_databases', 0) > 0:
-                    content += f"""
+                    yield f"""
                     <div class="environment-section">
                         <div class="environment-header {env_name}">
                             🌍 Ambiente: {env_name.upper()}
@@ -581,9 +614,9 @@ class AuditReportGenerator:
                         schemas_html = ""
                         if schemas:
                             for schema in schemas:
-                                schema_name = schema.get('nome', 'N/A')
-                                permissions = schema.get('permissions', [])
-                                tabelas = schema.get('tabelas', [])
+                                schema_name = schema.name
+                                permissions = schema.permission_names
+                                tabelas = schema.tables.values()
                                 
                                 permissions_badges = ''.join([
                                     f'<span class="permission-badge">{perm}</span>' 
@@ -595,8 +628,8 @@ class AuditReportGenerator:
                                 if tabelas:
                                     tables_html = "<div style='margin-top: 10px; padding-left: 15px;'>"
                                     for tabela in tabelas:
-                                        table_name = tabela.get('nome', 'N/A')
-                                        table_permissions = tabela.get('permissions', [])
+                                        table_name = tabela.name
+                                        table_permissions = tabela.permission_names
                                         
                                         table_permissions_badges = ''.join([
                                             f'<span class="permission-badge" style="background: linear-gradient(135deg, #6f42c1 0%, #e83e8c 100%); font-size: 0.7em;">{perm}</span>' 
@@ -621,7 +654,7 @@ class AuditReportGenerator:
                         else:
                             schemas_html = '<div class="schema-item">Nenhum schema configurado</div>'
                         
-                        content += f"""
+                        yield f"""
                                 <tr>
                                     <td>
                                         <span class="engine-badge engine-{engine}">{engine}</span>
@@ -636,48 +669,139 @@ class AuditReportGenerator:
                                 </tr>
                         """
                     
-                    content += """
+                    yield """
                             </tbody>
                         </table>
                     </div>
                     """
-        
-        return content
+
+def read_users_file(file_path):
+    """Lê a lista de emails (um por linha; linhas vazias e # são ignoradas)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        users = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+    return list(dict.fromkeys(users))
+
+def report_filename(user_email, output_format):
+    """Nome do arquivo do relatório de um usuário dentro do diretório/zip de saída."""
+    return re.sub(r'[^\w@.+-]', '_', user_email) + f".{output_format}"
+
+def _render_report_job(job):
+    """Monta e renderiza o relatório de um usuário em um processo do pool.
+
+    Recebe apenas as permissões do próprio usuário por ambiente, então cada
+    processo monta os dados e renderiza sem reler a árvore.
+    """
+    user_email, user_permissions_by_env, database_name, output_format = job
+    generator = AuditReportGenerator()
+    if database_name:
+        data = generator.build_user_database_permissions_data(user_email, database_name, user_permissions_by_env)
+    else:
+        data = generator.build_user_all_permissions_data(user_email, user_permissions_by_env)
+    return user_email, generator.render_report(data, output_format)
+
+def generate_users_reports(generator, users, output, output_format='html', database_name=None, workers=None):
+    """Gera o relatório de cada usuário carregando a árvore uma única vez.
+
+    A montagem e a renderização de cada relatório rodam em um pool de
+    processos; a saída é um diretório ou, se output terminar em .zip, um
+    único arquivo zip. Retorna a quantidade de relatórios gerados.
+    """
+    permissions_by_env = generator.load_users_permissions(users, database_name)
+    if users is None:
+        users = generator.index.users()
+
+    jobs = [
+        (user_email,
+         {env: {user_email: dict(permissions_data.get(user_email, {}))}
+          for env, permissions_data in permissions_by_env.items()},
+         database_name, output_format)
+        for user_email in users
+    ]
+
+    total = len(jobs)
+    step = max(1, total // 20)
+    workers = workers or os.cpu_count() or 1
+
+    archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) if output.endswith('.zip') else None
+    if archive is None:
+        os.makedirs(output, exist_ok=True)
+
+    def write(done, user_email, content):
+        name = report_filename(user_email, output_format)
+        if archive is not None:
+            archive.writestr(name, content)
+        else:
+            with open(os.path.join(output, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        if done % step == 0 or done == total:
+            print(f"📊 Progresso: {done}/{total} relatório(s)", flush=True)
+
+    try:
+        if workers > 1 and total > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(_render_report_job, jobs, chunksize=max(1, total // (workers * 4)))
+                for done, (user_email, content) in enumerate(results, 1):
+                    write(done, user_email, content)
+        else:
+            for done, job in enumerate(jobs, 1):
+                write(done, *_render_report_job(job))
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return total
 
 def main():
     """Função principal do script."""
     parser = argparse.ArgumentParser(description="Gerador de Relatórios de Auditoria")
-    parser.add_argument("--user", required=True, help="Email do usuário")
+    users_group = parser.add_mutually_exclusive_group(required=True)
+    users_group.add_argument("--user", help="Email do usuário")
+    users_group.add_argument("--users-file", help="Arquivo com um email por linha (um relatório por usuário)")
+    users_group.add_argument("--all-users", action="store_true", help="Gerar um relatório para cada usuário da árvore")
     parser.add_argument("--database", help="Nome do banco específico (opcional)")
-    parser.add_argument("--output", help="Arquivo de saída (opcional)")
+    parser.add_argument("--output", help="Arquivo de saída (opcional; .gz grava compactado); com vários usuários, diretório ou arquivo .zip")
     parser.add_argument("--format", choices=['html', 'json'], default='html', help="Formato de saída (html ou json)")
+    parser.add_argument("--workers", type=int, help="Processos de renderização com vários usuários (padrão: CPUs)")
+    parser.add_argument("--no-cache", action="store_true", help="Não usar o cache de leitura dos arquivos YAML")
     
     args = parser.parse_args()
     
-    generator = AuditReportGenerator()
+    cache = open_cache(not args.no_cache)
+    generator = AuditReportGenerator(cache=cache)
     
     try:
+        if args.users_file or args.all_users:
+            users = read_users_file(args.users_file) if args.users_file else None
+            output = args.output or "relatorios-auditoria"
+            print(f"🔍 Gerando relatórios {args.format.upper()} por usuário em {output}")
+            total = generate_users_reports(generator, users, output, args.format, args.database, args.workers)
+            print(f"✅ {total} relatório(s) salvo(s) em: {output}")
+            return
+        
         # Determinar tipo de relatório (apenas imprimir se não for JSON para stdout)
         if args.database:
             if args.format != 'json' or args.output:
                 print(f"🔍 Gerando relatório específico para usuário {args.user} no banco {args.database}")
-            report = generator.generate_user_database_permissions_report(args.user, args.database, args.format)
+            data = generator.build_user_database_permissions_data(args.user, args.database)
         else:
             if args.format != 'json' or args.output:
                 print(f"🔍 Gerando relatório completo para usuário {args.user}")
-            report = generator.generate_user_all_permissions_report(args.user, args.format)
+            data = generator.build_user_all_permissions_data(args.user)
         
         # Salvar ou imprimir relatório
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(report)
+            with open_output(args.output) as f:
+                write_chunks(f, generator.iter_report(data, args.format))
             print(f"✅ Relatório {args.format.upper()} salvo em: {args.output}")
         else:
-            print(report)
+            print(generator.render_report(data, args.format))
             
     except Exception as e:
         print(f"❌ Erro ao gerar relatório: {e}")
         sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
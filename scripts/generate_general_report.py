@@ -8,140 +8,383 @@ import os
 import sys
 import yaml
 import json
+import re
 import argparse
 from datetime import datetime
 from collections import defaultdict
-import glob
+from concurrent.futures import ProcessPoolExecutor
+
+from grant_model import UserAccess
+from yaml_cache import open_cache, load_yaml
+from permission_index import PermissionIndex, entry_for_path
+from permission_records import iter_permission_records
+from report_output import open_output, write_chunks
+from permission_stats import PermissionStats, PermissionEntry
+from report_state import DEFAULT_STATE_PATH, ReportState, load_state, save_state, git_head, has_local_changes, changed_files
 
 if sys.platform == "win32":
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
 
+HTML_FOOTER = """
+        </div>
+        
+        <div class="footer">
+            <p><strong>Database Access Control System</strong></p>
+            <p>Relatório gerado automaticamente • Confidencial</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+INDEX_FILENAME = "index.html"
+
+DEFAULT_USERS_PER_PAGE = 200
+
+def page_filename(environment, engine, database, page):
+    """Nome do arquivo de uma página do relatório paginado."""
+    return re.sub(r'[^\w.+-]', '_', f"{environment}-{engine}-{database}") + f"-{page:03d}.html"
+
+def _write_page_job(job):
+    """Grava uma página do relatório paginado em um processo do pool."""
+    output_dir, page, previous_file, next_file = job
+    page_file = os.path.join(output_dir, page['filename'])
+    with open_output(page_file) as f:
+        write_chunks(f, GeneralReportGenerator().iter_page_html(page, previous_file, next_file))
+    return os.path.getsize(page_file)
+
 class GeneralReportGenerator:
-    def __init__(self, base_path="users-access-requests"):
+    def __init__(self, base_path="users-access-requests", cache=None, state_path=None):
         self.base_path = base_path
         self.environments = ["development", "staging", "production"]
+        self.cache = cache
+        self.state_path = state_path
+        self.permission_stats = None
+        self.report_stats = None
         
     def load_all_permissions(self):
-        """Carrega todas as permissões de todos os usuários em todos os ambientes."""
+        """Carrega todas as permissões de todos os usuários em todos os ambientes.
+
+        As estatísticas são acumuladas durante a carga em self.permission_stats.
+        """
         all_data = {}
+        self.permission_stats = PermissionStats()
+        index = PermissionIndex(self.base_path, self.environments, self.cache)
         
         for environment in self.environments:
-            env_path = os.path.join(self.base_path, environment)
-            if not os.path.exists(env_path):
-                continue
-                
             env_data = {}
             
-            try:
-                engine_dirs = [d for d in os.listdir(env_path) 
-                             if os.path.isdir(os.path.join(env_path, d)) and d != "audit"]
-            except OSError:
-                continue
-                
-            for engine in engine_dirs:
-                engine_path = os.path.join(env_path, engine)
-                
+            for entry in index.entries_for_environment(environment):
                 try:
-                    database_dirs = [d for d in os.listdir(engine_path) 
-                                   if os.path.isdir(os.path.join(engine_path, d))]
-                except OSError:
-                    continue
+                    user_email, db_key, db_info = self._load_entry(entry)
                     
-                for database in database_dirs:
-                    db_path = os.path.join(engine_path, database)
+                    if user_email not in env_data:
+                        env_data[user_email] = {}
                     
-                    try:
-                        user_files = glob.glob(os.path.join(db_path, "*.yml"))
-                    except OSError:
-                        continue
+                    previous = env_data[user_email].get(db_key)
+                    if previous is not None:
+                        self.permission_stats.remove(PermissionEntry(environment, user_email, db_key, previous))
                         
-                    for user_file in user_files:
-                        try:
-                            with open(user_file, 'r', encoding='utf-8') as f:
-                                user_data = yaml.safe_load(f)
-                                
-                            user_email = user_data.get('usuario', {}).get('email')
-                            if not user_email:
-                                user_email = os.path.basename(user_file).replace('.yml', '')
-                            
-                            db_key = f"{engine}-{database}"
-                            
-                            if user_email not in env_data:
-                                env_data[user_email] = {}
-                                
-                            env_data[user_email][db_key] = {
-                                'engine': engine,
-                                'database': database,
-                                'user_info': user_data.get('usuario', {}),
-                                'database_info': user_data.get('database', {}),
-                                'schemas': user_data.get('schemas', []),
-                                'solicitacao': user_data.get('solicitacao', {}),
-                                'file_path': user_file
-                            }
-                            
-                        except Exception as e:
-                            print(f"❌ Erro ao processar {user_file}: {e}")
+                    env_data[user_email][db_key] = db_info
+                    self.permission_stats.add(PermissionEntry(environment, user_email, db_key, db_info))
+                    
+                except Exception as e:
+                    print(f"❌ Erro ao processar {entry.path}: {e}")
             
             if env_data:
                 all_data[environment] = env_data
+        
+        if self.cache is not None:
+            self.cache.prune(self.base_path)
                 
         return all_data
 
-    def generate_general_html_report(self, output_file="relatorio-geral.html"):
-        """Gera relatório HTML geral."""
-        all_data = self.load_all_permissions()
+    def _load_entry(self, entry):
+        """Interpreta o arquivo de uma entrada do índice; retorna (email, chave do banco, dados do banco)."""
+        user_data = UserAccess.from_dict(load_yaml(entry.path, self.cache))
+            
+        user_email = user_data.get('usuario', {}).get('email')
+        if not user_email:
+            user_email = entry.user
+        
+        db_key = f"{entry.engine}-{entry.database}"
+        
+        return user_email, db_key, {
+            'engine': entry.engine,
+            'database': entry.database,
+            'user_info': user_data.get('usuario', {}),
+            'database_info': user_data.get('database', {}),
+            'schemas': list(user_data.schemas.values()),
+            'solicitacao': user_data.get('solicitacao', {}),
+            'file_path': entry.path
+        }
+
+    def load_report_data(self):
+        """Carrega as permissões e as estatísticas (incrementalmente se houver state_path).
+
+        As estatísticas também ficam em self.report_stats.
+        """
+        if self.state_path:
+            state = self.load_incremental_state()
+            all_data, self.report_stats = state.ordered_data(), state.stats()
+        else:
+            all_data = self.load_all_permissions()
+            self.report_stats = self.permission_stats.as_report_stats(self.environments)
+        return all_data, self.report_stats
+
+    def load_incremental_state(self):
+        """Atualiza o estado salvo em state_path com os arquivos alterados desde o seu commit.
+
+        Sem estado compatível, com o commit anterior indisponível ou com
+        alterações locais não commitadas, carrega toda a árvore. O estado
+        resultante é salvo com o commit atual.
+        """
+        head = git_head()
+        dirty = has_local_changes(self.base_path)
+        state = load_state(self.state_path, self.base_path, self.environments)
+        
+        changes = None
+        if state is not None and state.commit and head and not dirty:
+            changes = changed_files(state.commit, self.base_path)
+        
+        if changes is None:
+            print("🔄 Estado incremental indisponível; carregando toda a árvore...")
+            state = ReportState(self.base_path, self.environments)
+            index = PermissionIndex(self.base_path, self.environments, self.cache)
+            entries = index.entries
+        else:
+            print(f"⚡ Modo incremental: {len(changes)} arquivo(s) alterado(s) desde {state.commit[:12]}")
+            entries = []
+            for status, path in changes:
+                state.remove_file(path)
+                entry = entry_for_path(path, self.base_path, self.environments)
+                if status != 'D' and entry is not None and os.path.isfile(path):
+                    entries.append(entry)
+        
+        for entry in entries:
+            try:
+                state.add(entry.environment, *self._load_entry(entry))
+            except Exception as e:
+                print(f"❌ Erro ao processar {entry.path}: {e}")
         
-        stats = self._calculate_stats(all_data)
+        # Com alterações locais o estado não corresponde a nenhum commit
+        state.commit = None if dirty else head
+        save_state(self.state_path, state)
         
-        html_content = self._generate_html_template(all_data, stats)
+        return state
+
+    def generate_general_html_report(self, output_file="relatorio-geral.html"):
+        """Gera relatório HTML geral."""
+        all_data, stats = self.load_report_data()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with open_output(output_file) as f:
+            write_chunks(f, self.iter_html_report(all_data, stats))
             
         return output_file, os.path.getsize(output_file)
     
-    def _calculate_stats(self, data):
-        """Calcula estatísticas gerais."""
-        stats = {
-            'total_users': set(),
-            'total_databases': set(),
-            'total_environments': len(data),
-            'engines': set(),
-            'permissions_by_env': {},
-            'users_by_dept': defaultdict(int),
-            'databases_by_engine': defaultdict(int)
-        }
+    def generate_ndjson_report(self, output_file="relatorio-geral.ndjson"):
+        """Exporta as permissões em NDJSON, um registro por (ambiente, usuário, banco, schema, tabela, privilégio).
+
+        Cada arquivo YAML é lido e gravado antes do próximo, sem montar a
+        árvore em memória. Com output_file "-" os registros vão para stdout.
+        Retorna o número de registros gravados.
+        """
+        index = PermissionIndex(self.base_path, self.environments, self.cache)
         
-        for env, env_data in data.items():
-            stats['permissions_by_env'][env] = len(env_data)
-            
-            for user, databases in env_data.items():
-                stats['total_users'].add(user)
-                
+        if output_file == '-':
+            total = self._write_ndjson(sys.stdout, index)
+            sys.stdout.flush()
+        else:
+            with open_output(output_file) as f:
+                total = self._write_ndjson(f, index)
+        
+        if self.cache is not None:
+            self.cache.prune(self.base_path)
+        
+        return total
+
+    def _write_ndjson(self, output, index):
+        """Grava uma linha JSON por registro de permissão; retorna o total de registros."""
+        total = 0
+        for record in iter_permission_records(index, self.environments):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            total += 1
+        return total
+
+    def generate_sharded_html_report(self, output_dir="relatorio-geral", users_per_page=DEFAULT_USERS_PER_PAGE, workers=None):
+        """Gera o relatório geral paginado: um índice e páginas por ambiente/engine/banco.
+
+        Cada página tem no máximo users_per_page usuários, então o tamanho dos
+        arquivos não depende do total de usuários. As páginas são gravadas em
+        paralelo (pool de processos). Retorna (caminho do índice, total de arquivos).
+        """
+        all_data, stats = self.load_report_data()
+        pages = self.plan_pages(all_data, users_per_page)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = [
+            (output_dir, page,
+             pages[i - 1]['filename'] if i > 0 else None,
+             pages[i + 1]['filename'] if i + 1 < len(pages) else None)
+            for i, page in enumerate(pages)
+        ]
+        
+        total = len(jobs)
+        step = max(1, total // 20)
+        workers = workers or os.cpu_count() or 1
+        
+        if workers > 1 and total > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(_write_page_job, jobs, chunksize=max(1, total // (workers * 4)))
+                for done, _ in enumerate(results, 1):
+                    if done % step == 0 or done == total:
+                        print(f"📊 Progresso: {done}/{total} página(s)", flush=True)
+        else:
+            for done, job in enumerate(jobs, 1):
+                _write_page_job(job)
+                if done % step == 0 or done == total:
+                    print(f"📊 Progresso: {done}/{total} página(s)", flush=True)
+        
+        index_file = os.path.join(output_dir, INDEX_FILENAME)
+        with open_output(index_file) as f:
+            write_chunks(f, self.iter_index_html(stats, pages))
+        
+        return index_file, total + 1
+
+    def plan_pages(self, data, users_per_page=DEFAULT_USERS_PER_PAGE):
+        """Divide as permissões em páginas por ambiente/engine/banco com até users_per_page usuários cada."""
+        if users_per_page < 1:
+            raise ValueError("users_per_page deve ser maior que zero")
+        
+        pages = []
+        for env_name, env_data in data.items():
+            groups = defaultdict(dict)
+            for user_email, databases in env_data.items():
                 for db_key, db_info in databases.items():
-                    stats['total_databases'].add(db_key)
-                    stats['engines'].add(db_info['engine'])
-                    stats['databases_by_engine'][db_info['engine']] += 1
-                    
-                    dept = db_info.get('user_info', {}).get('departamento', 'Não informado')
-                    stats['users_by_dept'][dept] += 1
+                    groups[(db_info['engine'], db_info['database'])][user_email] = {db_key: db_info}
+            
+            for (engine, database), users in sorted(groups.items()):
+                user_emails = list(users)
+                chunks = range(0, len(user_emails), users_per_page)
+                for number, start in enumerate(chunks, 1):
+                    pages.append({
+                        'environment': env_name,
+                        'engine': engine,
+                        'database': database,
+                        'page': number,
+                        'pages': len(chunks),
+                        'filename': page_filename(env_name, engine, database, number),
+                        'users': {email: users[email] for email in user_emails[start:start + users_per_page]}
+                    })
+        return pages
+
+    def iter_page_html(self, page, previous_file=None, next_file=None):
+        """Gera uma página do relatório paginado, com links para o índice e páginas vizinhas."""
+        scope = f"{page['environment'].upper()} • {page['engine']} / {page['database']}"
+        nav = self._generate_page_nav(previous_file, next_file)
+        
+        yield self._generate_document_start(
+            f"Relatório Geral - {scope} ({page['page']}/{page['pages']})",
+            f"{scope} • Página {page['page']} de {page['pages']}"
+        )
+        yield nav
+        yield from self._iter_environment_section(page['environment'], page['users'])
+        yield nav
+        yield HTML_FOOTER
+
+    def iter_index_html(self, stats, pages):
+        """Gera o índice do relatório paginado: resumo executivo e links para as páginas."""
+        yield self._generate_document_start(report_type_label="Relatório Consolidado de Todos os Usuários (Paginado)")
+        yield self._generate_summary(stats)
+        
+        if not pages:
+            yield from self._iter_environments_content({})
         
-        stats['total_users'] = len(stats['total_users'])
-        stats['total_databases'] = len(stats['total_databases'])
-        stats['engines'] = list(stats['engines'])
+        by_environment = defaultdict(lambda: defaultdict(list))
+        for page in pages:
+            by_environment[page['environment']][(page['engine'], page['database'])].append(page)
         
-        return stats
+        for env_name, databases in by_environment.items():
+            yield f"""
+                <div class="environment-section">
+                    <div class="environment-header {env_name}">
+                        🌍 Ambiente: {env_name.upper()}
+                        <span style="margin-left: auto; font-size: 0.9em;">
+                            {len(databases)} banco(s) • {stats['permissions_by_env'].get(env_name, 0)} usuário(s)
+                        </span>
+                    </div>
+                    <table class="database-table">
+                        <thead>
+                            <tr>
+                                <th>Engine</th>
+                                <th>Banco de Dados</th>
+                                <th>Usuários</th>
+                                <th>Páginas</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                    """
+            for (engine, database), db_pages in databases.items():
+                total_users = sum(len(page['users']) for page in db_pages)
+                links = ' '.join(
+                    f'<a href="{page["filename"]}">{page["page"]}</a>' for page in db_pages
+                )
+                yield f"""
+                            <tr>
+                                <td>
+                                    <span class="engine-badge engine-{engine}">{engine}</span>
+                                </td>
+                                <td><strong>{database}</strong></td>
+                                <td>{total_users}</td>
+                                <td>{links}</td>
+                            </tr>
+                    """
+            yield """
+                        </tbody>
+                    </table>
+                </div>
+                """
+
+    def _generate_page_nav(self, previous_file, next_file):
+        """Gera a navegação entre as páginas do relatório paginado."""
+        links = [f'<a href="{INDEX_FILENAME}">🏠 Índice</a>']
+        if previous_file:
+            links.append(f'<a href="{previous_file}">← Página anterior</a>')
+        if next_file:
+            links.append(f'<a href="{next_file}">Próxima página →</a>')
+        return f"""
+            <div class="page-nav" style="display: flex; gap: 20px; margin: 15px 0;">
+                {' '.join(links)}
+            </div>
+            """
+
+    def _calculate_stats(self, data):
+        """Calcula estatísticas gerais."""
+        return PermissionStats.from_data(data).as_report_stats(self.environments)
     
     def _generate_html_template(self, data, stats):
         """Gera template HTML completo com o mesmo layout do generate_audit_reports.py."""
+        return ''.join(self.iter_html_report(data, stats))
+
+    def iter_html_report(self, data, stats):
+        """Gera o relatório HTML em partes, na ordem em que devem ser gravadas."""
+        yield self._generate_html_head(stats)
+        yield from self._iter_environments_content(data)
+        yield HTML_FOOTER
+
+    def _generate_html_head(self, stats):
+        """Gera o início do documento: estilos, cabeçalho e resumo executivo."""
+        return self._generate_document_start() + self._generate_summary(stats)
+
+    def _generate_document_start(self, title="Relatório Geral de Permissões", report_type_label="Relatório Consolidado de Todos os Usuários"):
+        """Gera o início do documento (estilos e cabeçalho) até a abertura do conteúdo."""
         return f"""<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Relatório Geral de Permissões - Database Access Control</title>
+    <title>{title} - Database Access Control</title>
     <style>
         * {{
             margin: 0;
@@ -421,12 +664,16 @@ class GeneralReportGenerator:
             <div class="subtitle">Database Access Control System</div>
             <div class="meta">
                 <strong>Gerado em:</strong> {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}<br>
-                <strong>Tipo:</strong> Relatório Consolidado de Todos os Usuários
+                <strong>Tipo:</strong> {report_type_label}
             </div>
         </div>
         
         <div class="content">
-            <div class="user-info">
+"""
+
+    def _generate_summary(self, stats):
+        """Gera o resumo executivo com os cartões de estatísticas."""
+        return f"""            <div class="user-info">
                 <h2>📊 Resumo Executivo</h2>
                 <div class="stats-grid">
                     <div class="stat-card">
@@ -449,18 +696,7 @@ class GeneralReportGenerator:
                 {self._generate_engines_info(stats)}
             </div>
             
-            {self._generate_environments_content(data)}
-        </div>
-        
-        <div class="footer">
-            <p><strong>Database Access Control System</strong></p>
-            <p>Relatório gerado automaticamente • Confidencial</p>
-        </div>
-    </div>
-</body>
-</html>"""
-        
-        return html_template
+            """
 
     def _generate_engines_info(self, stats):
         """Gera informações sobre os engines utilizados."""
@@ -471,19 +707,26 @@ class GeneralReportGenerator:
 
     def _generate_environments_content(self, data):
         """Gera conteúdo das seções por ambiente usando layout de tabela."""
-        content = ""
-        
+        return ''.join(self._iter_environments_content(data))
+
+    def _iter_environments_content(self, data):
+        """Gera as seções por ambiente em partes (uma linha da tabela por vez)."""
         if not data:
-            return """
+            yield """
             <div class="no-data">
                 <h3>📭 Nenhuma permissão encontrada</h3>
                 <p>Não foram encontradas configurações de permissões no sistema.</p>
             </div>
             """
+            return
         
         for env_name, env_data in data.items():
             if env_data:
-                content += f"""
+                yield from self._iter_environment_section(env_name, env_data)
+
+    def _iter_environment_section(self, env_name, env_data):
+        """Gera a seção de um ambiente com a tabela dos usuários informados."""
+        yield f"""
                 <div class="environment-section">
                     <div class="environment-header {env_name}">
                         🌍 Ambiente: {env_name.upper()}
@@ -491,15 +734,19 @@ class GeneralReportGenerator:
                             {len(env_data)} usuário(s)
                         </span>
                     </div>
-                    {self._generate_users_table_content(env_data)}
+                    """
+        yield from self._iter_users_table_content(env_data)
+        yield """
                 </div>
                 """
-        
-        return content
     
     def _generate_users_table_content(self, users_data):
         """Gera conteúdo em formato de tabela para usuários."""
-        content = """
+        return ''.join(self._iter_users_table_content(users_data))
+
+    def _iter_users_table_content(self, users_data):
+        """Gera a tabela de usuários em partes: cabeçalho, uma linha por banco e rodapé."""
+        yield """
         <table class="database-table">
             <thead>
                 <tr>
@@ -519,54 +766,26 @@ class GeneralReportGenerator:
             user_dept = user_info.get('departamento', 'N/A')
             
             for db_key, db_info in databases.items():
-                engine = db_info['engine']
-                database = db_info['database']
-                host = db_info.get('database_info', {}).get('host', 'N/A') if isinstance(db_info.get('database_info'), dict) else 'N/A'
-                schemas = db_info.get('schemas', [])
-                
-                schemas_html = ""
-                if schemas:
-                    for schema in schemas:
-                        schema_name = schema.get('nome', 'N/A')
-                        permissions = schema.get('permissions', [])
-                        tabelas = schema.get('tabelas', [])
-                        
-                        permissions_badges = ''.join([
-                            f'<span class="permission-badge">{perm}</span>' 
-                            for perm in permissions
-                        ])
-                        
-                        tables_html = ""
-                        if tabelas:
-                            tables_html = "<div style='margin-top: 10px; padding-left: 15px;'>"
-                            for tabela in tabelas:
-                                table_name = tabela.get('nome', 'N/A')
-                                table_permissions = tabela.get('permissions', [])
-                                
-                                table_permissions_badges = ''.join([
-                                    f'<span class="permission-badge" style="background: linear-gradient(135deg, #6f42c1 0%, #e83e8c 100%); font-size: 0.7em;">{perm}</span>' 
-                                    for perm in table_permissions
-                                ])
-                                
-                                tables_html += f"""
-                                <div style="margin: 5px 0; padding: 8px; background: #f1f3f4; border-radius: 6px; border-left: 3px solid #6f42c1;">
-                                    <div style="font-weight: 600; color: #6f42c1; font-size: 0.85em;">🗂️ {table_name}</div>
-                                    <div style="margin-top: 4px;">{table_permissions_badges}</div>
-                                </div>
-                                """
-                            tables_html += "</div>"
-                        
-                        schemas_html += f"""
-                        <div class="schema-item">
-                            <div class="schema-name">📊 {schema_name}</div>
-                            <div>{permissions_badges}</div>
-                            {tables_html}
-                        </div>
-                        """
-                else:
-                    schemas_html = '<div class="schema-item">Nenhum schema configurado</div>'
-                
-                content += f"""
+                yield self._generate_user_row(user_email, user_name, user_dept, db_info)
+        
+        yield """
+            </tbody>
+        </table>
+        """
+
+    def _generate_user_row(self, user_email, user_name, user_dept, db_info):
+        """Gera a linha da tabela de um usuário em um banco."""
+        engine = db_info['engine']
+        database = db_info['database']
+        host = db_info.get('database_info', {}).get('host', 'N/A') if isinstance(db_info.get('database_info'), dict) else 'N/A'
+        schemas = db_info.get('schemas', [])
+        
+        if schemas:
+            schemas_html = ''.join(self._generate_schema_item(schema) for schema in schemas)
+        else:
+            schemas_html = '<div class="schema-item">Nenhum schema configurado</div>'
+        
+        return f"""
                 <tr>
                     <td>
                         <strong>👤 {user_name}</strong><br>
@@ -585,29 +804,127 @@ class GeneralReportGenerator:
                     </td>
                 </tr>
                 """
+
+    def _generate_schema_item(self, schema):
+        """Gera o bloco de um schema (SchemaGrant) com suas permissões e tabelas."""
+        schema_name = schema.name
+        permissions = schema.permission_names
+        tabelas = schema.tables.values()
+        
+        permissions_badges = ''.join([
+            f'<span class="permission-badge">{perm}</span>' 
+            for perm in permissions
+        ])
+        
+        tables_html = ""
+        if tabelas:
+            tables_html = "<div style='margin-top: 10px; padding-left: 15px;'>" + ''.join(
+                self._generate_table_item(tabela) for tabela in tabelas
+            ) + "</div>"
+        
+        return f"""
+                        <div class="schema-item">
+                            <div class="schema-name">📊 {schema_name}</div>
+                            <div>{permissions_badges}</div>
+                            {tables_html}
+                        </div>
+                        """
+
+    def _generate_table_item(self, tabela):
+        """Gera o bloco de uma tabela (TableGrant) com suas permissões."""
+        table_name = tabela.name
+        table_permissions = tabela.permission_names
         
-        content += """
-            </tbody>
-        </table>
-        """
+        table_permissions_badges = ''.join([
+            f'<span class="permission-badge" style="background: linear-gradient(135deg, #6f42c1 0%, #e83e8c 100%); font-size: 0.7em;">{perm}</span>' 
+            for perm in table_permissions
+        ])
         
-        return content
+        return f"""
+                                <div style="margin: 5px 0; padding: 8px; background: #f1f3f4; border-radius: 6px; border-left: 3px solid #6f42c1;">
+                                    <div style="font-weight: 600; color: #6f42c1; font-size: 0.85em;">🗂️ {table_name}</div>
+                                    <div style="margin-top: 4px;">{table_permissions_badges}</div>
+                                </div>
+                                """
 
 def main():
     parser = argparse.ArgumentParser(description='Gerador de Relatório Geral')
-    parser.add_argument('--output', default='relatorio-geral.html', 
-                       help='Arquivo de saída HTML')
+    parser.add_argument('--format', choices=['html', 'ndjson'], default='html',
+                       help='Formato de saída: html ou ndjson (um registro por privilégio)')
+    parser.add_argument('--output',
+                       help='Arquivo de saída (padrão: relatorio-geral.html ou .ndjson; terminado em .gz '
+                            'para gravar compactado; "-" grava o NDJSON em stdout)')
+    parser.add_argument('--sharded-dir',
+                       help='Gerar o relatório paginado neste diretório (índice + páginas por ambiente/engine/banco)')
+    parser.add_argument('--users-per-page', type=int, default=DEFAULT_USERS_PER_PAGE,
+                       help=f'Usuários por página no relatório paginado (padrão: {DEFAULT_USERS_PER_PAGE})')
+    parser.add_argument('--workers', type=int,
+                       help='Processos de gravação das páginas (padrão: CPUs)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Não usar o cache de leitura dos arquivos YAML')
+    parser.add_argument('--stats-output',
+                       help='Gravar também as estatísticas (JSON), incluindo privilégios por ambiente, '
+                            'tabelas por usuário e usuários com ALL PRIVILEGES')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Reaproveitar o estado da execução anterior e aplicar apenas os arquivos alterados (git diff)')
+    parser.add_argument('--state-file', default=DEFAULT_STATE_PATH,
+                       help=f'Arquivo do estado incremental (padrão: {DEFAULT_STATE_PATH})')
     
     args = parser.parse_args()
     
-    generator = GeneralReportGenerator()
+    if args.users_per_page < 1:
+        parser.error('--users-per-page deve ser maior que zero')
+    if args.sharded_dir and args.format != 'html':
+        parser.error('--sharded-dir gera apenas HTML')
+    if args.output == '-' and args.format != 'ndjson':
+        parser.error('--output - é suportado apenas com --format ndjson')
+    if args.incremental and args.format != 'html':
+        parser.error('--incremental é suportado apenas com --format html')
+    if args.stats_output and args.format != 'html':
+        parser.error('--stats-output é suportado apenas com --format html')
+    
+    output = args.output or f"relatorio-geral.{args.format}"
+    # Com NDJSON em stdout as mensagens iriam misturadas aos registros
+    quiet = output == '-'
+    
+    cache = open_cache(not args.no_cache)
+    generator = GeneralReportGenerator(cache=cache, state_path=args.state_file if args.incremental else None)
+    
+    if not quiet:
+        print("🔍 Gerando relatório geral de todos os usuários...")
+    
+    try:
+        if args.sharded_dir:
+            index_file, total_files = generator.generate_sharded_html_report(args.sharded_dir, args.users_per_page, args.workers)
+        elif args.format == 'ndjson':
+            total_records = generator.generate_ndjson_report(output)
+        else:
+            output_file, file_size = generator.generate_general_html_report(output)
+    except BrokenPipeError:
+        # O leitor do pipe (ex.: head) encerrou antes do fim da exportação
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    if args.stats_output:
+        with open(args.stats_output, 'w', encoding='utf-8') as f:
+            json.dump(generator.report_stats, f, indent=2, ensure_ascii=False)
+        print(f"📊 Estatísticas salvas em: {args.stats_output}")
     
-    print("🔍 Gerando relatório geral de todos os usuários...")
+    if args.sharded_dir:
+        print(f"✅ Relatório paginado salvo em: {args.sharded_dir} ({total_files} arquivo(s))")
+        print(f"🏠 Índice: {index_file}")
+        return
     
-    output_file, file_size = generator.generate_general_html_report(args.output)
+    if args.format == 'ndjson':
+        if not quiet:
+            print(f"✅ {total_records} registro(s) NDJSON salvo(s) em: {output}")
+        return
     
     print(f"✅ Relatório HTML geral salvo em: {output_file}")
     print(f"📁 Tamanho do arquivo: {file_size:,} bytes")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
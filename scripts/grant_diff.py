@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Diferença e Merge de Permissões - Database Access Control
+Motor único de comparação e merge dos schemas: compara listas do YAML pelas
+máscaras de bits de grant_model por (schema, tabela), devolvendo em uma
+passada o que revogar e o que conceder, e aplica ao modelo de um arquivo
+(SchemaGrant/TableGrant) as permissões adicionadas e removidas
+"""
+
+import logging
+
+from grant_model import TableGrant, privileges_from_names, privilege_names
+
+logger = logging.getLogger(__name__)
+
+def _table_masks(schema):
+    """Máscara de cada tabela de um schema granular, na ordem do arquivo."""
+    return {tabela["nome"]: privileges_from_names(tabela.get("permissions"))
+            for tabela in schema.get("tabelas") or []}
+
+def index_schemas(schemas):
+    """Indexa a lista de schemas por nome (o último com o mesmo nome prevalece).
+
+    Cada valor é (granular, máscara) — a máscara é um int em schemas simples
+    e um dicionário tabela → int em schemas granulares.
+    """
+    index = {}
+    for schema in schemas:
+        if schema.get("tipo") == "granular":
+            index[schema["nome"]] = (True, _table_masks(schema))
+        else:
+            index[schema["nome"]] = (False, privileges_from_names(schema.get("permissions")))
+    return index
+
+def _schema_dict(nome, granular, masks):
+    """Schema completo no formato do YAML (usado quando entra inteiro no resultado)."""
+    if granular:
+        return {"nome": nome, "tipo": "granular", "tabelas": [
+            {"nome": tabela, "permissions": privilege_names(mask)} for tabela, mask in masks.items()
+        ]}
+    return {"nome": nome, "permissions": privilege_names(masks)}
+
+def _diff_tables(tabelas_antes, tabelas_depois):
+    """Tabelas a revogar (ordem de antes) e a conceder (ordem de depois) entre dois schemas granulares."""
+    revogar = []
+    for nome, mask in tabelas_antes.items():
+        diferenca = mask & ~tabelas_depois.get(nome, 0)
+        if diferenca:
+            revogar.append({"nome": nome, "permissions": privilege_names(diferenca)})
+
+    conceder = []
+    for nome, mask in tabelas_depois.items():
+        diferenca = mask & ~tabelas_antes.get(nome, 0)
+        if diferenca:
+            conceder.append({"nome": nome, "permissions": privilege_names(diferenca)})
+    return revogar, conceder
+
+def diff_schemas(antes, depois):
+    """Calcula (revogar, conceder) entre duas listas de schemas em uma única passada.
+
+    revogar é o que existe em antes e não em depois; conceder, o inverso.
+    Schemas removidos (ou que mudaram entre simples e granular) entram
+    inteiros. As listas seguem a ordem de antes e de depois, respectivamente,
+    com as permissões em ordem alfabética.
+    """
+    antes_map = index_schemas(antes)
+    depois_map = index_schemas(depois)
+
+    revogar = []
+    conceder_por_schema = {}
+
+    for nome, (granular, masks_antes) in antes_map.items():
+        schema_depois = depois_map.get(nome)
+
+        if schema_depois is None:
+            revogar.append(_schema_dict(nome, granular, masks_antes))
+            continue
+
+        granular_depois, masks_depois = schema_depois
+        if granular != granular_depois:
+            logger.warning(f"Conversão de formato detectada para schema {nome} - revogando permissões anteriores")
+            revogar.append(_schema_dict(nome, granular, masks_antes))
+            conceder_por_schema[nome] = _schema_dict(nome, granular_depois, masks_depois)
+        elif granular:
+            tabelas_revogar, tabelas_conceder = _diff_tables(masks_antes, masks_depois)
+            if tabelas_revogar:
+                revogar.append({"nome": nome, "tipo": "granular", "tabelas": tabelas_revogar})
+            if tabelas_conceder:
+                conceder_por_schema[nome] = {"nome": nome, "tipo": "granular", "tabelas": tabelas_conceder}
+        else:
+            diferenca = masks_antes & ~masks_depois
+            if diferenca:
+                revogar.append({"nome": nome, "permissions": privilege_names(diferenca)})
+            diferenca = masks_depois & ~masks_antes
+            if diferenca:
+                conceder_por_schema[nome] = {"nome": nome, "permissions": privilege_names(diferenca)}
+
+    conceder = []
+    for nome, (granular, masks_depois) in depois_map.items():
+        if nome not in antes_map:
+            conceder.append(_schema_dict(nome, granular, masks_depois))
+        elif nome in conceder_por_schema:
+            conceder.append(conceder_por_schema[nome])
+
+    return revogar, conceder
+
+def merge_schemas(schemas, new_permissions):
+    """Adiciona permissões aos schemas de um arquivo ({nome: SchemaGrant}), no lugar.
+
+    Permissões de um mesmo schema/tabela são unidas (OR das máscaras); um
+    schema simples existente recebendo granular é substituído, e um
+    granular existente recebendo simples é mantido.
+    """
+    for schema_name, new_schema in new_permissions.items():
+        existing_schema = schemas.get(schema_name)
+
+        if existing_schema is None:
+            schemas[schema_name] = new_schema
+            logger.info(f"➕ Novo schema adicionado: {schema_name}")
+        elif new_schema.granular:
+            if existing_schema.granular:
+                existing_tables = existing_schema.tables
+                for table_name, new_table in new_schema.tables.items():
+                    existing_table = existing_tables.get(table_name)
+                    if existing_table is not None:
+                        existing_table.privileges |= new_table.privileges
+                        logger.info(f"🔄 Atualizadas permissões da tabela {table_name}")
+                    else:
+                        existing_tables[table_name] = TableGrant(table_name, new_table.privileges)
+                        logger.info(f"➕ Nova tabela adicionada: {table_name}")
+            else:
+                schemas[schema_name] = new_schema
+                logger.info(f"🔄 Schema {schema_name} convertido para granular")
+        elif existing_schema.granular:
+            logger.warning(f"⚠️ Mantendo formato granular para schema: {schema_name}")
+        else:
+            existing_schema.privileges |= new_schema.privileges
+            logger.info(f"🔄 Atualizadas permissões do schema {schema_name}")
+
+def subtract_schemas(schemas, permissions_to_remove):
+    """Remove permissões dos schemas de um arquivo ({nome: SchemaGrant}), no lugar.
+
+    Aplica AND NOT das máscaras; tabelas e schemas que ficam sem permissões
+    são removidos. Remoções de formato diferente do existente são ignoradas.
+    """
+    for schema_name, schema_to_remove in permissions_to_remove.items():
+        existing_schema = schemas.get(schema_name)
+        if existing_schema is None or existing_schema.granular != schema_to_remove.granular:
+            continue
+
+        if schema_to_remove.granular:
+            existing_tables = existing_schema.tables
+            for table_name, table_to_remove in schema_to_remove.tables.items():
+                existing_table = existing_tables.get(table_name)
+                if existing_table is None:
+                    continue
+                existing_table.privileges &= ~table_to_remove.privileges
+
+                if existing_table.privileges:
+                    logger.info(f"➖ Removidas permissões da tabela {table_name}")
+                else:
+                    del existing_tables[table_name]
+                    logger.info(f"🗑️ Tabela {table_name} removida (sem permissões)")
+
+            if not existing_tables:
+                del schemas[schema_name]
+                logger.info(f"🗑️ Schema {schema_name} removido (sem tabelas)")
+        else:
+            existing_schema.privileges &= ~schema_to_remove.privileges
+
+            if existing_schema.privileges:
+                logger.info(f"➖ Removidas permissões do schema {schema_name}")
+            else:
+                del schemas[schema_name]
+                logger.info(f"🗑️ Schema {schema_name} removido (sem permissões)")
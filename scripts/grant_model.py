@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Modelo de Permissões - Database Access Control
+Representação compacta dos arquivos de users-access-requests: classes com
+__slots__ (UserAccess, SchemaGrant, TableGrant) e privilégios como máscara
+de bits (Privilege), com leitura e escrita no formato YAML existente
+"""
+
+import threading
+from enum import IntFlag
+
+import yaml_io
+from yaml_io import load_file, dump
+
+class Privilege(IntFlag):
+    """Privilégios aceitos nos arquivos (PostgreSQL e MySQL), um bit cada."""
+    NONE = 0
+    SELECT = 1 << 0
+    INSERT = 1 << 1
+    UPDATE = 1 << 2
+    DELETE = 1 << 3
+    TRUNCATE = 1 << 4
+    REFERENCES = 1 << 5
+    TRIGGER = 1 << 6
+    USAGE = 1 << 7
+    EXECUTE = 1 << 8
+    CREATE = 1 << 9
+    TEMP = 1 << 10
+    CONNECT = 1 << 11
+    DROP = 1 << 12
+    INDEX = 1 << 13
+    ALTER = 1 << 14
+    ALL_PRIVILEGES = 1 << 15
+
+# Nome de cada bit como aparece no YAML
+PRIVILEGE_NAMES = {
+    flag: flag.name.replace("_", " ") for flag in Privilege if flag is not Privilege.NONE
+}
+
+# Bits como int puro: operações com IntFlag criam um objeto a cada | e &
+_MASKS_BY_NAME = {name: int(flag) for flag, name in PRIVILEGE_NAMES.items()}
+_NAMES_BY_BIT = {bit: name for name, bit in _MASKS_BY_NAME.items()}
+_NEW_BIT_LOCK = threading.Lock()
+
+# Máscara de cada lista de nomes já vista e nomes (ordenados) de cada máscara:
+# o número de combinações distintas nos arquivos é pequeno
+_MASKS_BY_NAMES = {}
+_NAMES_BY_MASK = {}
+_CACHE_LIMIT = 65536
+
+def _bit(name):
+    """Bit de um nome; nomes fora de Privilege recebem o próximo bit livre.
+
+    Assim como os conjuntos de strings que as máscaras substituem, nomes
+    diferentes (ex.: "select" e "SELECT", "ALL" e "ALL PRIVILEGES") são
+    privilégios diferentes.
+    """
+    bit = _MASKS_BY_NAME.get(name)
+    if bit is None:
+        with _NEW_BIT_LOCK:
+            bit = _MASKS_BY_NAME.get(name)
+            if bit is None:
+                bit = 1 << len(_MASKS_BY_NAME)
+                _NAMES_BY_BIT[bit] = name
+                _MASKS_BY_NAME[name] = bit
+    return bit
+
+def privileges_from_names(names):
+    """Converte uma lista de nomes na máscara de bits (duplicatas contam uma vez)."""
+    if not names:
+        return 0
+    key = tuple(names)
+    mask = _MASKS_BY_NAMES.get(key)
+    if mask is None:
+        mask = 0
+        for name in key:
+            mask |= _bit(name)
+        if len(_MASKS_BY_NAMES) >= _CACHE_LIMIT:
+            _MASKS_BY_NAMES.clear()
+        _MASKS_BY_NAMES[key] = mask
+    return mask
+
+def privilege_names(mask):
+    """Converte a máscara de bits na lista de nomes, em ordem alfabética (a de sorted())."""
+    names = _NAMES_BY_MASK.get(mask)
+    if names is None:
+        names, rest = [], int(mask)
+        while rest:
+            bit = rest & -rest
+            names.append(_NAMES_BY_BIT[bit])
+            rest ^= bit
+        names = tuple(sorted(names))
+        if len(_NAMES_BY_MASK) >= _CACHE_LIMIT:
+            _NAMES_BY_MASK.clear()
+        _NAMES_BY_MASK[mask] = names
+    return list(names)
+
+class TableGrant:
+    """Permissões de uma tabela em um schema granular."""
+
+    __slots__ = ("name", "privileges")
+
+    def __init__(self, name, privileges=0):
+        self.name = name
+        self.privileges = privileges
+
+    @classmethod
+    def from_dict(cls, tabela):
+        return cls(tabela["nome"], privileges_from_names(tabela.get("permissions")))
+
+    def to_dict(self):
+        return {"nome": self.name, "permissions": privilege_names(self.privileges)}
+
+    @property
+    def permission_names(self):
+        """Nomes dos privilégios, em ordem alfabética."""
+        return privilege_names(self.privileges)
+
+    def __eq__(self, other):
+        return isinstance(other, TableGrant) and (self.name, self.privileges) == (other.name, other.privileges)
+
+    def __repr__(self):
+        return f"TableGrant({self.name!r}, {self.permission_names!r})"
+
+class SchemaGrant:
+    """Permissões de um schema: simples (privileges) ou granular (tables por nome).
+
+    Tabelas repetidas no arquivo ficam com a última ocorrência, na posição
+    da primeira. Campos fora do formato (ex.: tables do formato legado)
+    ficam em extra.
+    """
+
+    __slots__ = ("name", "granular", "privileges", "tables", "extra")
+
+    def __init__(self, name, granular=False, privileges=0, tables=None, extra=None):
+        self.name = name
+        self.granular = granular
+        self.privileges = privileges
+        self.tables = tables if tables is not None else {}
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, schema):
+        extra = {key: value for key, value in schema.items() if key not in _SCHEMA_KEYS} or None
+        if schema.get("tipo") == "granular":
+            tables = {}
+            for tabela in schema.get("tabelas") or []:
+                nome = tabela["nome"]
+                tables[nome] = TableGrant(nome, privileges_from_names(tabela.get("permissions")))
+            return cls(schema["nome"], granular=True, tables=tables, extra=extra)
+        if "tipo" in schema:
+            extra = dict(extra or {}, tipo=schema["tipo"])
+        return cls(schema["nome"], privileges=privileges_from_names(schema.get("permissions")), extra=extra)
+
+    def to_dict(self):
+        if self.granular:
+            data = {
+                "nome": self.name,
+                "tipo": "granular",
+                "tabelas": [table.to_dict() for table in self.tables.values()]
+            }
+        else:
+            data = {"nome": self.name, "permissions": privilege_names(self.privileges)}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def permission_names(self):
+        """Nomes dos privilégios do schema (vazio em schemas granulares), em ordem alfabética."""
+        return privilege_names(self.privileges)
+
+    def __eq__(self, other):
+        return (isinstance(other, SchemaGrant)
+                and (self.name, self.granular, self.privileges, self.tables, self.extra)
+                == (other.name, other.granular, other.privileges, other.tables, other.extra))
+
+    def __repr__(self):
+        if self.granular:
+            return f"SchemaGrant({self.name!r}, granular, {len(self.tables)} tabela(s))"
+        return f"SchemaGrant({self.name!r}, {self.permission_names!r})"
+
+_SCHEMA_KEYS = {"nome", "tipo", "tabelas", "permissions"}
+
+def schemas_by_name(schemas):
+    """Lista de schemas do YAML → {nome: SchemaGrant} (o último com o mesmo nome prevalece)."""
+    result = {}
+    for schema in schemas or []:
+        result[schema["nome"]] = SchemaGrant.from_dict(schema)
+    return result
+
+class UserAccess:
+    """Arquivo de permissões de um usuário em um banco.
+
+    Campos fora do formato conhecido (ex.: usuario, solicitacao) ficam em
+    extra; keys guarda a ordem dos campos do arquivo, para que a escrita
+    mantenha o arquivo igual ao lido quando nada muda.
+    """
+
+    __slots__ = ("host", "user", "database", "engine", "region", "port", "schemas", "extra", "keys")
+
+    FIELDS = ("host", "user", "database", "engine", "region", "port")
+
+    def __init__(self, host=None, user=None, database=None, engine=None, region=None, port=None,
+                 schemas=None, extra=None, keys=None):
+        self.host = host
+        self.user = user
+        self.database = database
+        self.engine = engine
+        self.region = region
+        self.port = port
+        self.schemas = schemas if schemas is not None else {}
+        self.extra = extra if extra is not None else {}
+        if keys is None:
+            keys = tuple(field for field in self.FIELDS if getattr(self, field) is not None) + ("schemas",) + tuple(self.extra)
+        self.keys = keys
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS and key != "schemas"}
+        return cls(*(data.get(field) for field in cls.FIELDS), schemas=schemas_by_name(data.get("schemas")),
+                   extra=extra, keys=tuple(data))
+
+    def get(self, key, default=None):
+        """Campo do arquivo como em dict.get (default se o campo não estiver no arquivo)."""
+        if key not in self.keys:
+            return default
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if key == "schemas":
+            return [schema.to_dict() for schema in self.schemas.values()]
+        return self.extra.get(key, default)
+
+    def to_dict(self):
+        data = {}
+        for key in self.keys + tuple(field for field in self.FIELDS if getattr(self, field) is not None) + ("schemas",):
+            if key in data:
+                continue
+            if key == "schemas":
+                data[key] = [schema.to_dict() for schema in self.schemas.values()]
+            elif key in self.FIELDS:
+                data[key] = getattr(self, key)
+            elif key in self.extra:
+                data[key] = self.extra[key]
+        for key, value in self.extra.items():
+            data.setdefault(key, value)
+        return data
+
+    def __repr__(self):
+        return f"UserAccess({self.user!r}, {self.engine!r}/{self.database!r}, {len(self.schemas)} schema(s))"
+
+def load_user_access(file_path):
+    """Lê um arquivo YAML de permissões no modelo."""
+    return UserAccess.from_dict(load_file(file_path))
+
+def dump_user_access(access, stream=None):
+    """Grava o modelo no formato YAML dos arquivos; retorna a string se stream não for informado."""
+    return dump(access.to_dict(), stream)
+
+def json_default(value):
+    """default de json.dump para dados com o modelo: as classes viram o formato do YAML (e as datas, como em yaml_io)."""
+    if isinstance(value, (UserAccess, SchemaGrant, TableGrant)):
+        return value.to_dict()
+    return yaml_io.json_default(value)
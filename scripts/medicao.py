@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Medição de Tempos - Database Access Control
+Instrumenta a abertura de conexões e a execução das instruções: registra o
+tempo de cada conexão e de cada instrução (com host, arquivo e schema) e gera
+o arquivo JSON de tempos e a tabela do resumo do GitHub Actions
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Variável de ambiente com o caminho do arquivo JSON de tempos (opcional)
+VARIAVEL_ARQUIVO_TEMPOS = "TIMINGS_FILE"
+
+# Quantidade de instruções mais lentas no JSON e no resumo
+TOP_PADRAO = 10
+
+# Tamanho máximo do SQL exibido na tabela do resumo
+TAMANHO_SQL_RESUMO = 120
+
+class CursorMedido:
+    """Cursor que registra o tempo de cada execute (nextset soma no último registro)."""
+
+    def __init__(self, cursor, medidor, host):
+        self._cursor = cursor
+        self._medidor = medidor
+        self._host = host
+        self._ultimo = None
+
+    def execute(self, sql, *args, **kwargs):
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            resultado = self._cursor.execute(sql, *args, **kwargs)
+            sucesso = True
+            return resultado
+        finally:
+            self._ultimo = self._medidor.registrar_instrucao(self._host, sql, time.perf_counter() - inicio, sucesso)
+
+    def nextset(self):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.nextset()
+        finally:
+            if self._ultimo is not None:
+                self._medidor.acrescentar(self._ultimo, time.perf_counter() - inicio)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *excecao):
+        return self._cursor.__exit__(*excecao)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+class ConexaoMedida:
+    """Conexão que devolve cursores medidos e registra o tempo de commit/rollback."""
+
+    def __init__(self, conn, medidor, host):
+        self._conn = conn
+        self._medidor = medidor
+        self._host = host
+
+    def cursor(self, *args, **kwargs):
+        return CursorMedido(self._conn.cursor(*args, **kwargs), self._medidor, self._host)
+
+    def _medir(self, nome, operacao):
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            resultado = operacao()
+            sucesso = True
+            return resultado
+        finally:
+            self._medidor.registrar_instrucao(self._host, nome, time.perf_counter() - inicio, sucesso)
+
+    def commit(self):
+        return self._medir("COMMIT", self._conn.commit)
+
+    def rollback(self):
+        return self._medir("ROLLBACK", self._conn.rollback)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+class Medidor:
+    """Registro dos tempos de um processo (seguro para uso em várias threads).
+
+    O arquivo e o schema de cada instrução vêm do contexto da thread ou da
+    tarefa asyncio (contexto()); o host vem da conexão medida.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._campos_atuais = contextvars.ContextVar("campos_medicao", default={})
+        self.inicio = time.perf_counter()
+        self.iniciado_em = datetime.now(timezone.utc).isoformat()
+        self.conexoes = []
+        self.instrucoes = []
+
+    @contextmanager
+    def contexto(self, **campos):
+        """Define arquivo/schema das instruções executadas dentro do bloco (nesta thread ou tarefa)."""
+        token = self._campos_atuais.set({**self._campos_atuais.get(), **campos})
+        try:
+            yield
+        finally:
+            self._campos_atuais.reset(token)
+
+    def _campos(self):
+        return self._campos_atuais.get()
+
+    def registrar_conexao(self, host, banco, segundos, sucesso=True):
+        """Registra a abertura de uma conexão; retorna o registro."""
+        registro = {
+            "host": host,
+            "banco": banco,
+            "arquivo": self._campos().get("arquivo"),
+            "segundos": segundos,
+            "sucesso": sucesso
+        }
+        with self._lock:
+            self.conexoes.append(registro)
+        return registro
+
+    def medir_conexao(self, host, banco, conectar, *args, **kwargs):
+        """Abre a conexão com conectar(*args, **kwargs), registra o tempo e a devolve medida."""
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            conn = conectar(*args, **kwargs)
+            sucesso = True
+        finally:
+            self.registrar_conexao(host, banco, time.perf_counter() - inicio, sucesso)
+        return ConexaoMedida(conn, self, host)
+
+    def registrar_instrucao(self, host, sql, segundos, sucesso=True):
+        """Registra uma instrução executada; retorna o registro."""
+        campos = self._campos()
+        registro = {
+            "host": host,
+            "arquivo": campos.get("arquivo"),
+            "schema": campos.get("schema"),
+            "sql": sql,
+            "segundos": segundos,
+            "sucesso": sucesso
+        }
+        with self._lock:
+            self.instrucoes.append(registro)
+        return registro
+
+    def acrescentar(self, registro, segundos):
+        """Soma tempo a uma instrução já registrada (ex.: resultados seguintes de um multi-statement)."""
+        with self._lock:
+            registro["segundos"] += segundos
+
+    def resumo(self, top=TOP_PADRAO):
+        """Totais de conexão e execução por host, arquivo e schema, e as instruções mais lentas."""
+        with self._lock:
+            conexoes = list(self.conexoes)
+            instrucoes = list(self.instrucoes)
+
+        por_host = {}
+        for conexao in conexoes:
+            host = por_host.setdefault(conexao["host"], {"conexoes": 0, "conexao_segundos": 0.0,
+                                                         "instrucoes": 0, "execucao_segundos": 0.0})
+            host["conexoes"] += 1
+            host["conexao_segundos"] += conexao["segundos"]
+
+        por_arquivo = {}
+        por_schema = {}
+        for instrucao in instrucoes:
+            host = por_host.setdefault(instrucao["host"], {"conexoes": 0, "conexao_segundos": 0.0,
+                                                           "instrucoes": 0, "execucao_segundos": 0.0})
+            host["instrucoes"] += 1
+            host["execucao_segundos"] += instrucao["segundos"]
+
+            if instrucao["arquivo"]:
+                arquivo = por_arquivo.setdefault(instrucao["arquivo"], {"instrucoes": 0, "segundos": 0.0})
+                arquivo["instrucoes"] += 1
+                arquivo["segundos"] += instrucao["segundos"]
+
+            if instrucao["schema"]:
+                chave = f"{instrucao['host']}/{instrucao['schema']}"
+                schema = por_schema.setdefault(chave, {"instrucoes": 0, "segundos": 0.0})
+                schema["instrucoes"] += 1
+                schema["segundos"] += instrucao["segundos"]
+
+        return {
+            "iniciado_em": self.iniciado_em,
+            "total_segundos": time.perf_counter() - self.inicio,
+            "conexao_segundos": sum(conexao["segundos"] for conexao in conexoes),
+            "execucao_segundos": sum(instrucao["segundos"] for instrucao in instrucoes),
+            "total_conexoes": len(conexoes),
+            "total_instrucoes": len(instrucoes),
+            "por_host": por_host,
+            "por_arquivo": por_arquivo,
+            "por_schema": por_schema,
+            "mais_lentas": sorted(instrucoes, key=lambda instrucao: instrucao["segundos"], reverse=True)[:top]
+        }
+
+    def salvar_json(self, caminho, top=TOP_PADRAO):
+        """Grava o resumo e todos os registros em JSON."""
+        with self._lock:
+            dados = {"conexoes": list(self.conexoes), "instrucoes": list(self.instrucoes)}
+        dados = {**self.resumo(top), **dados}
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+
+def _celula_sql(sql):
+    sql = " ".join(sql.split())
+    if len(sql) > TAMANHO_SQL_RESUMO:
+        sql = sql[:TAMANHO_SQL_RESUMO - 1] + "…"
+    return "`" + sql.replace("|", "\\|").replace("`", "'") + "`"
+
+def tabela_resumo(resumo):
+    """Tabela Markdown do resumo (tempo por host e instruções mais lentas) para o GITHUB_STEP_SUMMARY."""
+    linhas = [
+        "### ⏱️ Tempos de execução",
+        "",
+        f"Total: {resumo['total_segundos']:.2f}s — conexão {resumo['conexao_segundos']:.2f}s, "
+        f"execução {resumo['execucao_segundos']:.2f}s ({resumo['total_instrucoes']} instrução(ões))",
+        "",
+        "| Host | Conexões | Conexão (s) | Instruções | Execução (s) |",
+        "|------|---------:|------------:|-----------:|-------------:|"
+    ]
+    for host, totais in sorted(resumo["por_host"].items(), key=lambda item: -item[1]["execucao_segundos"]):
+        linhas.append(f"| {host} | {totais['conexoes']} | {totais['conexao_segundos']:.3f} | "
+                      f"{totais['instrucoes']} | {totais['execucao_segundos']:.3f} |")
+
+    if resumo["mais_lentas"]:
+        linhas += [
+            "",
+            f"**{len(resumo['mais_lentas'])} instrução(ões) mais lenta(s)**",
+            "",
+            "| # | Segundos | Host | Arquivo | Schema | Instrução |",
+            "|--:|---------:|------|---------|--------|-----------|"
+        ]
+        for posicao, instrucao in enumerate(resumo["mais_lentas"], 1):
+            linhas.append(f"| {posicao} | {instrucao['segundos']:.3f} | {instrucao['host']} | "
+                          f"{instrucao['arquivo'] or '-'} | {instrucao['schema'] or '-'} | {_celula_sql(instrucao['sql'])} |")
+    return "\n".join(linhas) + "\n"
+
+def finalizar(caminho_json=None, top=TOP_PADRAO, medidor=None):
+    """Publica os tempos medidos: JSON (caminho_json ou TIMINGS_FILE) e resumo do GitHub Actions.
+
+    Não faz nada se nenhuma conexão foi aberta. Falhas ao gravar apenas
+    geram aviso, para não mudar o resultado da execução.
+    """
+    medidor = medidor or MEDIDOR
+    if not medidor.conexoes:
+        return
+
+    resumo = medidor.resumo(top)
+    logger.info(f"Tempos: total {resumo['total_segundos']:.2f}s, conexão {resumo['conexao_segundos']:.2f}s, "
+                f"execução {resumo['execucao_segundos']:.2f}s em {resumo['total_instrucoes']} instrução(ões)")
+
+    caminho_json = caminho_json or os.environ.get(VARIAVEL_ARQUIVO_TEMPOS)
+    try:
+        if caminho_json:
+            medidor.salvar_json(caminho_json, top)
+            logger.info(f"Tempos gravados em {caminho_json}")
+
+        resumo_github = os.environ.get("GITHUB_STEP_SUMMARY")
+        if resumo_github:
+            with open(resumo_github, "a", encoding="utf-8") as arquivo:
+                arquivo.write(tabela_resumo(resumo))
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar os tempos: {e}")
+
+# Medidor do processo, compartilhado pelos scripts
+MEDIDOR = Medidor()
@@ -11,6 +11,9 @@ import os
 import logging
 from pathlib import Path
 
+from grant_diff import merge_schemas, subtract_schemas
+from grant_model import UserAccess, load_user_access, dump_user_access, schemas_by_name
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -135,15 +138,14 @@ def create_initial_data():
     try:
         validate_environment_variables()
         
-        return {
-            "host": os.environ["INPUT_HOST"],
-            "user": os.environ["INPUT_EMAIL"],
-            "database": os.environ["INPUT_DATABASE"],
-            "engine": os.environ["INPUT_ENGINE"],
-            "region": os.environ["INPUT_REGION"],
-            "port": int(os.environ["INPUT_PORT"]),
-            "schemas": []
-        }
+        return UserAccess(
+            host=os.environ["INPUT_HOST"],
+            user=os.environ["INPUT_EMAIL"],
+            database=os.environ["INPUT_DATABASE"],
+            engine=os.environ["INPUT_ENGINE"],
+            region=os.environ["INPUT_REGION"],
+            port=int(os.environ["INPUT_PORT"])
+        )
     except ValueError as e:
         logger.error(f"❌ Erro na validação de variáveis de ambiente: {e}")
         raise
@@ -152,16 +154,15 @@ def create_initial_data():
         raise
 
 def load_existing_data(file_path):
-    """Carrega dados existentes do arquivo YAML."""
+    """Carrega dados existentes do arquivo YAML (UserAccess)."""
     try:
         if os.path.exists(file_path):
             logger.info(f"📂 Carregando arquivo existente: {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = yaml.safe_load(file)
-                if not data:
-                    logger.warning("⚠️ Arquivo YAML vazio, criando nova estrutura")
-                    return create_initial_data()
-                return data
+            data = load_user_access(file_path)
+            if not data.keys:
+                logger.warning("⚠️ Arquivo YAML vazio, criando nova estrutura")
+                return create_initial_data()
+            return data
         else:
             logger.info("🆕 Arquivo não existe, criando nova estrutura")
             return create_initial_data()
@@ -174,115 +175,12 @@ def load_existing_data(file_path):
         raise
 
 def add_or_update_permissions(data, new_permissions):
-    """Adiciona ou atualiza permissões nos dados existentes."""
-    if "schemas" not in data:
-        data["schemas"] = []
-    
-    existing_schemas = {schema["nome"]: schema for schema in data["schemas"]}
-    
-    for new_schema in new_permissions:
-        schema_name = new_schema["nome"]
-        
-        if schema_name in existing_schemas:
-            # Atualizar schema existente
-            existing_schema = existing_schemas[schema_name]
-            
-            if "tipo" in new_schema and new_schema["tipo"] == "granular":
-                # Novo schema é granular
-                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
-                    # Ambos granulares - merge tabelas
-                    existing_tables = {t["nome"]: t for t in existing_schema.get("tabelas", [])}
-                    
-                    for new_table in new_schema["tabelas"]:
-                        table_name = new_table["nome"]
-                        if table_name in existing_tables:
-                            # Merge permissões da tabela
-                            existing_perms = set(existing_tables[table_name]["permissions"])
-                            new_perms = set(new_table["permissions"])
-                            existing_tables[table_name]["permissions"] = sorted(list(existing_perms | new_perms))
-                            logger.info(f"🔄 Atualizadas permissões da tabela {table_name}")
-                        else:
-                            # Nova tabela
-                            existing_tables[table_name] = new_table
-                            logger.info(f"➕ Nova tabela adicionada: {table_name}")
-                    
-                    existing_schema["tabelas"] = list(existing_tables.values())
-                else:
-                    # Existente simples, novo granular - substituir
-                    existing_schemas[schema_name] = new_schema
-                    logger.info(f"🔄 Schema {schema_name} convertido para granular")
-            else:
-                # Novo schema é simples
-                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
-                    # Manter granular
-                    logger.warning(f"⚠️ Mantendo formato granular para schema: {schema_name}")
-                else:
-                    # Ambos simples - merge permissões
-                    existing_perms = set(existing_schema.get("permissions", []))
-                    new_perms = set(new_schema["permissions"])
-                    existing_schema["permissions"] = sorted(list(existing_perms | new_perms))
-                    logger.info(f"🔄 Atualizadas permissões do schema {schema_name}")
-        else:
-            # Novo schema
-            existing_schemas[schema_name] = new_schema
-            logger.info(f"➕ Novo schema adicionado: {schema_name}")
-    
-    # Atualizar dados
-    data["schemas"] = list(existing_schemas.values())
+    """Adiciona ou atualiza permissões nos dados existentes (UserAccess, {nome: SchemaGrant})."""
+    merge_schemas(data.schemas, new_permissions)
 
 def remove_specific_permissions(data, permissions_to_remove):
-    """Remove permissões específicas dos dados existentes."""
-    if "schemas" not in data:
-        return
-    
-    existing_schemas = {schema["nome"]: schema for schema in data["schemas"]}
-    
-    for schema_to_remove in permissions_to_remove:
-        schema_name = schema_to_remove["nome"]
-        
-        if schema_name in existing_schemas:
-            existing_schema = existing_schemas[schema_name]
-            
-            if "tipo" in schema_to_remove and schema_to_remove["tipo"] == "granular":
-                # Remover permissões granulares
-                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
-                    existing_tables = {t["nome"]: t for t in existing_schema.get("tabelas", [])}
-                    
-                    for table_to_remove in schema_to_remove["tabelas"]:
-                        table_name = table_to_remove["nome"]
-                        if table_name in existing_tables:
-                            existing_perms = set(existing_tables[table_name]["permissions"])
-                            perms_to_remove = set(table_to_remove["permissions"])
-                            remaining_perms = existing_perms - perms_to_remove
-                            
-                            if remaining_perms:
-                                existing_tables[table_name]["permissions"] = sorted(list(remaining_perms))
-                                logger.info(f"➖ Removidas permissões da tabela {table_name}")
-                            else:
-                                del existing_tables[table_name]
-                                logger.info(f"🗑️ Tabela {table_name} removida (sem permissões)")
-                    
-                    if existing_tables:
-                        existing_schema["tabelas"] = list(existing_tables.values())
-                    else:
-                        del existing_schemas[schema_name]
-                        logger.info(f"🗑️ Schema {schema_name} removido (sem tabelas)")
-            else:
-                # Remover permissões simples
-                if "tipo" not in existing_schema or existing_schema["tipo"] != "granular":
-                    existing_perms = set(existing_schema.get("permissions", []))
-                    perms_to_remove = set(schema_to_remove["permissions"])
-                    remaining_perms = existing_perms - perms_to_remove
-                    
-                    if remaining_perms:
-                        existing_schema["permissions"] = sorted(list(remaining_perms))
-                        logger.info(f"➖ Removidas permissões do schema {schema_name}")
-                    else:
-                        del existing_schemas[schema_name]
-                        logger.info(f"🗑️ Schema {schema_name} removido (sem permissões)")
-    
-    # Atualizar dados
-    data["schemas"] = list(existing_schemas.values())
+    """Remove permissões específicas dos dados existentes (UserAccess, {nome: SchemaGrant})."""
+    subtract_schemas(data.schemas, permissions_to_remove)
 
 def process_permissions(data, new_permissions, remove_mode):
     """Processa as permissões (adiciona ou remove)."""
@@ -294,7 +192,7 @@ def process_permissions(data, new_permissions, remove_mode):
             logger.info("➕ Modo: Adição/atualização de permissões")
             add_or_update_permissions(data, new_permissions)
             
-        logger.info(f"✅ Processamento concluído. Total de schemas: {len(data.get('schemas', []))}")
+        logger.info(f"✅ Processamento concluído. Total de schemas: {len(data.schemas)}")
         
     except Exception as e:
         logger.error(f"❌ Erro no processamento de permissões: {e}")
@@ -311,7 +209,7 @@ def save_file(file_path, data, remove_mode):
         
         # Salvar arquivo YAML
         with open(file_path, 'w', encoding='utf-8') as file:
-            yaml.dump(data, file, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            dump_user_access(data, file)
         
         if remove_mode:
             logger.info(f"📝 Arquivo atualizado (remoção): {file_path}")
@@ -407,7 +305,7 @@ def main():
         validate_permissions_json(json_string)
         
         # Processar JSON de permissões e converter para formato esperado
-        new_permissions = process_permissions_from_json()
+        new_permissions = schemas_by_name(process_permissions_from_json())
         
         # Carregar dados existentes ou criar novos
         data = load_existing_data(file_path)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Índice de Permissões - Database Access Control
+Indexa a árvore users-access-requests (ambiente/engine/banco/<email>.yml) em
+uma única varredura com os.scandir, sem interpretar os arquivos, para que
+cada consulta leia apenas os YAMLs que precisa
+"""
+
+import os
+import sys
+from collections import defaultdict, namedtuple
+
+from grant_model import UserAccess
+from yaml_cache import load_yaml
+
+DEFAULT_ENVIRONMENTS = ["development", "staging", "production"]
+
+# Diretórios dentro de um ambiente que não são engines
+IGNORED_DIRS = {"audit"}
+
+IndexEntry = namedtuple("IndexEntry", ["environment", "engine", "database", "user", "path"])
+
+def user_from_filename(filename):
+    """Extrai o email do usuário do nome do arquivo (<email>.yml)."""
+    return filename.replace('.yml', '')
+
+def entry_for_path(path, base_path="users-access-requests", environments=None):
+    """Monta a entrada do índice de um caminho <base>/<ambiente>/<engine>/<banco>/<email>.yml.
+
+    Retorna None se o caminho não for um arquivo de permissões (fora da
+    árvore, profundidade diferente, ambiente desconhecido, etc.).
+    """
+    relative = os.path.relpath(path, base_path)
+    parts = relative.split(os.sep)
+    if len(parts) != 4 or parts[0] == os.pardir:
+        return None
+    environment, engine, database, filename = parts
+    if environment not in (environments or DEFAULT_ENVIRONMENTS) or engine in IGNORED_DIRS:
+        return None
+    if not filename.endswith('.yml') or filename.startswith('.'):
+        return None
+    return IndexEntry(environment, engine, database, user_from_filename(filename),
+                      os.path.join(base_path, environment, engine, database, filename))
+
+def _subdirs(path):
+    """Lista os subdiretórios (na ordem do sistema de arquivos)."""
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir()]
+
+class PermissionIndex:
+    """Índice dos arquivos de permissão por usuário, banco, ambiente e host.
+
+    O usuário de cada arquivo vem do nome <email>.yml, então consultas por
+    usuário, banco ou ambiente não interpretam nenhum YAML. O índice por host
+    depende do conteúdo e é montado (uma única vez) na primeira consulta.
+    """
+
+    def __init__(self, base_path="users-access-requests", environments=None, cache=None):
+        self.base_path = base_path
+        self.environments = environments or DEFAULT_ENVIRONMENTS
+        self.cache = cache
+        self.entries = []
+        self.by_user = defaultdict(list)
+        self.by_database = defaultdict(list)
+        self.by_environment = defaultdict(list)
+        self.missing_environments = []
+        self._by_host = None
+        self._scan()
+
+    def _scan(self):
+        """Percorre ambiente → engine → banco → arquivos em uma única passada."""
+        for environment in self.environments:
+            env_path = os.path.join(self.base_path, environment)
+            try:
+                engine_dirs = [d for d in _subdirs(env_path) if d.name not in IGNORED_DIRS]
+            except FileNotFoundError:
+                self.missing_environments.append(environment)
+                continue
+            except OSError:
+                continue
+
+            for engine_dir in engine_dirs:
+                try:
+                    database_dirs = _subdirs(engine_dir.path)
+                except OSError:
+                    continue
+
+                for database_dir in database_dirs:
+                    try:
+                        with os.scandir(database_dir.path) as files:
+                            user_files = [
+                                f for f in files
+                                if f.name.endswith('.yml') and not f.name.startswith('.') and f.is_file()
+                            ]
+                    except OSError:
+                        continue
+
+                    for user_file in user_files:
+                        self._add(IndexEntry(
+                            environment, engine_dir.name, database_dir.name,
+                            user_from_filename(user_file.name), user_file.path
+                        ))
+
+    def _add(self, entry):
+        self.entries.append(entry)
+        self.by_user[entry.user].append(entry)
+        self.by_database[(entry.engine, entry.database)].append(entry)
+        self.by_environment[entry.environment].append(entry)
+
+    def users(self):
+        """Emails de todos os usuários com ao menos um arquivo, em ordem alfabética."""
+        return sorted(self.by_user)
+
+    def entries_for_user(self, user_email, environment=None):
+        """Arquivos de um usuário, opcionalmente restritos a um ambiente."""
+        entries = self.by_user.get(user_email, [])
+        if environment is None:
+            return list(entries)
+        return [entry for entry in entries if entry.environment == environment]
+
+    def entries_for_database(self, engine, database):
+        """Arquivos de um banco (engine, nome do banco)."""
+        return list(self.by_database.get((engine, database), []))
+
+    def entries_for_environment(self, environment):
+        """Arquivos de um ambiente."""
+        return list(self.by_environment.get(environment, []))
+
+    def entries_for_host(self, host):
+        """Arquivos que apontam para um host (interpreta todos os arquivos na primeira chamada)."""
+        if self._by_host is None:
+            self._by_host = defaultdict(list)
+            for entry in self.entries:
+                try:
+                    data = self.load(entry) or {}
+                except Exception as e:
+                    print(f"❌ Erro ao processar {entry.path}: {e}", file=sys.stderr)
+                    continue
+                self._by_host[data.get('host', '')].append(entry)
+        return list(self._by_host.get(host, []))
+
+    def load(self, entry):
+        """Interpreta o YAML de uma entrada (usando o cache de leitura, se houver)."""
+        return load_yaml(entry.path, self.cache)
+
+    def load_access(self, entry):
+        """Lê o arquivo de uma entrada no modelo de permissões (UserAccess)."""
+        return UserAccess.from_dict(self.load(entry))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Registros de Permissões - Database Access Control
+Achata a árvore users-access-requests em um registro por (ambiente, usuário,
+banco, schema, tabela, privilégio), lendo um arquivo por vez a partir do
+índice, para exportações que não cabem em memória
+"""
+
+import sys
+
+MODE_SIMPLE = "simples"
+MODE_GRANULAR = "granular"
+
+RECORD_FIELDS = [
+    "environment", "engine", "database", "host", "schema",
+    "table", "privilege", "user", "source_file", "mode"
+]
+
+def _user_email(data, entry):
+    """Email do usuário: campo user, usuario.email ou o nome do arquivo."""
+    usuario = data.get('usuario')
+    if isinstance(usuario, dict) and usuario.get('email'):
+        return usuario['email']
+    return data.get('user') or entry.user
+
+def _host(data):
+    """Host do banco: campo host ou database.host."""
+    database = data.get('database')
+    if isinstance(database, dict):
+        return database.get('host') or data.get('host')
+    return data.get('host')
+
+def iter_file_records(entry, data):
+    """Gera os registros de um arquivo de permissões já lido (UserAccess).
+
+    Schemas granulares geram um registro por tabela e privilégio; schemas
+    simples geram um registro por privilégio com table None.
+    """
+    base = {
+        "environment": entry.environment,
+        "engine": entry.engine,
+        "database": entry.database,
+        "host": _host(data),
+        "user": _user_email(data, entry),
+        "source_file": entry.path,
+    }
+
+    for schema in data.schemas.values():
+        if schema.granular:
+            for tabela in schema.tables.values():
+                for privilege in tabela.permission_names:
+                    yield _record(base, schema.name, tabela.name, privilege, MODE_GRANULAR)
+        else:
+            for privilege in schema.permission_names:
+                yield _record(base, schema.name, None, privilege, MODE_SIMPLE)
+
+def _record(base, schema, table, privilege, mode):
+    """Monta um registro com os campos na ordem de RECORD_FIELDS."""
+    return {
+        "environment": base["environment"],
+        "engine": base["engine"],
+        "database": base["database"],
+        "host": base["host"],
+        "schema": schema,
+        "table": table,
+        "privilege": privilege,
+        "user": base["user"],
+        "source_file": base["source_file"],
+        "mode": mode,
+    }
+
+def iter_permission_records(index, environments=None):
+    """Gera os registros de todos os arquivos do índice, um arquivo por vez.
+
+    Arquivos que não puderem ser interpretados são informados em stderr e
+    ignorados, para não misturar mensagens com a saída da exportação.
+    """
+    for environment in environments or index.environments:
+        for entry in index.entries_for_environment(environment):
+            try:
+                data = index.load_access(entry)
+            except Exception as e:
+                print(f"❌ Erro ao processar {entry.path}: {e}", file=sys.stderr)
+                continue
+            yield from iter_file_records(entry, data)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de Permissões - Database Access Control
+Acumulador das estatísticas do relatório geral: cada arquivo de permissões
+é somado (add) ou descontado (remove) em multiconjuntos com contagem de
+referências, então as estatísticas ficam prontas ao fim da carga, sem uma
+nova passada pelos dados
+"""
+
+from collections import namedtuple
+
+ALL_PRIVILEGES = "ALL PRIVILEGES"
+
+# Uma entrada do relatório geral: um usuário em um banco de um ambiente (um arquivo YAML)
+PermissionEntry = namedtuple("PermissionEntry", ["environment", "user", "db_key", "info"])
+
+class RefCountedSet:
+    """Multiconjunto: cada chave existe enquanto a sua contagem de referências for positiva."""
+
+    __slots__ = ("_counts",)
+
+    def __init__(self):
+        self._counts = {}
+
+    def add(self, key, count=1):
+        self._counts[key] = self._counts.get(key, 0) + count
+
+    def remove(self, key, count=1):
+        remaining = self._counts.get(key, 0) - count
+        if remaining > 0:
+            self._counts[key] = remaining
+        else:
+            self._counts.pop(key, None)
+
+    def count(self, key):
+        return self._counts.get(key, 0)
+
+    def items(self):
+        return self._counts.items()
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __iter__(self):
+        return iter(self._counts)
+
+    def __len__(self):
+        return len(self._counts)
+
+def _department(info):
+    return info.get('user_info', {}).get('departamento', 'Não informado')
+
+def _iter_grants(info):
+    """Gera (schema, tabela, privilégio) de uma entrada (SchemaGrant); tabela é None em permissões de schema."""
+    for schema in info.get('schemas') or []:
+        for privilege in schema.permission_names:
+            yield schema.name, None, privilege
+        for tabela in schema.tables.values():
+            for privilege in tabela.permission_names:
+                yield schema.name, tabela.name, privilege
+
+class PermissionStats:
+    """Estatísticas incrementais do relatório geral.
+
+    Mantém os totais de _calculate_stats (usuários, bancos, engines,
+    departamentos) e os agregados extras: privilégios por ambiente, tabelas
+    por usuário e usuários com ALL PRIVILEGES. Cada ambiente tem a sua
+    própria visão (environment_stats), atualizada pelos mesmos add/remove.
+    """
+
+    def __init__(self, per_environment=True):
+        self.users = RefCountedSet()
+        self.databases = RefCountedSet()
+        self.engines = RefCountedSet()
+        self.departments = RefCountedSet()
+        self.privileges = RefCountedSet()
+        self.tables_by_user = {}
+        self.all_privileges_users = RefCountedSet()
+        self.environments = {} if per_environment else None
+
+    @classmethod
+    def from_data(cls, data):
+        """Monta as estatísticas a partir dos dados de load_all_permissions (ambiente → usuário → banco)."""
+        stats = cls()
+        for environment, env_data in data.items():
+            for user_email, databases in env_data.items():
+                for db_key, info in databases.items():
+                    stats.add(PermissionEntry(environment, user_email, db_key, info))
+        return stats
+
+    def add(self, entry):
+        """Soma a contribuição de uma entrada."""
+        self._apply(entry, 1)
+
+    def remove(self, entry):
+        """Desconta a contribuição de uma entrada somada antes com add."""
+        self._apply(entry, -1)
+
+    def _apply(self, entry, delta):
+        update = RefCountedSet.add if delta > 0 else RefCountedSet.remove
+        info = entry.info
+
+        update(self.users, entry.user)
+        update(self.databases, entry.db_key)
+        update(self.engines, info['engine'])
+        update(self.departments, _department(info))
+
+        has_all_privileges = False
+        tables = self.tables_by_user.get(entry.user)
+        for schema_name, table_name, privilege in _iter_grants(info):
+            update(self.privileges, privilege)
+            if privilege == ALL_PRIVILEGES:
+                has_all_privileges = True
+            if table_name is not None:
+                if tables is None:
+                    tables = self.tables_by_user[entry.user] = RefCountedSet()
+                update(tables, (entry.environment, entry.db_key, schema_name, table_name))
+        if tables is not None and not tables:
+            del self.tables_by_user[entry.user]
+        if has_all_privileges:
+            update(self.all_privileges_users, entry.user)
+
+        if self.environments is not None:
+            env_stats = self.environments.get(entry.environment)
+            if env_stats is None:
+                env_stats = self.environments[entry.environment] = PermissionStats(per_environment=False)
+            env_stats._apply(entry, delta)
+            if not env_stats.users:
+                del self.environments[entry.environment]
+
+    def environment_stats(self, environment):
+        """Visão das estatísticas de um ambiente (None se o ambiente não tiver entradas)."""
+        return self.environments.get(environment)
+
+    def as_report_stats(self, environments=None):
+        """Estatísticas no formato de GeneralReportGenerator._calculate_stats, com os agregados extras.
+
+        environments define a ordem dos ambientes (padrão: ordem em que apareceram).
+        """
+        order = [env for env in (environments or self.environments) if env in self.environments]
+        return {
+            'total_users': len(self.users),
+            'total_databases': len(self.databases),
+            'total_environments': len(order),
+            'engines': list(self.engines),
+            'permissions_by_env': {env: len(self.environments[env].users) for env in order},
+            'users_by_dept': dict(self.departments.items()),
+            'databases_by_engine': dict(self.engines.items()),
+            'privileges_by_env': {env: dict(self.environments[env].privileges.items()) for env in order},
+            'tables_by_user': {user: len(tables) for user, tables in self.tables_by_user.items()},
+            'all_privileges_users': sorted(self.all_privileges_users)
+        }
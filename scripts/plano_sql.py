@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Compilador de Planos SQL - Database Access Control
+Converte as permissões do YAML em instruções GRANT/REVOKE agrupadas por conjunto
+de privilégios e envia o plano ao banco com timeouts de lock e novas tentativas
+"""
+
+import sys
+import json
+import logging
+
+from catalogo import filtrar_concessoes_existentes
+from execucao import executar_plano
+
+logger = logging.getLogger(__name__)
+
+# Permissões PostgreSQL por tipo de objeto
+PG_TABLE_PERMS = ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]
+PG_FUNCTION_PERMS = ["EXECUTE"]
+PG_SCHEMA_PERMS = ["USAGE", "CREATE"]
+PG_DB_PERMS = ["TEMP", "CONNECT"]
+
+# Ordem canônica das permissões dentro de uma instrução
+ORDEM_PERMISSOES = [
+    "ALL PRIVILEGES",
+    "SELECT", "INSERT", "UPDATE", "DELETE",
+    "TRUNCATE", "REFERENCES", "TRIGGER",
+    "CREATE", "DROP", "INDEX", "ALTER",
+    "EXECUTE", "USAGE", "TEMP", "CONNECT"
+]
+
+def ordenar_permissoes(permissoes, engine="postgres"):
+    """Ordena permissões na ordem canônica, removendo as redundantes.
+
+    ALL PRIVILEGES engloba as demais e, no MySQL, USAGE significa "nenhum
+    privilégio"; por isso nenhum dos dois é combinado com outras permissões.
+    """
+    permissoes = set(permissoes)
+    if "ALL PRIVILEGES" in permissoes:
+        return ["ALL PRIVILEGES"]
+    if "mysql" in engine and len(permissoes) > 1 and "USAGE" in permissoes:
+        permissoes.discard("USAGE")
+    return sorted(permissoes, key=lambda p: ORDEM_PERMISSOES.index(p) if p in ORDEM_PERMISSOES else len(ORDEM_PERMISSOES))
+
+def _adicionar(concessoes, escopo, schema, objeto, permissao):
+    """Adiciona uma concessão atômica preservando a ordem de inserção."""
+    concessoes[(escopo, schema, objeto, permissao)] = None
+
+def expandir_permissoes_postgres(schemas, usage_automatico=True):
+    """Expande os schemas do YAML em concessões atômicas PostgreSQL.
+
+    Cada concessão é uma tupla (escopo, schema, objeto, permissão), onde o
+    escopo é "schema", "tabela", "todas_tabelas", "funcoes" ou "database".
+    Em revogações o USAGE automático dos schemas granulares não é incluído.
+    """
+    concessoes = {}
+
+    for schema in schemas:
+        schema_nome = schema["nome"]
+
+        if "tipo" in schema and schema["tipo"] == "granular":
+            # Aplicar USAGE no schema automaticamente para permissões granulares
+            if usage_automatico:
+                _adicionar(concessoes, "schema", schema_nome, None, "USAGE")
+
+            for tabela in schema["tabelas"]:
+                for permissao in tabela["permissions"]:
+                    permissao_upper = permissao.upper()
+
+                    if permissao_upper in PG_TABLE_PERMS or permissao_upper == "ALL PRIVILEGES":
+                        _adicionar(concessoes, "tabela", schema_nome, tabela["nome"], permissao_upper)
+                    # Permissões que não se aplicam a tabelas específicas vão para o schema/banco
+                    elif permissao_upper in PG_FUNCTION_PERMS:
+                        _adicionar(concessoes, "funcoes", schema_nome, None, permissao_upper)
+                    elif permissao_upper in PG_SCHEMA_PERMS:
+                        _adicionar(concessoes, "schema", schema_nome, None, permissao_upper)
+                    elif permissao_upper in PG_DB_PERMS:
+                        _adicionar(concessoes, "database", None, None, permissao_upper)
+        else:
+            for permissao in schema["permissions"]:
+                permissao_upper = permissao.upper()
+
+                if permissao_upper in PG_TABLE_PERMS or permissao_upper == "ALL PRIVILEGES":
+                    _adicionar(concessoes, "todas_tabelas", schema_nome, None, permissao_upper)
+                elif permissao_upper in PG_FUNCTION_PERMS:
+                    _adicionar(concessoes, "funcoes", schema_nome, None, permissao_upper)
+                elif permissao_upper in PG_SCHEMA_PERMS:
+                    _adicionar(concessoes, "schema", schema_nome, None, permissao_upper)
+                elif permissao_upper in PG_DB_PERMS:
+                    _adicionar(concessoes, "database", None, None, permissao_upper)
+
+    return list(concessoes)
+
+def expandir_permissoes_mysql(database, schemas):
+    """Expande os schemas do YAML em concessões atômicas MySQL.
+
+    No MySQL as permissões são sempre concedidas por tabela do banco: no
+    formato simples o nome do schema é usado como tabela.
+    """
+    concessoes = {}
+
+    for schema in schemas:
+        if "tipo" in schema and schema["tipo"] == "granular":
+            for tabela in schema["tabelas"]:
+                for permissao in tabela["permissions"]:
+                    _adicionar(concessoes, "tabela", database, tabela["nome"], permissao.upper())
+        else:
+            for permissao in schema["permissions"]:
+                _adicionar(concessoes, "tabela", database, schema["nome"], permissao.upper())
+
+    return list(concessoes)
+
+def comprimir_concessoes_postgres(concessoes, relacoes):
+    """Troca os GRANTs por tabela de um schema por ALL TABLES IN SCHEMA quando cobrem o schema inteiro.
+
+    A troca só acontece quando as tabelas do YAML são exatamente as relações
+    existentes no schema (relacoes, lidas do catálogo) e todas têm o mesmo
+    conjunto de permissões. Retorna as concessões resultantes e, por schema
+    comprimido, o número de tabelas substituídas.
+    """
+    permissoes_por_tabela = {}
+    for escopo, schema, objeto, permissao in concessoes:
+        if escopo == "tabela":
+            permissoes_por_tabela.setdefault(schema, {}).setdefault(objeto, set()).add(permissao)
+
+    comprimidos = {}
+    for schema, tabelas in permissoes_por_tabela.items():
+        existentes = relacoes.get(schema)
+        if not existentes or set(tabelas) != existentes:
+            continue
+        conjuntos = {tuple(ordenar_permissoes(permissoes)) for permissoes in tabelas.values()}
+        if len(conjuntos) == 1:
+            comprimidos[schema] = len(tabelas)
+
+    if not comprimidos:
+        return concessoes, {}
+
+    resultado = {}
+    for concessao in concessoes:
+        escopo, schema, objeto, permissao = concessao
+        if escopo == "tabela" and schema in comprimidos:
+            _adicionar(resultado, "todas_tabelas", schema, None, permissao)
+        else:
+            resultado[concessao] = None
+
+    for schema, total in comprimidos.items():
+        logger.info(f"Otimização: {total} tabela(s) do schema {schema} cobertas por ALL TABLES IN SCHEMA")
+    return list(resultado), comprimidos
+
+def _agrupar(concessoes, engine):
+    """Agrupa concessões atômicas em blocos (escopo, schema, objetos, permissões).
+
+    Objetos do mesmo escopo e schema com o mesmo conjunto de permissões são
+    reunidos em um único bloco, na ordem da primeira ocorrência.
+    """
+    permissoes_por_objeto = {}
+    for escopo, schema, objeto, permissao in concessoes:
+        permissoes_por_objeto.setdefault((escopo, schema, objeto), set()).add(permissao)
+
+    blocos = {}
+    for (escopo, schema, objeto), permissoes in permissoes_por_objeto.items():
+        chave = (escopo, schema, tuple(ordenar_permissoes(permissoes, engine)))
+        blocos.setdefault(chave, []).append(objeto)
+
+    return [
+        {"escopo": escopo, "schema": schema, "objetos": objetos, "privilegios": list(permissoes)}
+        for (escopo, schema, permissoes), objetos in blocos.items()
+    ]
+
+def montar_instrucoes_postgres(username, concessoes, dbname, acao="GRANT", comprimidos=None):
+    """Monta as instruções PostgreSQL agrupadas a partir das concessões atômicas.
+
+    Instruções ALL TABLES IN SCHEMA vindas de comprimir_concessoes_postgres
+    recebem o campo "otimizacao", para que a troca apareça no plano.
+    """
+    destino = "TO" if acao == "GRANT" else "FROM"
+    instrucoes = []
+
+    for bloco in _agrupar(concessoes, "postgres"):
+        permissoes = ", ".join(bloco["privilegios"])
+        schema_nome = bloco["schema"]
+        escopo = bloco["escopo"]
+
+        if escopo == "tabela":
+            alvo = ", ".join(f"{schema_nome}.{tabela}" for tabela in bloco["objetos"])
+        elif escopo == "todas_tabelas":
+            alvo = f"ALL TABLES IN SCHEMA {schema_nome}"
+            if comprimidos and schema_nome in comprimidos:
+                bloco["otimizacao"] = f"{comprimidos[schema_nome]} tabela(s) cobertas por ALL TABLES IN SCHEMA"
+        elif escopo == "funcoes":
+            alvo = f"ALL FUNCTIONS IN SCHEMA {schema_nome}"
+        elif escopo == "schema":
+            alvo = f"SCHEMA {schema_nome}"
+        else:
+            alvo = f"DATABASE {dbname}"
+
+        bloco["sql"] = f'{acao} {permissoes} ON {alvo} {destino} "{username}";'
+        instrucoes.append(bloco)
+
+    return instrucoes
+
+def montar_instrucoes_mysql(username, concessoes, acao="GRANT"):
+    """Monta as instruções MySQL agrupadas (uma por tabela) a partir das concessões atômicas."""
+    destino = "TO" if acao == "GRANT" else "FROM"
+    instrucoes = []
+
+    for bloco in _agrupar(concessoes, "mysql"):
+        permissoes = ", ".join(bloco["privilegios"])
+        # O MySQL não aceita várias tabelas na mesma instrução GRANT/REVOKE
+        for tabela in bloco["objetos"]:
+            instrucoes.append({
+                "escopo": bloco["escopo"],
+                "schema": bloco["schema"],
+                "objetos": [tabela],
+                "privilegios": bloco["privilegios"],
+                "sql": f"{acao} {permissoes} ON `{bloco['schema']}`.`{tabela}` {destino} '{username}'@'%';"
+            })
+
+    return instrucoes
+
+def instrucao_criacao_postgres(username):
+    """Instrução idempotente de criação do role PostgreSQL."""
+    return {
+        "escopo": "usuario",
+        "schema": None,
+        "objetos": [username],
+        "privilegios": [],
+        "sql": f"DO $$ BEGIN IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = '{username}') THEN CREATE ROLE \"{username}\" WITH LOGIN; END IF; END $$;"
+    }
+
+def instrucao_criacao_mysql(username):
+    """Instrução idempotente de criação do usuário MySQL (autenticação IAM)."""
+    return {
+        "escopo": "usuario",
+        "schema": None,
+        "objetos": [username],
+        "privilegios": [],
+        "sql": f"CREATE USER IF NOT EXISTS '{username}'@'%' IDENTIFIED VIA AWSAuthenticationPlugin AS 'RDS';"
+    }
+
+def compilar_concessoes_postgres(username, schemas, dbname, catalogo=None, relacoes=None):
+    """Compila o plano completo de concessões PostgreSQL (criação do role + GRANTs).
+
+    Com as relações existentes em cada schema (relacoes, ou as do catálogo)
+    os schemas granulares que cobrem todas as tabelas com as mesmas
+    permissões viram ALL TABLES IN SCHEMA. Quando o catálogo atual do role
+    é informado (modo diff), apenas as concessões ausentes no banco entram
+    no plano, e a compressão considera só essas.
+    """
+    concessoes = expandir_permissoes_postgres(schemas)
+    instrucoes = []
+
+    if catalogo is not None:
+        concessoes = filtrar_concessoes_existentes(concessoes, catalogo, "postgres")
+
+    # Comprime só o que ainda falta: no modo diff, tabelas que já têm as permissões não são tocadas
+    if relacoes is None and catalogo is not None:
+        relacoes = catalogo["relacoes"]
+    comprimidos = {}
+    if relacoes:
+        concessoes, comprimidos = comprimir_concessoes_postgres(concessoes, relacoes)
+
+    if catalogo is None or not catalogo["usuario_existe"]:
+        instrucoes.append(instrucao_criacao_postgres(username))
+
+    instrucoes.extend(montar_instrucoes_postgres(username, concessoes, dbname, comprimidos=comprimidos))
+    return instrucoes
+
+def compilar_concessoes_mysql(username, database, schemas, catalogo=None):
+    """Compila o plano completo de concessões MySQL (criação do usuário + GRANTs).
+
+    Quando o catálogo atual do usuário é informado (modo diff), apenas as
+    concessões ausentes no banco entram no plano.
+    """
+    concessoes = expandir_permissoes_mysql(database, schemas)
+    instrucoes = []
+
+    if catalogo is not None:
+        concessoes = filtrar_concessoes_existentes(concessoes, catalogo, "mysql")
+
+    if catalogo is None or not catalogo["usuario_existe"]:
+        instrucoes.append(instrucao_criacao_mysql(username))
+
+    instrucoes.extend(montar_instrucoes_mysql(username, concessoes))
+    return instrucoes
+
+def _sobrepoe(concessao, revogacao):
+    """Indica se uma revogação atômica retira (parte de) uma concessão atômica.
+
+    ALL PRIVILEGES se sobrepõe a qualquer permissão; revogações em todas as
+    tabelas de um schema atingem cada tabela dele e vice-versa.
+    """
+    escopo_c, schema_c, objeto_c, permissao_c = concessao
+    escopo_r, schema_r, objeto_r, permissao_r = revogacao
+
+    if permissao_c != permissao_r and "ALL PRIVILEGES" not in (permissao_c, permissao_r):
+        return False
+    if schema_c != schema_r:
+        return False
+
+    escopos_tabela = ("tabela", "todas_tabelas")
+    if escopo_c in escopos_tabela and escopo_r in escopos_tabela:
+        return objeto_c == objeto_r or None in (objeto_c, objeto_r)
+    return escopo_c == escopo_r and objeto_c == objeto_r
+
+def _reconciliar(revogacoes, concessoes, concessoes_finais):
+    """Completa as concessões com as do estado final atingidas pelas revogações.
+
+    Uma revogação pode retirar privilégios que o estado final ainda exige
+    (ex.: ALL PRIVILEGES revogado com SELECT mantido); essas concessões são
+    reemitidas depois das revogações.
+    """
+    incluidas = set(concessoes)
+    concessoes = list(concessoes)
+    for concessao in concessoes_finais:
+        if concessao not in incluidas and any(_sobrepoe(concessao, revogacao) for revogacao in revogacoes):
+            concessoes.append(concessao)
+            incluidas.add(concessao)
+    return concessoes
+
+def compilar_reconciliacao_postgres(username, revogar_schemas, conceder_schemas, schemas, dbname):
+    """Compila o plano PostgreSQL que leva o role do estado anterior ao atual.
+
+    O plano contém a criação do role, os REVOKEs do que foi removido e os
+    GRANTs do que foi adicionado (mais o que as revogações retiraram e o
+    estado atual ainda exige).
+    """
+    revogacoes = expandir_permissoes_postgres(revogar_schemas, usage_automatico=False)
+    concessoes = _reconciliar(
+        revogacoes,
+        expandir_permissoes_postgres(conceder_schemas),
+        expandir_permissoes_postgres(schemas)
+    )
+
+    instrucoes = [instrucao_criacao_postgres(username)]
+    instrucoes.extend(montar_instrucoes_postgres(username, revogacoes, dbname, acao="REVOKE"))
+    instrucoes.extend(montar_instrucoes_postgres(username, concessoes, dbname))
+    return instrucoes
+
+def compilar_reconciliacao_mysql(username, database, revogar_schemas, conceder_schemas, schemas):
+    """Compila o plano MySQL que leva o usuário do estado anterior ao atual."""
+    revogacoes = expandir_permissoes_mysql(database, revogar_schemas)
+    concessoes = _reconciliar(
+        revogacoes,
+        expandir_permissoes_mysql(database, conceder_schemas),
+        expandir_permissoes_mysql(database, schemas)
+    )
+
+    instrucoes = [instrucao_criacao_mysql(username)]
+    instrucoes.extend(montar_instrucoes_mysql(username, revogacoes, acao="REVOKE"))
+    instrucoes.extend(montar_instrucoes_mysql(username, concessoes))
+    return instrucoes
+
+def executar_instrucoes(conn, instrucoes, engine, politica=None):
+    """Envia as instruções do plano ao banco com timeouts de lock e novas tentativas.
+
+    No PostgreSQL as instruções seguem em lotes (um execute por lote, no
+    protocolo de consulta simples), cada um com um SAVEPOINT. No MySQL a
+    conexão precisa ter sido aberta com CLIENT.MULTI_STATEMENTS e o plano
+    segue em um único execute. Em lock ocupado só o trecho que falhou é
+    reenviado (execucao.executar_plano).
+    """
+    if not instrucoes:
+        return
+
+    idas_e_voltas, retentativas = executar_plano(conn, instrucoes, engine, politica)
+
+    detalhe = f", {retentativas} nova(s) tentativa(s) por lock ocupado" if retentativas else ""
+    logger.info(f"Plano executado: {len(instrucoes)} instrução(ões) em {idas_e_voltas} ida(s) e volta(s){detalhe}")
+
+def descrever_plano(operacao, dados, porta, instrucoes, idas_e_voltas, agrupamento, observacoes=None):
+    """Descreve um plano compilado sem conexão (modo --plan), pronto para JSON.
+
+    idas_e_voltas traz as idas e voltas ao banco esperadas por etapa (ex.:
+    envio do plano, commit) e agrupamento, como as concessões foram reunidas
+    em instruções, para dimensionar timeouts e identificar planos lentos.
+    """
+    engine = dados["engine"].lower()
+    return {
+        "operacao": operacao,
+        "engine": engine,
+        "host": dados["host"],
+        "porta": porta,
+        "banco": dados["database"],
+        "usuario": dados["user"],
+        "total_instrucoes": len(instrucoes),
+        "instrucoes_por_engine_host": {f"{engine}@{dados['host']}:{porta}": len(instrucoes)},
+        "idas_e_voltas": sum(idas_e_voltas.values()),
+        "idas_e_voltas_por_etapa": idas_e_voltas,
+        "agrupamento": agrupamento,
+        "observacoes": observacoes or [],
+        "instrucoes": [{"ordem": ordem, **instrucao} for ordem, instrucao in enumerate(instrucoes, 1)]
+    }
+
+def emitir_plano(plano, saida=None):
+    """Escreve o plano em JSON (stdout por padrão; os logs seguem no stderr)."""
+    saida = saida or sys.stdout
+    json.dump(plano, saida, ensure_ascii=False, indent=2)
+    saida.write("\n")
@@ -4,6 +4,8 @@ import yaml
 import json
 from pathlib import Path
 
+from yaml_io import safe_load
+
 def read_wizard_temp_file(session_id):
     temp_file = Path(f"wizard-temp/{session_id}.yml")
     
@@ -13,7 +15,7 @@ def read_wizard_temp_file(session_id):
     
     try:
         with open(temp_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = safe_load(f)
         
         if not data or 'dados_basicos' not in data:
             print(f"❌ Estrutura inválida no arquivo temporário")
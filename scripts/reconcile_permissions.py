@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script de Reconciliação de Permissões - Database Access Control
+Leva um usuário do estado anterior ao estado atual do arquivo YAML revogando
+o que foi removido e concedendo o que foi adicionado em uma única transação,
+na mesma conexão
+"""
+
+import os
+import sys
+import logging
+
+import yaml
+
+from apply_permissions import carregar_dados, obter_porta, conectar, registrar_plano, registrar_resumo
+from grant_diff import diff_schemas
+from plano_sql import compilar_reconciliacao_postgres, compilar_reconciliacao_mysql, executar_instrucoes
+from credenciais import obter_credenciais
+from yaml_io import safe_load
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def mesma_identidade(dados_antes, dados):
+    """Indica se os dois estados se referem ao mesmo usuário no mesmo banco."""
+    if not dados_antes or "schemas" not in dados_antes:
+        return False
+    campos = ["user", "database", "host"]
+    return (
+        all(dados_antes.get(campo) == dados[campo] for campo in campos)
+        and str(dados_antes.get("engine", "")).lower() == dados["engine"].lower()
+        and obter_porta(dados_antes) == obter_porta(dados)
+    )
+
+def compilar_plano(dados_antes, dados, dbname):
+    """Compila o plano de reconciliação (criação, REVOKEs e GRANTs) entre os dois estados."""
+    schemas_antes = dados_antes["schemas"] if dados_antes and "schemas" in dados_antes else []
+    revogar_schemas, conceder_schemas = diff_schemas(schemas_antes, dados["schemas"])
+
+    engine = dados["engine"].lower()
+    if "postgres" in engine:
+        return compilar_reconciliacao_postgres(dados["user"], revogar_schemas, conceder_schemas, dados["schemas"], dbname)
+    elif "mysql" in engine:
+        return compilar_reconciliacao_mysql(dados["user"], dados["database"], revogar_schemas, conceder_schemas, dados["schemas"])
+    raise ValueError(f"Engine não suportado: {engine}")
+
+def reconciliar_dados(conn, dados_antes, dados):
+    """Reconcilia as permissões de um usuário usando uma conexão aberta.
+
+    No PostgreSQL REVOKEs e GRANTs são confirmados juntos, sem janela em que
+    o usuário fique sem acesso. No MySQL cada GRANT/REVOKE confirma
+    implicitamente, mas o plano segue em uma única ida e volta. Retorna o
+    número de instruções executadas.
+    """
+    engine = dados["engine"].lower()
+    try:
+        instrucoes = compilar_plano(dados_antes, dados, dados["database"])
+        logger.info(f"Plano de reconciliação com {len(instrucoes)} instrução(ões):")
+        registrar_plano(instrucoes)
+
+        executar_instrucoes(conn, instrucoes, engine)
+
+        conn.commit()
+        logger.info("Transação de reconciliação commitada com sucesso")
+        return len(instrucoes)
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Erro ao reconciliar permissões: {e}")
+        raise
+
+def reconciliar_permissoes(caminho_yaml_antes, caminho_yaml_depois):
+    """Função principal para reconciliar permissões entre dois estados do arquivo."""
+    try:
+        logger.info(f"Iniciando reconciliação de permissões: {caminho_yaml_antes} -> {caminho_yaml_depois}")
+
+        with open(caminho_yaml_antes, 'r', encoding='utf-8') as arquivo:
+            dados_antes = safe_load(arquivo) or {}
+        dados = carregar_dados(caminho_yaml_depois)
+
+        if dados_antes and not mesma_identidade(dados_antes, dados):
+            raise ValueError("Usuário, banco ou host mudaram entre os estados; use revogação total e aplicação")
+
+        engine = dados["engine"].lower()
+        host = dados["host"]
+        dbname = dados["database"]
+        port = obter_porta(dados)
+
+        user = os.environ.get("DB_USER")
+        password = os.environ.get("DB_PASS")
+        if not user or not password:
+            user, password = obter_credenciais(dbname, dados["engine"])
+
+        logger.info(f"Configuração: Engine={engine}, Host={host}, Porta={port}, Banco={dbname}")
+
+        conn = None
+        try:
+            conn = conectar(engine, host, port, user, password, dbname)
+            reconciliar_dados(conn, dados_antes, dados)
+        finally:
+            if conn:
+                conn.close()
+                logger.info("Conexão fechada")
+
+        registrar_resumo(dados)
+
+    except FileNotFoundError as e:
+        logger.error(f"Arquivo não encontrado: {e.filename}")
+        sys.exit(1)
+    except yaml.YAMLError as e:
+        logger.error(f"Erro ao processar YAML: {e}")
+        sys.exit(1)
+    except ValueError as e:
+        logger.error(f"Erro de validação: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Erro inesperado: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python reconcile_permissions.py <arquivo_antes.yml> <arquivo_depois.yml>")
+        sys.exit(1)
+
+    reconciliar_permissoes(sys.argv[1], sys.argv[2])
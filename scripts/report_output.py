@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Saída de Relatórios - Database Access Control
+Abre o arquivo de saída dos relatórios (texto UTF-8 ou gzip, pela extensão
+.gz) e grava o conteúdo em partes, à medida que é gerado
+"""
+
+import gzip
+
+def open_output(output_file):
+    """Abre o arquivo de saída para escrita de texto; compacta com gzip se terminar em .gz."""
+    if output_file.endswith('.gz'):
+        return gzip.open(output_file, 'wt', encoding='utf-8')
+    return open(output_file, 'w', encoding='utf-8')
+
+def write_chunks(output, chunks):
+    """Grava as partes de um gerador no arquivo aberto, sem montar o documento em memória."""
+    for chunk in chunks:
+        output.write(chunk)
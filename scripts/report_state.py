@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Estado Incremental do Relatório Geral - Database Access Control
+Guarda as permissões carregadas e o acumulador das estatísticas junto com o
+commit de origem, para que a próxima execução aplique apenas os arquivos
+alterados (git diff --name-status) em vez de reler toda a árvore
+"""
+
+import os
+import json
+import subprocess
+
+from grant_model import json_default, schemas_by_name
+from permission_stats import PermissionStats, PermissionEntry
+from yaml_io import json_object_hook
+
+# Alterar quando o formato do estado mudar (força uma carga completa)
+STATE_VERSION = "4"
+
+DEFAULT_STATE_PATH = ".report-state.json"
+
+class ReportState:
+    """Permissões carregadas (ambiente → usuário → banco) e o acumulador das estatísticas.
+
+    Cada arquivo YAML contribui com uma entrada; files guarda de onde veio
+    cada entrada para que remover ou atualizar um arquivo desfaça exatamente
+    a sua contribuição nas estatísticas.
+    """
+
+    def __init__(self, base_path, environments):
+        self.version = STATE_VERSION
+        self.base_path = base_path
+        self.environments = list(environments)
+        self.commit = None
+        self.data = {environment: {} for environment in self.environments}
+        self.files = {}
+        self.permission_stats = PermissionStats()
+
+    def add(self, environment, user_email, db_key, db_info):
+        """Adiciona a entrada de um arquivo e soma a sua contribuição nas estatísticas."""
+        env_data = self.data.setdefault(environment, {})
+        previous = env_data.get(user_email, {}).get(db_key)
+        if previous is not None:
+            self.remove_file(previous['file_path'])
+
+        env_data.setdefault(user_email, {})[db_key] = db_info
+        self.files[db_info['file_path']] = (environment, user_email, db_key)
+        self.permission_stats.add(PermissionEntry(environment, user_email, db_key, db_info))
+
+    def remove_file(self, path):
+        """Remove a entrada de um arquivo (se houver) e desconta a sua contribuição."""
+        location = self.files.pop(path, None)
+        if location is None:
+            return False
+        environment, user_email, db_key = location
+        databases = self.data[environment][user_email]
+        db_info = databases.pop(db_key)
+        if not databases:
+            del self.data[environment][user_email]
+        self.permission_stats.remove(PermissionEntry(environment, user_email, db_key, db_info))
+        return True
+
+    def ordered_data(self):
+        """Permissões na ordem dos ambientes, omitindo ambientes sem usuários."""
+        return {env: self.data[env] for env in self.environments if self.data.get(env)}
+
+    def stats(self):
+        """Estatísticas no formato de GeneralReportGenerator._calculate_stats (com os agregados extras)."""
+        return self.permission_stats.as_report_stats(self.environments)
+
+def _valid_entry(entry):
+    return (isinstance(entry, list) and len(entry) == 4
+            and all(isinstance(field, str) for field in entry[:3])
+            and isinstance(entry[3], dict) and isinstance(entry[3].get('file_path'), str)
+            and isinstance(entry[3].get('schemas'), list))
+
+def load_state(state_path, base_path, environments):
+    """Lê o estado salvo (JSON); retorna None se não existir ou não for compatível.
+
+    O arquivo vem do cache do workflow, então é tratado como dado não
+    confiável: só JSON, com a versão e o formato conferidos antes de uso.
+    As estatísticas não são gravadas; são recalculadas a partir das entradas.
+    Os schemas ficam no formato do YAML e voltam ao modelo (SchemaGrant).
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f, object_hook=json_object_hook)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(saved, dict) or saved.get('version') != STATE_VERSION
+            or saved.get('base_path') != base_path or saved.get('environments') != list(environments)):
+        return None
+    commit = saved.get('commit')
+    entries = saved.get('entries')
+    if not (commit is None or isinstance(commit, str)) or not isinstance(entries, list):
+        return None
+    if not all(_valid_entry(entry) for entry in entries):
+        return None
+
+    state = ReportState(base_path, environments)
+    for environment, user_email, db_key, db_info in entries:
+        if environment not in state.data:
+            return None
+        try:
+            db_info['schemas'] = list(schemas_by_name(db_info['schemas']).values())
+        except (AttributeError, KeyError, TypeError):
+            return None
+        state.add(environment, user_email, db_key, db_info)
+    state.commit = commit
+    return state
+
+def save_state(state_path, state):
+    """Grava o estado em JSON (arquivo temporário + rename, para não deixar estado parcial)."""
+    saved = {
+        'version': state.version,
+        'base_path': state.base_path,
+        'environments': state.environments,
+        'commit': state.commit,
+        'entries': [
+            [environment, user_email, db_key, db_info]
+            for environment, users in state.data.items()
+            for user_email, databases in users.items()
+            for db_key, db_info in databases.items()
+        ]
+    }
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(saved, f, ensure_ascii=False, separators=(',', ':'), default=json_default)
+    os.replace(temp_path, state_path)
+
+def _git(*args):
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout
+
+def git_head():
+    """Commit atual (HEAD); None fora de um repositório git."""
+    try:
+        return _git("rev-parse", "HEAD").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def has_local_changes(base_path):
+    """Indica se há alterações não commitadas (ou arquivos novos) sob base_path."""
+    try:
+        return bool(_git("status", "--porcelain", "--", base_path).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return True
+
+def changed_files(previous_commit, base_path):
+    """Arquivos sob base_path alterados entre previous_commit e HEAD.
+
+    Retorna uma lista de (status, caminho) com status A, M, D ou T e o
+    caminho no mesmo formato das entradas do índice (base_path/...), ou None
+    se o commit anterior não estiver disponível (ex.: clone raso).
+    """
+    try:
+        toplevel = _git("rev-parse", "--show-toplevel").strip()
+        output = _git("diff", "--name-status", "--no-renames", "-z",
+                      f"{previous_commit}..HEAD", "--", os.path.abspath(base_path))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    fields = output.split("\0")
+    changes = []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        relative = os.path.relpath(os.path.join(toplevel, path), os.path.abspath(base_path))
+        changes.append((status[0], os.path.join(base_path, relative)))
+    return changes
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """
 Script de Revogação Total de Permissões - Database Access Control
-Revoga todas as permissões de um usuário quando um arquivo YAML é deletado
+Revoga todas as permissões de um usuário quando um arquivo YAML é deletado.
+As revogações vêm do catálogo do banco (onde o usuário tem privilégios,
+inclusive os concedidos fora do YAML), em poucas instruções; o YAML é
+reproduzido apenas quando o catálogo não pode ser lido
 """
 
 import os
@@ -9,6 +12,11 @@ import sys
 import yaml
 import logging
 
+from catalogo import ler_privilegios_role_postgres, ler_grants_mysql
+from credenciais import obter_credenciais
+from medicao import MEDIDOR, finalizar
+from yaml_io import safe_load
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -77,72 +85,245 @@ def conectar_mysql(host, port, user, password, database):
         logger.error(f"Erro ao conectar MySQL: {e}")
         raise
 
+PG_TABLE_PERMS = ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]
+
+# Objetos revogados em bloco por schema (tipo do catálogo, objeto de ALL ... IN SCHEMA)
+OBJETOS_SCHEMA_POSTGRES = (("tabela", "TABLES"), ("sequencia", "SEQUENCES"), ("funcao", "FUNCTIONS"))
+
+SAVEPOINT_REVOGACAO = "revogacao_total"
+
+def _item(schema, tabela, permissao, descricao, instrucoes, desfazer=()):
+    """Item da revogação total: as instruções de uma permissão (falham juntas).
+
+    desfazer são as instruções executadas quando o item falha (ex.: ROLLBACK
+    TO SAVEPOINT, para que a falha não aborte a transação PostgreSQL).
+    """
+    return {
+        "schema": schema,
+        "tabela": tabela,
+        "permissao": permissao,
+        "descricao": descricao,
+        "instrucoes": instrucoes,
+        "desfazer": list(desfazer)
+    }
+
+def _identificador_postgres(nome):
+    """Identificador PostgreSQL entre aspas (nomes vindos do catálogo)."""
+    return '"' + nome.replace('"', '""') + '"'
+
+def _em_savepoint(instrucoes):
+    """Instruções dentro de um savepoint e as que o desfazem em caso de falha."""
+    return (
+        [f"SAVEPOINT {SAVEPOINT_REVOGACAO};", *instrucoes, f"RELEASE SAVEPOINT {SAVEPOINT_REVOGACAO};"],
+        [f"ROLLBACK TO SAVEPOINT {SAVEPOINT_REVOGACAO};", f"RELEASE SAVEPOINT {SAVEPOINT_REVOGACAO};"]
+    )
+
+def compilar_revogacao_total_postgres(username, schemas, dbname):
+    """Compila a revogação total PostgreSQL na ordem de execução (um item por permissão).
+
+    Permissões sem instrução correspondente geram itens vazios, que só
+    aparecem no log.
+    """
+    itens = []
+    for schema in schemas:
+        schema_nome = schema['nome']
+
+        if "tipo" in schema and schema["tipo"] == "granular":
+            for tabela in schema["tabelas"]:
+                nome_tabela = tabela["nome"]
+                alvo = f"{schema_nome}.{nome_tabela}"
+
+                for permissao in tabela["permissions"]:
+                    permissao_upper = permissao.upper()
+                    if permissao_upper in PG_TABLE_PERMS or permissao_upper == "ALL PRIVILEGES":
+                        instrucoes = [f'REVOKE {permissao_upper} ON {alvo} FROM "{username}";']
+                    elif permissao_upper == "EXECUTE":
+                        instrucoes = [f'REVOKE EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";']
+                    elif permissao_upper in ["USAGE", "CREATE"]:
+                        instrucoes = [f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";']
+                    elif permissao_upper in ["TEMP", "CONNECT"]:
+                        instrucoes = [f'REVOKE {permissao_upper} ON DATABASE {dbname} FROM "{username}";']
+                    else:
+                        instrucoes = []
+                    itens.append(_item(schema_nome, alvo, permissao_upper, f"da tabela {alvo}", instrucoes))
+        else:
+            for permissao in schema["permissions"]:
+                permissao_upper = permissao.upper()
+                if permissao_upper in PG_TABLE_PERMS:
+                    instrucoes = [f'REVOKE {permissao_upper} ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";']
+                elif permissao_upper == "EXECUTE":
+                    instrucoes = [f'REVOKE EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";']
+                elif permissao_upper in ["USAGE", "CREATE"]:
+                    instrucoes = [f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";']
+                elif permissao_upper in ["TEMP", "CONNECT"]:
+                    instrucoes = [f'REVOKE {permissao_upper} ON DATABASE {dbname} FROM "{username}";']
+                elif permissao_upper == "ALL PRIVILEGES":
+                    instrucoes = [
+                        f'REVOKE ALL PRIVILEGES ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";',
+                        f'REVOKE ALL PRIVILEGES ON SCHEMA {schema_nome} FROM "{username}";'
+                    ]
+                else:
+                    instrucoes = []
+                itens.append(_item(schema_nome, None, permissao_upper, f"do schema {schema_nome}", instrucoes))
+    return itens
+
+def compilar_revogacao_total_mysql(username, database, schemas):
+    """Compila a revogação total MySQL na ordem de execução (um item por permissão)."""
+    itens = []
+    for schema in schemas:
+        schema_nome = schema['nome']
+
+        if "tipo" in schema and schema["tipo"] == "granular":
+            for tabela in schema["tabelas"]:
+                alvo = f"{database}.{tabela['nome']}"
+                for permissao in tabela["permissions"]:
+                    permissao_upper = permissao.upper()
+                    itens.append(_item(schema_nome, alvo, permissao_upper, f"da tabela {alvo}", [
+                        f'REVOKE {permissao_upper} ON `{database}`.`{tabela["nome"]}` FROM \'{username}\'@\'%\';'
+                    ]))
+        else:
+            for permissao in schema["permissions"]:
+                permissao_upper = permissao.upper()
+                if permissao_upper == "ALL PRIVILEGES":
+                    sql = f'REVOKE ALL PRIVILEGES ON `{database}`.* FROM \'{username}\'@\'%\';'
+                else:
+                    sql = f'REVOKE {permissao_upper} ON `{database}`.`{schema_nome}` FROM \'{username}\'@\'%\';'
+                itens.append(_item(schema_nome, None, permissao_upper, f"do schema {schema_nome}", [sql]))
+    return itens
+
+def compilar_revogacao_catalogo_postgres(username, privilegios, dbname):
+    """Compila a revogação total PostgreSQL a partir do catálogo do role (ler_privilegios_role_postgres).
+
+    Um item por schema com REVOKE ALL ... IN SCHEMA dos tipos de objeto em
+    que o role tem privilégio, um para o banco e, por fim, REASSIGN OWNED e
+    DROP OWNED BY, que também removem o que foi concedido por outros roles e
+    os objetos do role (exigem ser membro dele). Cada item roda em um
+    savepoint: uma falha só gera aviso. Role inexistente não gera itens.
+    """
+    if not privilegios["existe"]:
+        return []
+
+    role = f'"{username}"'
+    itens = []
+    for schema in sorted(privilegios["schemas"]):
+        objetos = privilegios["schemas"][schema]
+        alvo = _identificador_postgres(schema)
+        instrucoes = [
+            f'REVOKE ALL PRIVILEGES ON ALL {plural} IN SCHEMA {alvo} FROM {role};'
+            for tipo, plural in OBJETOS_SCHEMA_POSTGRES if tipo in objetos
+        ]
+        if "schema" in objetos:
+            instrucoes.append(f'REVOKE ALL PRIVILEGES ON SCHEMA {alvo} FROM {role};')
+        itens.append(_item(schema, None, "ALL PRIVILEGES", f"do schema {schema}", *_em_savepoint(instrucoes)))
+
+    if privilegios["banco"]:
+        instrucoes = [f'REVOKE ALL PRIVILEGES ON DATABASE {_identificador_postgres(dbname)} FROM {role};']
+        itens.append(_item(None, None, "ALL PRIVILEGES", f"do banco {dbname}", *_em_savepoint(instrucoes)))
+
+    instrucoes = [f'REASSIGN OWNED BY {role} TO CURRENT_USER;', f'DROP OWNED BY {role};']
+    itens.append(_item(None, None, "OWNED BY", f"do role {username}", *_em_savepoint(instrucoes)))
+    return itens
+
+def compilar_revogacao_catalogo_mysql(username, grants):
+    """Compila a revogação total MySQL a partir de SHOW GRANTS (ler_grants_mysql).
+
+    Um único REVOKE ALL PRIVILEGES, GRANT OPTION remove os privilégios de
+    todos os níveis (global, banco, tabela, coluna e rotina); usuário
+    inexistente ou só com USAGE não gera itens.
+    """
+    concessoes = [grant for grant in grants if not grant.upper().startswith("GRANT USAGE ON *.* ")]
+    if not concessoes:
+        return []
+    for grant in concessoes:
+        logger.info(f"Privilégio atual: {grant}")
+    return [_item(None, None, "ALL PRIVILEGES", f"({len(concessoes)} GRANT(s) de SHOW GRANTS)", [
+        f'REVOKE ALL PRIVILEGES, GRANT OPTION FROM \'{username}\'@\'%\';'
+    ])]
+
+def instrucao_remocao(username, engine):
+    """Remoção do usuário ao final da revogação total."""
+    if engine == 'mysql':
+        return f'DROP USER IF EXISTS \'{username}\'@\'%\';'
+    return f'DROP ROLE IF EXISTS "{username}";'
+
+def planejar_remocao(username, engine):
+    """Instruções da remoção do usuário e as que a desfazem se ela falhar.
+
+    No PostgreSQL o DROP ROLE fica em um savepoint: se ele falhar (ex.: o
+    role ainda possui objetos em outro banco), a transação não é abortada e
+    as revogações anteriores continuam sendo confirmadas.
+    """
+    instrucao = instrucao_remocao(username, engine)
+    if engine == 'mysql':
+        return [instrucao], []
+    return _em_savepoint([instrucao])
+
+def registrar_inicio_item(item, anterior):
+    """Registra no log a troca de schema/tabela entre dois itens da revogação total."""
+    if anterior is None or item["schema"] != anterior["schema"]:
+        if item["schema"] is not None:
+            logger.info(f"Revogando permissões do schema: {item['schema']}")
+        anterior = None
+    if item["tabela"] and (anterior is None or item["tabela"] != anterior["tabela"]):
+        logger.info(f"Revogando permissões da tabela: {item['tabela']}")
+
+def executar_revogacao_total(conn, username, itens, engine):
+    """Executa os itens e a remoção do usuário (cada falha só gera aviso) e confirma."""
+    with conn.cursor() as cur:
+        anterior = None
+        for item in itens:
+            with MEDIDOR.contexto(schema=item["schema"]):
+                registrar_inicio_item(item, anterior)
+                anterior = item
+                try:
+                    for sql in item["instrucoes"]:
+                        cur.execute(sql)
+                    logger.info(f"Revogada permissão {item['permissao']} {item['descricao']}")
+                except Exception as e:
+                    logger.warning(f"Erro ao revogar {item['permissao']} {item['descricao']}: {e}")
+                    for sql in item["desfazer"]:
+                        cur.execute(sql)
+
+        instrucoes, desfazer = planejar_remocao(username, engine)
+        try:
+            logger.info(f"Removendo usuário: {username}")
+            for sql in instrucoes:
+                cur.execute(sql)
+            logger.info(f"Usuário {username} removido com sucesso")
+        except Exception as e:
+            logger.warning(f"Erro ao remover usuário {username}: {e}")
+            for sql in desfazer:
+                cur.execute(sql)
+
+        conn.commit()
+
+def planejar_revogacao_total_postgres(conn, username, schemas, dbname):
+    """Itens da revogação total PostgreSQL: do catálogo do role ou, se ele não puder ser lido, do YAML."""
+    try:
+        privilegios = ler_privilegios_role_postgres(conn, username)
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Catálogo do role indisponível, revogando a partir do YAML: {e}")
+        return compilar_revogacao_total_postgres(username, schemas, dbname)
+    return compilar_revogacao_catalogo_postgres(username, privilegios, dbname)
+
+def planejar_revogacao_total_mysql(conn, username, database, schemas):
+    """Itens da revogação total MySQL: de SHOW GRANTS ou, se ele falhar, do YAML."""
+    try:
+        grants = ler_grants_mysql(conn, username)
+    except Exception as e:
+        logger.warning(f"SHOW GRANTS indisponível, revogando a partir do YAML: {e}")
+        return compilar_revogacao_total_mysql(username, database, schemas)
+    return compilar_revogacao_catalogo_mysql(username, grants)
+
 def revogar_todas_permissoes_postgres(conn, username, schemas):
     """Revoga todas as permissões PostgreSQL de um usuário."""
     try:
-        with conn.cursor() as cur:
-            logger.info(f"Iniciando revogação total para usuário PostgreSQL: {username}")
-            
-            for schema in schemas:
-                schema_nome = schema['nome']
-                logger.info(f"Revogando permissões do schema: {schema_nome}")
-                
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    for tabela in schema["tabelas"]:
-                        nome_tabela = tabela["nome"]
-                        logger.info(f"Revogando permissões da tabela: {schema_nome}.{nome_tabela}")
-                        
-                        for permissao in tabela["permissions"]:
-                            permissao_upper = permissao.upper()
-                            try:
-                                if permissao_upper in ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]:
-                                    cur.execute(f'REVOKE {permissao_upper} ON {schema_nome}.{nome_tabela} FROM "{username}";')
-                                elif permissao_upper == "ALL PRIVILEGES":
-                                    cur.execute(f'REVOKE ALL PRIVILEGES ON {schema_nome}.{nome_tabela} FROM "{username}";')
-                                elif permissao_upper == "EXECUTE":
-                                    cur.execute(f'REVOKE EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";')
-                                elif permissao_upper in ["USAGE", "CREATE"]:
-                                    cur.execute(f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";')
-                                elif permissao_upper == "TEMP":
-                                    cur.execute(f'REVOKE TEMP ON DATABASE {conn.info.dbname} FROM "{username}";')
-                                elif permissao_upper == "CONNECT":
-                                    cur.execute(f'REVOKE CONNECT ON DATABASE {conn.info.dbname} FROM "{username}";')
-                                
-                                logger.info(f"Revogada permissão {permissao_upper} da tabela {schema_nome}.{nome_tabela}")
-                            except Exception as e:
-                                logger.warning(f"Erro ao revogar {permissao_upper} da tabela {schema_nome}.{nome_tabela}: {e}")
-                else:
-                    for permissao in schema["permissions"]:
-                        permissao_upper = permissao.upper()
-                        try:
-                            if permissao_upper in ["SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE", "REFERENCES", "TRIGGER"]:
-                                cur.execute(f'REVOKE {permissao_upper} ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";')
-                            elif permissao_upper == "EXECUTE":
-                                cur.execute(f'REVOKE EXECUTE ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";')
-                            elif permissao_upper in ["USAGE", "CREATE"]:
-                                cur.execute(f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";')
-                            elif permissao_upper == "TEMP":
-                                cur.execute(f'REVOKE TEMP ON DATABASE {conn.info.dbname} FROM "{username}";')
-                            elif permissao_upper == "ALL PRIVILEGES":
-                                cur.execute(f'REVOKE ALL PRIVILEGES ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";')
-                                cur.execute(f'REVOKE ALL PRIVILEGES ON SCHEMA {schema_nome} FROM "{username}";')
-                            elif permissao_upper == "CONNECT":
-                                cur.execute(f'REVOKE CONNECT ON DATABASE {conn.info.dbname} FROM "{username}";')
-                            
-                            logger.info(f"Revogada permissão {permissao_upper} do schema {schema_nome}")
-                        except Exception as e:
-                            logger.warning(f"Erro ao revogar {permissao_upper} do schema {schema_nome}: {e}")
-            
-            try:
-                logger.info(f"Removendo usuário: {username}")
-                cur.execute(f'DROP ROLE IF EXISTS "{username}";')
-                logger.info(f"Usuário {username} removido com sucesso")
-            except Exception as e:
-                logger.warning(f"Erro ao remover usuário {username}: {e}")
-            
-            conn.commit()
-            logger.info("Revogação total PostgreSQL concluída com sucesso")
-            
+        logger.info(f"Iniciando revogação total para usuário PostgreSQL: {username}")
+        itens = planejar_revogacao_total_postgres(conn, username, schemas, conn.info.dbname)
+        executar_revogacao_total(conn, username, itens, "postgres")
+        logger.info("Revogação total PostgreSQL concluída com sucesso")
+
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro durante revogação PostgreSQL: {e}")
@@ -151,85 +332,71 @@ def revogar_todas_permissoes_postgres(conn, username, schemas):
 def revogar_todas_permissoes_mysql(conn, username, database, schemas):
     """Revoga todas as permissões MySQL de um usuário."""
     try:
-        with conn.cursor() as cur:
-            logger.info(f"Iniciando revogação total para usuário MySQL: {username}")
-            
-            for schema in schemas:
-                schema_nome = schema['nome']
-                logger.info(f"Revogando permissões do schema: {schema_nome}")
-                
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    for tabela in schema["tabelas"]:
-                        nome_tabela = tabela["nome"]
-                        logger.info(f"Revogando permissões da tabela: {database}.{nome_tabela}")
-                        
-                        for permissao in tabela["permissions"]:
-                            try:
-                                cur.execute(f'REVOKE {permissao.upper()} ON `{database}`.`{nome_tabela}` FROM \'{username}\'@\'%\';')
-                                logger.info(f"Revogada permissão {permissao.upper()} da tabela {database}.{nome_tabela}")
-                            except Exception as e:
-                                logger.warning(f"Erro ao revogar {permissao.upper()} da tabela {database}.{nome_tabela}: {e}")
-                else:
-                    for permissao in schema["permissions"]:
-                        try:
-                            if permissao.upper() == "ALL PRIVILEGES":
-                                cur.execute(f'REVOKE ALL PRIVILEGES ON `{database}`.* FROM \'{username}\'@\'%\';')
-                            else:
-                                cur.execute(f'REVOKE {permissao.upper()} ON `{database}`.`{schema_nome}` FROM \'{username}\'@\'%\';')
-                            logger.info(f"Revogada permissão {permissao.upper()} do schema {schema_nome}")
-                        except Exception as e:
-                            logger.warning(f"Erro ao revogar {permissao.upper()} do schema {schema_nome}: {e}")
-            
-            try:
-                logger.info(f"Removendo usuário: {username}")
-                cur.execute(f'DROP USER IF EXISTS \'{username}\'@\'%\';')
-                logger.info(f"Usuário {username} removido com sucesso")
-            except Exception as e:
-                logger.warning(f"Erro ao remover usuário {username}: {e}")
-            
-            conn.commit()
-            logger.info("Revogação total MySQL concluída com sucesso")
-            
+        logger.info(f"Iniciando revogação total para usuário MySQL: {username}")
+        itens = planejar_revogacao_total_mysql(conn, username, database, schemas)
+        executar_revogacao_total(conn, username, itens, "mysql")
+        logger.info("Revogação total MySQL concluída com sucesso")
+
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro durante revogação MySQL: {e}")
         raise
 
+def carregar_dados(caminho_yaml):
+    """Carrega e valida o estado anterior (YAML) do arquivo deletado."""
+    with open(caminho_yaml, 'r', encoding='utf-8') as arquivo:
+        dados = safe_load(arquivo)
+
+    validar_yaml(dados)
+    return dados
+
+def obter_porta(dados):
+    """Retorna a porta do banco, usando o padrão do engine quando ausente."""
+    return int(dados.get('port', 3306 if dados['engine'].lower() == 'mysql' else 5432))
+
+def conectar(engine, host, port, user, password, database):
+    """Abre conexão com o banco de acordo com o engine (com o tempo de conexão e das instruções medido)."""
+    if engine in ['postgres', 'postgresql', 'aurora']:
+        return MEDIDOR.medir_conexao(host, database, conectar_postgres, host, port, user, password, database)
+    elif engine == 'mysql':
+        return MEDIDOR.medir_conexao(host, database, conectar_mysql, host, port, user, password, database)
+    raise ValueError(f"Engine não suportado: {engine}")
+
+def revogar_dados(conn, dados):
+    """Revoga todas as permissões de um YAML já carregado usando uma conexão aberta."""
+    engine = dados['engine'].lower()
+    if engine in ['postgres', 'postgresql', 'aurora']:
+        revogar_todas_permissoes_postgres(conn, dados['user'], dados['schemas'])
+    elif engine == 'mysql':
+        revogar_todas_permissoes_mysql(conn, dados['user'], dados['database'], dados['schemas'])
+    else:
+        raise ValueError(f"Engine não suportado: {engine}")
+
 def revogar_todas_permissoes(caminho_yaml):
     """Revoga todas as permissões de um usuário baseado no arquivo YAML."""
     try:
         logger.info(f"Iniciando revogação total baseada em: {caminho_yaml}")
         
-        with open(caminho_yaml, 'r', encoding='utf-8') as arquivo:
-            dados = yaml.safe_load(arquivo)
-        
-        validar_yaml(dados)
+        dados = carregar_dados(caminho_yaml)
         
         host = dados['host']
-        port = dados.get('port', 3306 if dados['engine'].lower() == 'mysql' else 5432)
+        port = obter_porta(dados)
         database = dados['database']
         engine = dados['engine'].lower()
         username = dados['user']
-        schemas = dados['schemas']
         
         db_user = os.environ.get('DB_USER')
         db_pass = os.environ.get('DB_PASS')
         db_host = os.environ.get('DB_HOST', host)
         
         if not db_user or not db_pass:
-            raise ValueError("Credenciais de banco não fornecidas via variáveis de ambiente")
+            db_user, db_pass = obter_credenciais(database, dados['engine'])
         
         logger.info(f"Conectando ao {engine} em {db_host}:{port}")
         logger.info(f"Revogando permissões do usuário: {username}")
         
-        if engine in ['postgres', 'postgresql', 'aurora']:
-            conn = conectar_postgres(db_host, port, db_user, db_pass, database)
-            revogar_todas_permissoes_postgres(conn, username, schemas)
-        elif engine == 'mysql':
-            conn = conectar_mysql(db_host, port, db_user, db_pass, database)
-            revogar_todas_permissoes_mysql(conn, username, database, schemas)
-        else:
-            raise ValueError(f"Engine não suportado: {engine}")
+        conn = conectar(engine, db_host, port, db_user, db_pass, database)
+        revogar_dados(conn, dados)
         
         conn.close()
         logger.info(f"Revogação total concluída com sucesso para usuário: {username}")
@@ -251,11 +418,14 @@ def main():
         sys.exit(1)
     
     try:
-        revogar_todas_permissoes(caminho_yaml)
+        with MEDIDOR.contexto(arquivo=caminho_yaml):
+            revogar_todas_permissoes(caminho_yaml)
         logger.info("Script executado com sucesso!")
     except Exception as e:
         logger.error(f"Erro fatal: {e}")
         sys.exit(1)
+    finally:
+        finalizar()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
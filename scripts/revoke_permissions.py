@@ -3,6 +3,12 @@ import sys
 import yaml
 import logging
 
+from credenciais import obter_credenciais
+from grant_diff import diff_schemas
+from medicao import MEDIDOR, finalizar
+from plano_sql import descrever_plano, emitir_plano
+from yaml_io import safe_load
+
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -69,264 +75,199 @@ def conectar_mysql(host, port, user, password, database):
         logger.error(f"Erro ao conectar MySQL: {e}")
         raise
 
-def normalizar_schema_para_comparacao(schema):
-    """Normaliza schema para comparação (converte granular para estrutura uniforme)."""
-    if "tipo" in schema and schema["tipo"] == "granular":
-        # Granular - criar mapa de tabela -> permissões
-        tabelas_map = {}
-        for tabela in schema.get("tabelas", []):
-            tabelas_map[tabela["nome"]] = set(tabela["permissions"])
-        return {
-            "nome": schema["nome"],
-            "tipo": "granular",
-            "tabelas": tabelas_map
-        }
-    else:
-        # Simples - manter como está
-        return {
-            "nome": schema["nome"],
-            "tipo": "simples",
-            "permissions": set(schema["permissions"])
-        }
-
 def calcular_permissoes_revogadas(antes, depois):
     """Calcula quais permissões devem ser revogadas (suporta formato granular)."""
-    # Normalizar schemas para comparação
-    antes_map = {}
-    for schema in antes:
-        nome = schema["nome"]
-        antes_map[nome] = normalizar_schema_para_comparacao(schema)
-    
-    depois_map = {}
-    for schema in depois:
-        nome = schema["nome"]
-        depois_map[nome] = normalizar_schema_para_comparacao(schema)
-
-    revogadas = []
-    
-    for schema_nome, schema_antes in antes_map.items():
-        schema_depois = depois_map.get(schema_nome)
-        
-        if not schema_depois:
-            # Schema foi completamente removido - revogar tudo
-            if schema_antes["tipo"] == "granular":
-                tabelas_revogadas = []
-                for tabela_nome, perms in schema_antes["tabelas"].items():
-                    tabelas_revogadas.append({
-                        "nome": tabela_nome,
-                        "permissions": sorted(list(perms))
-                    })
-                revogadas.append({
-                    "nome": schema_nome,
-                    "tipo": "granular",
-                    "tabelas": tabelas_revogadas
-                })
-            else:
-                revogadas.append({
-                    "nome": schema_nome,
-                    "permissions": sorted(list(schema_antes["permissions"]))
-                })
+    return diff_schemas(antes, depois)[0]
+
+def calcular_permissoes_concedidas(antes, depois):
+    """Calcula quais permissões devem ser concedidas (simétrico a calcular_permissoes_revogadas)."""
+    return diff_schemas(antes, depois)[1]
+
+def _instrucao_revogacao(escopo, schema, objeto, permissao, sql):
+    """Instrução REVOKE no formato das instruções de plano_sql."""
+    return {"escopo": escopo, "schema": schema, "objetos": [objeto], "privilegios": [permissao], "sql": sql}
+
+def _revogacao_postgres(username, schema_nome, tabela, permissao, dbname):
+    """Instrução REVOKE PostgreSQL de uma permissão (None se a permissão não se aplica).
+
+    Permissões de tabela são revogadas da tabela (granular) ou de todas as
+    tabelas do schema (simples); as demais, das funções, do schema ou do banco.
+    """
+    if permissao in PG_TABLE_PERMS or permissao == "ALL PRIVILEGES":
+        if tabela is not None:
+            return _instrucao_revogacao("tabela", schema_nome, tabela, permissao,
+                                        f'REVOKE {permissao} ON {schema_nome}.{tabela} FROM "{username}";')
+        return _instrucao_revogacao("todas_tabelas", schema_nome, None, permissao,
+                                    f'REVOKE {permissao} ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";')
+    if permissao in PG_FUNCTION_PERMS:
+        return _instrucao_revogacao("funcoes", schema_nome, None, permissao,
+                                    f'REVOKE {permissao} ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";')
+    if permissao in PG_SCHEMA_PERMS:
+        return _instrucao_revogacao("schema", schema_nome, None, permissao,
+                                    f'REVOKE {permissao} ON SCHEMA {schema_nome} FROM "{username}";')
+    if permissao in PG_DB_PERMS:
+        return _instrucao_revogacao("database", None, None, permissao,
+                                    f'REVOKE {permissao} ON DATABASE {dbname} FROM "{username}";')
+    return None
+
+def compilar_revogacoes_postgres(username, schemas, dbname):
+    """Compila os REVOKEs PostgreSQL na ordem de execução (uma instrução por permissão)."""
+    instrucoes = []
+    for schema in schemas:
+        if "tipo" in schema and schema["tipo"] == "granular":
+            alvos = [(tabela["nome"], tabela["permissions"]) for tabela in schema["tabelas"]]
         else:
-            # Schema ainda existe - calcular diferenças
-            if schema_antes["tipo"] == "granular" and schema_depois["tipo"] == "granular":
-                # Ambos granulares - comparar tabela por tabela
-                tabelas_revogadas = []
-                
-                for tabela_nome, perms_antes in schema_antes["tabelas"].items():
-                    perms_depois = schema_depois["tabelas"].get(tabela_nome, set())
-                    diferenca = perms_antes - perms_depois
-                    
-                    if diferenca:
-                        tabelas_revogadas.append({
-                            "nome": tabela_nome,
-                            "permissions": sorted(list(diferenca))
-                        })
-                
-                if tabelas_revogadas:
-                    revogadas.append({
-                        "nome": schema_nome,
-                        "tipo": "granular",
-                        "tabelas": tabelas_revogadas
-                    })
-                    
-            elif schema_antes["tipo"] == "simples" and schema_depois["tipo"] == "simples":
-                # Ambos simples - comparar permissões
-                diferenca = schema_antes["permissions"] - schema_depois["permissions"]
-                if diferenca:
-                    revogadas.append({
-                        "nome": schema_nome,
-                        "permissions": sorted(list(diferenca))
-                    })
-            else:
-                # Tipos diferentes - revogar tudo do anterior (conversão de formato)
-                logger.warning(f"Conversão de formato detectada para schema {schema_nome} - revogando permissões anteriores")
-                if schema_antes["tipo"] == "granular":
-                    tabelas_revogadas = []
-                    for tabela_nome, perms in schema_antes["tabelas"].items():
-                        tabelas_revogadas.append({
-                            "nome": tabela_nome,
-                            "permissions": sorted(list(perms))
-                        })
-                    revogadas.append({
-                        "nome": schema_nome,
-                        "tipo": "granular",
-                        "tabelas": tabelas_revogadas
-                    })
-                else:
-                    revogadas.append({
-                        "nome": schema_nome,
-                        "permissions": sorted(list(schema_antes["permissions"]))
-                    })
-    
-    return revogadas
-
-def revogar_permissoes_postgres_granular(conn, username, schema_nome, tabelas):
-    """Revoga permissões PostgreSQL granulares (por tabela)."""
-    with conn.cursor() as cur:
-        for tabela in tabelas:
-            nome_tabela = tabela["nome"]
-            logger.info(f"Revogando permissões da tabela: {schema_nome}.{nome_tabela}")
-            
-            for permissao in tabela["permissions"]:
+            alvos = [(None, schema["permissions"])]
+
+        for tabela, permissoes in alvos:
+            for permissao in permissoes:
+                instrucao = _revogacao_postgres(username, schema["nome"], tabela, permissao.upper(), dbname)
+                if instrucao:
+                    instrucoes.append(instrucao)
+    return instrucoes
+
+def compilar_revogacoes_mysql(username, database, schemas):
+    """Compila os REVOKEs MySQL na ordem de execução (uma instrução por permissão e tabela).
+
+    No formato simples o nome do schema é usado como tabela do banco.
+    """
+    instrucoes = []
+    for schema in schemas:
+        if "tipo" in schema and schema["tipo"] == "granular":
+            alvos = [(tabela["nome"], tabela["permissions"]) for tabela in schema["tabelas"]]
+        else:
+            alvos = [(schema["nome"], schema["permissions"])]
+
+        for tabela, permissoes in alvos:
+            for permissao in permissoes:
                 permissao_upper = permissao.upper()
-                
-                if permissao_upper in PG_TABLE_PERMS or permissao_upper == "ALL PRIVILEGES":
-                    cur.execute(f'REVOKE {permissao_upper} ON {schema_nome}.{nome_tabela} FROM "{username}";')
-                else:
-                    # Para permissões que não se aplicam a tabelas específicas, revogar do schema
-                    if permissao_upper in PG_FUNCTION_PERMS:
-                        cur.execute(f'REVOKE {permissao_upper} ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";')
-                    elif permissao_upper in PG_SCHEMA_PERMS:
-                        cur.execute(f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";')
-                    elif permissao_upper in PG_DB_PERMS:
-                        cur.execute(f'REVOKE {permissao_upper} ON DATABASE {conn.get_dsn_parameters()["dbname"]} FROM "{username}";')
-                
-                logger.info(f"Revogada permissão {permissao_upper} da tabela {schema_nome}.{nome_tabela}")
-
-def revogar_permissoes_postgres_simples(conn, username, schema_nome, permissions):
-    """Revoga permissões PostgreSQL simples (schema completo)."""
+                instrucoes.append(_instrucao_revogacao(
+                    "tabela", database, tabela, permissao_upper,
+                    f"REVOKE {permissao_upper} ON `{database}`.`{tabela}` FROM '{username}'@'%';"
+                ))
+    return instrucoes
+
+def executar_revogacoes(conn, instrucoes):
+    """Executa os REVOKEs um a um (uma ida e volta por instrução)."""
     with conn.cursor() as cur:
-        for permissao in permissions:
-            permissao_upper = permissao.upper()
-            
-            if permissao_upper in PG_TABLE_PERMS or permissao_upper == "ALL PRIVILEGES":
-                cur.execute(f'REVOKE {permissao_upper} ON ALL TABLES IN SCHEMA {schema_nome} FROM "{username}";')
-            elif permissao_upper in PG_FUNCTION_PERMS:
-                cur.execute(f'REVOKE {permissao_upper} ON ALL FUNCTIONS IN SCHEMA {schema_nome} FROM "{username}";')
-            elif permissao_upper in PG_SCHEMA_PERMS:
-                cur.execute(f'REVOKE {permissao_upper} ON SCHEMA {schema_nome} FROM "{username}";')
-            elif permissao_upper in PG_DB_PERMS:
-                cur.execute(f'REVOKE {permissao_upper} ON DATABASE {conn.get_dsn_parameters()["dbname"]} FROM "{username}";')
-            
-            logger.info(f"Revogada permissão {permissao_upper} do schema {schema_nome}")
+        for instrucao in instrucoes:
+            cur.execute(instrucao["sql"])
+            logger.info(f"Revogada permissão {instrucao['privilegios'][0]}: {instrucao['sql']}")
 
 def revogar_permissoes_postgres(conn, username, schemas):
     """Revoga permissões PostgreSQL (suporta formato granular e simples)."""
     try:
-        with conn.cursor() as cur:
-            for schema in schemas:
-                schema_nome = schema["nome"]
-                logger.info(f"Revogando permissões do schema: {schema_nome}")
-                
-                # Verificar se é granular ou simples
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    revogar_permissoes_postgres_granular(conn, username, schema_nome, schema["tabelas"])
-                else:
-                    revogar_permissoes_postgres_simples(conn, username, schema_nome, schema["permissions"])
-            
-            conn.commit()
-            logger.info("Transação de revogação commitada com sucesso")
-            
+        dbname = conn.get_dsn_parameters()["dbname"]
+        for schema in schemas:
+            logger.info(f"Revogando permissões do schema: {schema['nome']}")
+            with MEDIDOR.contexto(schema=schema["nome"]):
+                executar_revogacoes(conn, compilar_revogacoes_postgres(username, [schema], dbname))
+
+        conn.commit()
+        logger.info("Transação de revogação commitada com sucesso")
+
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro ao revogar permissões PostgreSQL: {e}")
         raise
 
-def revogar_permissoes_mysql_granular(conn, username, database, schema_nome, tabelas):
-    """Revoga permissões MySQL granulares (por tabela)."""
-    with conn.cursor() as cur:
-        for tabela in tabelas:
-            nome_tabela = tabela["nome"]
-            logger.info(f"Revogando permissões da tabela: {database}.{nome_tabela}")
-            
-            for permissao in tabela["permissions"]:
-                cur.execute(f'REVOKE {permissao.upper()} ON `{database}`.`{nome_tabela}` FROM \'{username}\'@\'%\';')
-                logger.info(f"Revogada permissão {permissao.upper()} da tabela {database}.{nome_tabela}")
-
-def revogar_permissoes_mysql_simples(conn, username, database, schema_nome, permissions):
-    """Revoga permissões MySQL simples (schema completo)."""
-    with conn.cursor() as cur:
-        for permissao in permissions:
-            cur.execute(f'REVOKE {permissao.upper()} ON `{database}`.`{schema_nome}` FROM \'{username}\'@\'%\';')
-            logger.info(f"Revogada permissão {permissao.upper()} do schema {schema_nome}")
-
 def revogar_permissoes_mysql(conn, username, database, schemas):
     """Revoga permissões MySQL (suporta formato granular e simples)."""
     try:
-        with conn.cursor() as cur:
-            for schema in schemas:
-                schema_nome = schema["nome"]
-                logger.info(f"Revogando permissões do schema: {schema_nome}")
-                
-                # Verificar se é granular ou simples
-                if "tipo" in schema and schema["tipo"] == "granular":
-                    revogar_permissoes_mysql_granular(conn, username, database, schema_nome, schema["tabelas"])
-                else:
-                    revogar_permissoes_mysql_simples(conn, username, database, schema_nome, schema["permissions"])
-            
-            conn.commit()
-            logger.info("Transação de revogação commitada com sucesso")
-            
+        for schema in schemas:
+            logger.info(f"Revogando permissões do schema: {schema['nome']}")
+            with MEDIDOR.contexto(schema=schema["nome"]):
+                executar_revogacoes(conn, compilar_revogacoes_mysql(username, database, [schema]))
+
+        conn.commit()
+        logger.info("Transação de revogação commitada com sucesso")
+
     except Exception as e:
         conn.rollback()
         logger.error(f"Erro ao revogar permissões MySQL: {e}")
         raise
 
+def carregar_revogacao(caminho_yaml_antes, caminho_yaml_depois):
+    """Carrega e valida os dois estados do arquivo e calcula os schemas a revogar.
+
+    Retorna (dados_antes, revogar_schemas); sem schemas no arquivo atual
+    (vazio) a revogação é total.
+    """
+    # Carregar arquivo anterior
+    with open(caminho_yaml_antes, 'r', encoding='utf-8') as arquivo:
+        dados_antes = safe_load(arquivo)
+
+    # Carregar arquivo atual (pode estar vazio para revogação total)
+    with open(caminho_yaml_depois, 'r', encoding='utf-8') as arquivo:
+        dados_depois = safe_load(arquivo) or {}
+
+    # Validar dados
+    validar_yaml(dados_antes)
+    if "schemas" in dados_depois:
+        validar_yaml(dados_depois)
+
+    engine = dados_antes["engine"].lower()
+    if engine not in ENGINES_VALIDOS:
+        raise ValueError(f"Engine não suportado: {engine}")
+
+    # Calcular permissões a serem revogadas
+    if "schemas" not in dados_depois:
+        # Revogação total
+        revogar_schemas = dados_antes["schemas"]
+        logger.info("Revogação total - removendo todas as permissões")
+    else:
+        # Revogação parcial
+        revogar_schemas = calcular_permissoes_revogadas(dados_antes["schemas"], dados_depois["schemas"])
+        logger.info("Revogação parcial - removendo permissões específicas")
+
+    return dados_antes, revogar_schemas
+
+def planejar_revogacao(caminho_yaml_antes, caminho_yaml_depois):
+    """Compila os REVOKEs entre os dois estados sem conectar ao banco (modo --plan).
+
+    Retorna a descrição do plano (plano_sql.descrever_plano) com as
+    instruções na ordem exata de execução.
+    """
+    dados_antes, revogar_schemas = carregar_revogacao(caminho_yaml_antes, caminho_yaml_depois)
+    engine = dados_antes["engine"].lower()
+    port = int(dados_antes.get("port", 5432 if "postgres" in engine else 3306))
+
+    if "postgres" in engine:
+        instrucoes = compilar_revogacoes_postgres(dados_antes["user"], revogar_schemas, dados_antes["database"])
+    elif "mysql" in engine:
+        instrucoes = compilar_revogacoes_mysql(dados_antes["user"], dados_antes["database"], revogar_schemas)
+    else:
+        raise ValueError(f"Engine não suportado: {engine}")
+
+    # Sem nada a revogar a execução termina antes de conectar
+    idas_e_voltas = {"revogacoes": len(instrucoes), "commit": 1} if revogar_schemas else {}
+    agrupamento = {
+        "permissoes_revogadas": len(instrucoes),
+        "instrucoes": len(instrucoes),
+        "envio": "uma ida e volta por instrução, commit único ao final"
+    }
+    return descrever_plano("revogar", dados_antes, port, instrucoes, idas_e_voltas, agrupamento)
+
 def revogar_permissoes(caminho_yaml_antes, caminho_yaml_depois):
     """Função principal para revogar permissões."""
     try:
         logger.info(f"Iniciando revogação de permissões: {caminho_yaml_antes} -> {caminho_yaml_depois}")
-        
-        # Carregar arquivo anterior
-        with open(caminho_yaml_antes, 'r', encoding='utf-8') as arquivo:
-            dados_antes = yaml.safe_load(arquivo)
 
-        # Carregar arquivo atual (pode estar vazio para revogação total)
-        with open(caminho_yaml_depois, 'r', encoding='utf-8') as arquivo:
-            dados_depois = yaml.safe_load(arquivo) or {}
-
-        # Validar dados
-        validar_yaml(dados_antes)
-        if "schemas" in dados_depois:
-            validar_yaml(dados_depois)
+        dados_antes, revogar_schemas = carregar_revogacao(caminho_yaml_antes, caminho_yaml_depois)
 
         # Extrair informações do arquivo anterior
         engine = dados_antes["engine"].lower()
-        if engine not in ENGINES_VALIDOS:
-            raise ValueError(f"Engine não suportado: {engine}")
-
         host = dados_antes["host"]
         dbname = dados_antes["database"]
-        region = dados_antes["region"]
         target_user = dados_antes["user"]
         port = int(dados_antes.get("port", 5432 if "postgres" in engine else 3306))
         
-        # Obter credenciais das variáveis de ambiente
+        # Obter credenciais das variáveis de ambiente ou do Parameter Store
         user = os.environ.get("DB_USER")
         password = os.environ.get("DB_PASS")
         
         if not user or not password:
-            raise ValueError("Variáveis DB_USER e DB_PASS devem estar definidas")
-
-        # Calcular permissões a serem revogadas
-        if "schemas" not in dados_depois:
-            # Revogação total
-            revogar_schemas = dados_antes["schemas"]
-            logger.info("Revogação total - removendo todas as permissões")
-        else:
-            # Revogação parcial
-            revogar_schemas = calcular_permissoes_revogadas(dados_antes["schemas"], dados_depois["schemas"])
-            logger.info("Revogação parcial - removendo permissões específicas")
+            user, password = obter_credenciais(dbname, dados_antes["engine"])
 
         if not revogar_schemas:
             logger.info("Nenhuma permissão a ser revogada.")
@@ -338,10 +279,10 @@ def revogar_permissoes(caminho_yaml_antes, caminho_yaml_depois):
         conn = None
         try:
             if "postgres" in engine:
-                conn = conectar_postgres(host, port, user, password, dbname)
+                conn = MEDIDOR.medir_conexao(host, dbname, conectar_postgres, host, port, user, password, dbname)
                 revogar_permissoes_postgres(conn, target_user, revogar_schemas)
             elif "mysql" in engine:
-                conn = conectar_mysql(host, port, user, password, dbname)
+                conn = MEDIDOR.medir_conexao(host, dbname, conectar_mysql, host, port, user, password, dbname)
                 revogar_permissoes_mysql(conn, target_user, dbname, revogar_schemas)
             else:
                 raise ValueError(f"Engine não suportado: {engine}")
@@ -383,8 +324,21 @@ def revogar_permissoes(caminho_yaml_antes, caminho_yaml_depois):
         sys.exit(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Uso: python revoke_permissions.py <caminho_yaml_antes> <caminho_yaml_depois>")
+    argumentos = [arg for arg in sys.argv[1:] if arg != "--plan"]
+    if len(argumentos) != 2:
+        print("Uso: python revoke_permissions.py [--plan] <caminho_yaml_antes> <caminho_yaml_depois>")
         sys.exit(1)
-    
-    revogar_permissoes(sys.argv[1], sys.argv[2])
\ No newline at end of file
+
+    if "--plan" in sys.argv[1:]:
+        # Apenas compila e imprime o plano em JSON, sem conectar ao banco
+        try:
+            emitir_plano(planejar_revogacao(argumentos[0], argumentos[1]))
+        except (OSError, yaml.YAMLError, ValueError, KeyError) as e:
+            logger.error(f"Erro ao compilar o plano: {e}")
+            sys.exit(1)
+    else:
+        try:
+            with MEDIDOR.contexto(arquivo=argumentos[1]):
+                revogar_permissoes(argumentos[0], argumentos[1])
+        finally:
+            finalizar()
\ No newline at end of file
@@ -86,7 +86,7 @@ def validar_scripts_python():
         print(f"[WARN] Diretório {scripts_dir} não encontrado")
         return problemas
     
-    target_scripts = ['apply_permissions.py', 'revoke_permissions.py', 'merge_permissions.py']
+    target_scripts = ['apply_permissions.py', 'revoke_permissions.py', 'merge_permissions.py', 'batch_permissions.py', 'credenciais.py', 'reconcile_permissions.py']
     
     for script_name in target_scripts:
         script_file = scripts_dir / script_name
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Cache de Leitura de YAML - Database Access Control
+Mantém em um arquivo SQLite o conteúdo já interpretado dos arquivos de
+users-access-requests, para que arquivos inalterados não sejam relidos
+pelo PyYAML a cada geração de relatório
+"""
+
+import os
+import sys
+import sqlite3
+import hashlib
+
+from yaml_io import safe_load, to_json, from_json
+
+# Alterar quando o formato do registro armazenado mudar (invalida o cache)
+CACHE_VERSION = "2"
+
+DEFAULT_CACHE_PATH = ".yaml-cache.sqlite"
+
+class YamlParseCache:
+    """Cache persistente de arquivos YAML interpretados.
+
+    Cada arquivo é identificado pelo caminho; enquanto mtime e tamanho não
+    mudam o registro é servido sem abrir o arquivo. Se mudarem (ex.: novo
+    checkout), o hash blake2b do conteúdo decide se é preciso interpretar o
+    YAML novamente.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.environ.get("YAML_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(self.cache_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._prepare()
+
+    def _prepare(self):
+        """Cria as tabelas e descarta o conteúdo de versões anteriores do cache."""
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                record BLOB NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_digest ON files (digest)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not row or row[0] != CACHE_VERSION:
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (CACHE_VERSION,))
+            self.conn.commit()
+
+    def load(self, file_path):
+        """Retorna o conteúdo interpretado do arquivo YAML, usando o cache quando válido."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, digest, record FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            try:
+                data = from_json(row[3])
+            except ValueError:
+                row = None
+            else:
+                self.hits += 1
+                return data
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+
+        # Mesmo conteúdo (neste ou em outro caminho) já interpretado: só atualizar a chave
+        if row and row[2] == digest:
+            record = row[3]
+        else:
+            found = self.conn.execute("SELECT record FROM files WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            record = found[0] if found else None
+
+        if record is not None:
+            try:
+                data = from_json(record)
+                self.hits += 1
+            except ValueError:
+                record = None
+        if record is None:
+            self.misses += 1
+            data = safe_load(content.decode('utf-8'))
+            record = to_json(data)
+            # Sem representação exata em JSON: interpretar de novo na próxima leitura
+            if record is None:
+                return data
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest, record) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_mtime_ns, stat.st_size, digest, record)
+        )
+        return data
+
+    def prune(self, base_path):
+        """Remove do cache os arquivos sob base_path que não existem mais."""
+        prefix = os.path.join(os.path.abspath(base_path), "")
+        paths = [row[0] for row in self.conn.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))]
+        removed = [(path,) for path in paths if not os.path.exists(path)]
+        self.conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        return len(removed)
+
+    def close(self):
+        """Grava as alterações pendentes e fecha o arquivo do cache."""
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_yaml(file_path, cache=None):
+    """Interpreta um arquivo YAML, usando o cache quando informado."""
+    if cache is not None:
+        return cache.load(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return safe_load(f)
+
+def open_cache(enabled=True):
+    """Abre o cache padrão; retorna None se desativado ou se o arquivo não puder ser usado."""
+    if not enabled or os.environ.get("YAML_CACHE", "1") == "0":
+        return None
+    try:
+        return YamlParseCache()
+    except sqlite3.Error as e:
+        print(f"⚠️ Cache de YAML indisponível, interpretando todos os arquivos: {e}", file=sys.stderr)
+        return None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Leitura e Escrita de YAML - Database Access Control
+Usa o libyaml (CSafeLoader/CSafeDumper) quando disponível, com fallback para
+a implementação em Python puro, mantendo a saída idêntica byte a byte à de
+yaml.dump(default_flow_style=False, allow_unicode=True, sort_keys=False)
+"""
+
+import json
+import datetime
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader as Loader, SafeDumper as Dumper
+    LIBYAML = False
+
+DUMP_OPTIONS = {
+    "default_flow_style": False,
+    "allow_unicode": True,
+    "sort_keys": False
+}
+
+SCALAR_TYPES = (bool, int, float, datetime.date, type(None))
+
+def safe_load(stream):
+    """Equivalente a yaml.safe_load, usando o libyaml quando disponível."""
+    return yaml.load(stream, Loader=Loader)
+
+def load_file(file_path):
+    """Lê e interpreta um arquivo YAML (UTF-8)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return safe_load(f)
+
+def _emits_identically(data):
+    """Indica se o emissor do libyaml produz a mesma saída que o emissor Python.
+
+    Os dois divergem apenas em strings que exigem aspas duplas com escapes
+    (caracteres não imprimíveis, quebras de linha Unicode) e em caracteres
+    fora do plano básico; tipos fora do YAML seguro também ficam com o
+    emissor Python.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if not item.isprintable() or (item and max(item) > '￿'):
+                return False
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif not isinstance(item, SCALAR_TYPES):
+            return False
+    return True
+
+def dump(data, stream=None):
+    """Serializa no formato dos arquivos do repositório (blocos, Unicode, ordem original).
+
+    Retorna a string quando stream não é informado.
+    """
+    if LIBYAML and _emits_identically(data):
+        return yaml.dump(data, stream, Dumper=Dumper, **DUMP_OPTIONS)
+    return yaml.dump(data, stream, **DUMP_OPTIONS)
+
+def json_default(value):
+    """default de json.dump para os dados interpretados: datas viram objetos marcados."""
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"tipo não suportado em JSON: {type(value).__name__}")
+
+def json_object_hook(obj):
+    """object_hook de json.load que restaura as datas marcadas por json_default."""
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return datetime.date.fromisoformat(obj["__date__"])
+    return obj
+
+def to_json(data):
+    """Serializa dados interpretados do YAML em JSON; None se não forem representáveis sem perda."""
+    try:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default)
+    except (TypeError, ValueError):
+        return None
+    # Chaves não-string (ex.: inteiros) viram strings no JSON: não serializar
+    return text if from_json(text) == data else None
+
+def from_json(text):
+    """Inverso de to_json."""
+    return json.loads(text, object_hook=json_object_hook)
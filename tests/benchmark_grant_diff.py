@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Diferença de Permissões - Database Access Control
+Compara o tempo de grant_diff (máscaras de bits) com o das implementações
+anteriores com conjuntos de strings (referencia_grant_diff) em schemas com
+dezenas de milhares de tabelas (a equivalência dos resultados é verificada
+por test_grant_diff.py)
+"""
+
+import os
+import gc
+import sys
+import copy
+import time
+import random
+import logging
+import argparse
+
+# Executado como script: os módulos de scripts/ e as referências destes testes no caminho de importação
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import referencia_grant_diff as referencia
+from grant_diff import diff_schemas
+from grant_model import PRIVILEGE_NAMES, UserAccess, schemas_by_name
+from merge_permissions import add_or_update_permissions
+
+PRIVILEGES = sorted(PRIVILEGE_NAMES.values())
+
+# Geração de dados
+
+def large_schemas(rng, total_tables, schemas=5, change_rate=0.0, base=None):
+    """Schemas granulares com total_tables tabelas; com base, altera uma fração change_rate das tabelas."""
+    if base is not None:
+        result = copy.deepcopy(base)
+        for schema in result:
+            for tabela in schema["tabelas"]:
+                if rng.random() < change_rate:
+                    tabela["permissions"] = rng.sample(PRIVILEGES, rng.randint(1, 4))
+        return result
+    per_schema = total_tables // schemas
+    return [
+        {"nome": f"schema_{s}", "tipo": "granular", "tabelas": [
+            {"nome": f"tabela_{t}", "permissions": rng.sample(PRIVILEGES, rng.randint(1, 4))}
+            for t in range(per_schema)
+        ]}
+        for s in range(schemas)
+    ]
+
+def timed(label, func, baseline=None, setup=lambda: (), repeat=5):
+    """Melhor tempo de func(*setup()) em repeat execuções (setup fora da medição); imprime e retorna (resultado, segundos)."""
+    elapsed = None
+    for _ in range(repeat):
+        args = setup()
+        # Como timeit: sem o coletor de lixo durante a medição
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = func(*args)
+            duration = time.perf_counter() - start
+        finally:
+            gc.enable()
+        elapsed = duration if elapsed is None else min(elapsed, duration)
+    speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<28} {elapsed:8.3f}s{speedup}")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de grant_diff (máscaras de bits x conjuntos)")
+    parser.add_argument("--tables", type=int, default=50000, help="Tabelas no benchmark (padrão: 50000)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos dados aleatórios (padrão: 42)")
+    args = parser.parse_args()
+
+    # Os logs por schema/tabela do merge distorceriam a medição
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    antes = large_schemas(rng, args.tables)
+    depois = large_schemas(rng, args.tables, change_rate=0.1, base=antes)
+
+    print(f"⏱️ Diferença entre schemas com {args.tables} tabela(s) (10% alteradas):")
+    _, baseline = timed("conjuntos (revogar+conceder)",
+                        lambda: (referencia.calcular_permissoes_revogadas(antes, depois),
+                                 referencia.calcular_permissoes_concedidas(antes, depois)))
+    timed("grant_diff.diff_schemas", lambda: diff_schemas(antes, depois), baseline)
+
+    print(f"⏱️ Merge de {args.tables} tabela(s):")
+    # O merge altera o arquivo no lugar: cada execução recebe uma cópia nova (o modelo, já lido do arquivo)
+    def setup():
+        return {"schemas": copy.deepcopy(antes)}, copy.deepcopy(depois)
+    def setup_model():
+        return UserAccess(schemas=schemas_by_name(antes)), schemas_by_name(depois)
+    _, baseline = timed("conjuntos", referencia.add_or_update_permissions, setup=setup)
+    timed("grant_diff.merge_schemas", add_or_update_permissions, baseline, setup=setup_model)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Memória do Modelo de Permissões - Database Access Control
+Compara a memória de um arquivo de permissões com muitas tabelas lido como
+dicionários do YAML (yaml_io.load_file) e lido no modelo com __slots__ e
+máscaras de bits (grant_model.load_user_access), medida com tracemalloc
+"""
+
+import os
+import gc
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+# Executado como script: os módulos de scripts/ no caminho de importação
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from grant_model import PRIVILEGE_NAMES, load_user_access
+from yaml_io import load_file, dump
+
+PRIVILEGES = sorted(PRIVILEGE_NAMES.values())
+
+def build_document(rng, total_tables, schemas=20):
+    """Arquivo de permissões com total_tables tabelas em schemas granulares."""
+    per_schema = total_tables // schemas
+    return {
+        "host": "vendas.production.rds.amazonaws.com",
+        "user": "analista@empresa.com",
+        "database": "vendas",
+        "engine": "postgres",
+        "region": "us-east-1",
+        "port": 5432,
+        "schemas": [
+            {"nome": f"schema_{s}", "tipo": "granular", "tabelas": [
+                {"nome": f"tabela_{t}", "permissions": sorted(rng.sample(PRIVILEGES, rng.randint(1, 4)))}
+                for t in range(per_schema)
+            ]}
+            for s in range(schemas)
+        ]
+    }
+
+def measured(label, func, baseline=None):
+    """Executa func com tracemalloc; imprime a memória retida pelo resultado e o pico, e retorna (resultado, bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    reduction = f" ({baseline / current:.1f}x menor)" if baseline else ""
+    print(f"  {label:<30} {current / 2**20:8.1f} MiB retidos, pico {peak / 2**20:8.1f} MiB, {elapsed:6.2f}s{reduction}")
+    return result, current
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória de grant_model (dicionários x __slots__)")
+    parser.add_argument("--tables", type=int, default=100000, help="Tabelas no arquivo (padrão: 100000)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos dados aleatórios (padrão: 42)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "analista@empresa.com.yml")
+        with open(path, 'w', encoding='utf-8') as f:
+            dump(build_document(rng, args.tables), f)
+
+        print(f"🧠 Arquivo com {args.tables} tabela(s) ({os.path.getsize(path) / 2**20:.1f} MiB em disco):")
+        data, baseline = measured("dicionários (yaml_io.load_file)", lambda: load_file(path))
+        del data
+        access, _ = measured("modelo (load_user_access)", lambda: load_user_access(path), baseline)
+
+        tables = sum(len(schema.tables) for schema in access.schemas.values())
+        print(f"  {tables} TableGrant(s) em {len(access.schemas)} SchemaGrant(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Configuração dos testes - Database Access Control
+Os scripts são módulos soltos em scripts/ (importados pelo nome, como nos
+workflows); os testes os importam da mesma forma
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
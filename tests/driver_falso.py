@@ -0,0 +1,166 @@
+"""
+Driver Falso - Database Access Control
+Driver em memória com a interface de drivers.DriverSincrono, para testar o
+lote, a aplicação e as revogações sem banco: cada banco registra as
+instruções recebidas, na ordem, e pode simular erros do engine
+"""
+
+import re
+import time
+
+from drivers import tipo_engine
+
+class ErroFalso(Exception):
+    """Erro do driver falso, com o código de erro do engine (pgcode ou número do MySQL)."""
+
+    def __init__(self, codigo, mensagem="erro simulado"):
+        if isinstance(codigo, int):
+            # Como no pymysql: args[0] é o número do erro
+            super().__init__(codigo, mensagem)
+            self.pgcode = None
+        else:
+            super().__init__(mensagem)
+            self.pgcode = codigo
+
+# SET LOCAL de uma configuração própria (nome com ponto), como o marcador de execucao.py
+_SET_LOCAL = re.compile(r"SET LOCAL (\w+\.\w+) = '([^']*)';")
+
+class BancoFalso:
+    """Estado de um banco do driver falso: instruções executadas, commits e rollbacks.
+
+    falhas mapeia um trecho de SQL para o erro e quantas vezes ele ocorre
+    (-1 = sempre); linhas(sql, parametros) devolve as linhas das consultas.
+    Os SET LOCAL de configurações próprias (nome com ponto) valem até o
+    commit ou rollback e são lidos por current_setting.
+    """
+
+    def __init__(self, engine, host, dbname, falhas=None, linhas=None, latencia=0.0):
+        self.engine = engine
+        self.host = host
+        self.dbname = dbname
+        self.falhas = {trecho: list(falha) for trecho, falha in (falhas or {}).items()}
+        self.linhas = linhas or (lambda sql, parametros: [])
+        self.latencia = latencia
+        self.registro = []
+        self.configuracoes = {}
+
+    def executar(self, sql):
+        """Registra uma instrução, levantando o erro configurado para ela."""
+        for trecho, falha in self.falhas.items():
+            erro, vezes = falha
+            if trecho in sql and vezes != 0:
+                falha[1] = vezes - 1
+                self.registro.append(f"ERRO {sql}")
+                raise ErroFalso(erro)
+        self.registro.append(sql)
+        configuracao = _SET_LOCAL.match(sql)
+        if configuracao:
+            self.configuracoes[configuracao.group(1)] = configuracao.group(2)
+
+    def consultar(self, sql, parametros):
+        """Linhas de uma consulta: current_setting das configurações ou as de linhas()."""
+        if sql.startswith("SELECT current_setting("):
+            return [(self.configuracoes[nome],) for nome in parametros.values()]
+        return self.linhas(sql, parametros)
+
+    def finalizar(self, nome):
+        """Registra o fim da transação (COMMIT ou ROLLBACK), descartando os SET LOCAL."""
+        self.registro.append(nome)
+        self.configuracoes.clear()
+
+    def instrucoes(self, sql, parametros):
+        """Instruções de um execute: uma por linha sem parâmetros (plano), a consulta inteira com."""
+        if parametros is not None:
+            return [sql]
+        return [linha for linha in sql.split("\n") if linha.strip()]
+
+class CursorFalso:
+    """Cursor DB-API do driver falso."""
+
+    def __init__(self, banco):
+        self._banco = banco
+        self._pendentes = []
+        self._linhas = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return None
+
+    def execute(self, sql, parametros=None):
+        time.sleep(self._banco.latencia)
+        instrucoes = self._banco.instrucoes(sql, parametros)
+        self._linhas = self._banco.consultar(sql, parametros) if parametros is not None else []
+        if self._banco.engine == "mysql":
+            # Como no MULTI_STATEMENTS: uma instrução por resultado (nextset)
+            self._pendentes = instrucoes[1:]
+            self._banco.executar(instrucoes[0])
+        else:
+            for instrucao in instrucoes:
+                self._banco.executar(instrucao)
+
+    def nextset(self):
+        if not self._pendentes:
+            return None
+        self._banco.executar(self._pendentes.pop(0))
+        return True
+
+    def fetchall(self):
+        return self._linhas
+
+class _Info:
+    def __init__(self, dbname):
+        self.dbname = dbname
+
+class ConexaoFalsa:
+    """Conexão DB-API do driver falso (com info.dbname e get_dsn_parameters do psycopg2)."""
+
+    def __init__(self, banco):
+        self.banco = banco
+        self.info = _Info(banco.dbname)
+
+    def get_dsn_parameters(self):
+        return {"dbname": self.banco.dbname, "host": self.banco.host}
+
+    def cursor(self):
+        return CursorFalso(self.banco)
+
+    def commit(self):
+        self.banco.finalizar("COMMIT")
+
+    def rollback(self):
+        self.banco.finalizar("ROLLBACK")
+
+    def close(self):
+        self.banco.registro.append("CLOSE")
+
+class DriverFalso:
+    """Driver em memória no lugar de DriverSincrono.
+
+    Cada banco (engine, host, porta, banco) guarda em registro tudo o que
+    foi executado, na ordem, com COMMIT/ROLLBACK/CLOSE. falhas e linhas são
+    repassados a cada BancoFalso; latencia simula o tempo de cada execute.
+    """
+
+    def __init__(self, falhas=None, linhas=None, latencia=0.0):
+        self.falhas = falhas
+        self.linhas = linhas
+        self.latencia = latencia
+        self.bancos = {}
+
+    def _banco(self, engine, host, port, dbname):
+        tipo = tipo_engine(engine)
+        chave = (tipo, host, port, dbname)
+        if chave not in self.bancos:
+            self.bancos[chave] = BancoFalso(tipo, host, dbname, self.falhas, self.linhas, self.latencia)
+        return self.bancos[chave]
+
+    def conectar(self, engine, host, port, user, password, dbname):
+        banco = self._banco(engine, host, port, dbname)
+        time.sleep(banco.latencia)
+        return ConexaoFalsa(banco)
+
+    def registros(self):
+        """Registro de cada banco, por (engine, host, porta, banco)."""
+        return {chave: list(banco.registro) for chave, banco in self.bancos.items()}
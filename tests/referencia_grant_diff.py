@@ -0,0 +1,241 @@
+"""
+Implementações de Referência do Diff de Permissões - Database Access Control
+Cópia congelada das funções de revogação e merge com conjuntos de strings,
+como estavam em revoke_permissions.py e merge_permissions.py antes das
+máscaras de bits de grant_diff (commit anterior ao que criou grant_model.py).
+Não devem ser alteradas: são o comportamento que grant_diff precisa manter
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# revoke_permissions.py
+
+def normalizar_schema_para_comparacao(schema):
+    """Normaliza schema para comparação (converte granular para estrutura uniforme)."""
+    if "tipo" in schema and schema["tipo"] == "granular":
+        # Granular - criar mapa de tabela -> permissões
+        tabelas_map = {}
+        for tabela in schema.get("tabelas", []):
+            tabelas_map[tabela["nome"]] = set(tabela["permissions"])
+        return {
+            "nome": schema["nome"],
+            "tipo": "granular",
+            "tabelas": tabelas_map
+        }
+    else:
+        # Simples - manter como está
+        return {
+            "nome": schema["nome"],
+            "tipo": "simples",
+            "permissions": set(schema["permissions"])
+        }
+
+def calcular_permissoes_revogadas(antes, depois):
+    """Calcula quais permissões devem ser revogadas (suporta formato granular)."""
+    # Normalizar schemas para comparação
+    antes_map = {}
+    for schema in antes:
+        nome = schema["nome"]
+        antes_map[nome] = normalizar_schema_para_comparacao(schema)
+
+    depois_map = {}
+    for schema in depois:
+        nome = schema["nome"]
+        depois_map[nome] = normalizar_schema_para_comparacao(schema)
+
+    revogadas = []
+
+    for schema_nome, schema_antes in antes_map.items():
+        schema_depois = depois_map.get(schema_nome)
+
+        if not schema_depois:
+            # Schema foi completamente removido - revogar tudo
+            if schema_antes["tipo"] == "granular":
+                tabelas_revogadas = []
+                for tabela_nome, perms in schema_antes["tabelas"].items():
+                    tabelas_revogadas.append({
+                        "nome": tabela_nome,
+                        "permissions": sorted(list(perms))
+                    })
+                revogadas.append({
+                    "nome": schema_nome,
+                    "tipo": "granular",
+                    "tabelas": tabelas_revogadas
+                })
+            else:
+                revogadas.append({
+                    "nome": schema_nome,
+                    "permissions": sorted(list(schema_antes["permissions"]))
+                })
+        else:
+            # Schema ainda existe - calcular diferenças
+            if schema_antes["tipo"] == "granular" and schema_depois["tipo"] == "granular":
+                # Ambos granulares - comparar tabela por tabela
+                tabelas_revogadas = []
+
+                for tabela_nome, perms_antes in schema_antes["tabelas"].items():
+                    perms_depois = schema_depois["tabelas"].get(tabela_nome, set())
+                    diferenca = perms_antes - perms_depois
+
+                    if diferenca:
+                        tabelas_revogadas.append({
+                            "nome": tabela_nome,
+                            "permissions": sorted(list(diferenca))
+                        })
+
+                if tabelas_revogadas:
+                    revogadas.append({
+                        "nome": schema_nome,
+                        "tipo": "granular",
+                        "tabelas": tabelas_revogadas
+                    })
+
+            elif schema_antes["tipo"] == "simples" and schema_depois["tipo"] == "simples":
+                # Ambos simples - comparar permissões
+                diferenca = schema_antes["permissions"] - schema_depois["permissions"]
+                if diferenca:
+                    revogadas.append({
+                        "nome": schema_nome,
+                        "permissions": sorted(list(diferenca))
+                    })
+            else:
+                # Tipos diferentes - revogar tudo do anterior (conversão de formato)
+                logger.warning(f"Conversão de formato detectada para schema {schema_nome} - revogando permissões anteriores")
+                if schema_antes["tipo"] == "granular":
+                    tabelas_revogadas = []
+                    for tabela_nome, perms in schema_antes["tabelas"].items():
+                        tabelas_revogadas.append({
+                            "nome": tabela_nome,
+                            "permissions": sorted(list(perms))
+                        })
+                    revogadas.append({
+                        "nome": schema_nome,
+                        "tipo": "granular",
+                        "tabelas": tabelas_revogadas
+                    })
+                else:
+                    revogadas.append({
+                        "nome": schema_nome,
+                        "permissions": sorted(list(schema_antes["permissions"]))
+                    })
+
+    return revogadas
+
+def calcular_permissoes_concedidas(antes, depois):
+    """Calcula quais permissões devem ser concedidas (simétrico a calcular_permissoes_revogadas)."""
+    return calcular_permissoes_revogadas(depois, antes)
+
+# merge_permissions.py
+
+def add_or_update_permissions(data, new_permissions):
+    """Adiciona ou atualiza permissões nos dados existentes."""
+    if "schemas" not in data:
+        data["schemas"] = []
+
+    existing_schemas = {schema["nome"]: schema for schema in data["schemas"]}
+
+    for new_schema in new_permissions:
+        schema_name = new_schema["nome"]
+
+        if schema_name in existing_schemas:
+            # Atualizar schema existente
+            existing_schema = existing_schemas[schema_name]
+
+            if "tipo" in new_schema and new_schema["tipo"] == "granular":
+                # Novo schema é granular
+                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
+                    # Ambos granulares - merge tabelas
+                    existing_tables = {t["nome"]: t for t in existing_schema.get("tabelas", [])}
+
+                    for new_table in new_schema["tabelas"]:
+                        table_name = new_table["nome"]
+                        if table_name in existing_tables:
+                            # Merge permissões da tabela
+                            existing_perms = set(existing_tables[table_name]["permissions"])
+                            new_perms = set(new_table["permissions"])
+                            existing_tables[table_name]["permissions"] = sorted(list(existing_perms | new_perms))
+                            logger.info(f"🔄 Atualizadas permissões da tabela {table_name}")
+                        else:
+                            # Nova tabela
+                            existing_tables[table_name] = new_table
+                            logger.info(f"➕ Nova tabela adicionada: {table_name}")
+
+                    existing_schema["tabelas"] = list(existing_tables.values())
+                else:
+                    # Existente simples, novo granular - substituir
+                    existing_schemas[schema_name] = new_schema
+                    logger.info(f"🔄 Schema {schema_name} convertido para granular")
+            else:
+                # Novo schema é simples
+                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
+                    # Manter granular
+                    logger.warning(f"⚠️ Mantendo formato granular para schema: {schema_name}")
+                else:
+                    # Ambos simples - merge permissões
+                    existing_perms = set(existing_schema.get("permissions", []))
+                    new_perms = set(new_schema["permissions"])
+                    existing_schema["permissions"] = sorted(list(existing_perms | new_perms))
+                    logger.info(f"🔄 Atualizadas permissões do schema {schema_name}")
+        else:
+            # Novo schema
+            existing_schemas[schema_name] = new_schema
+            logger.info(f"➕ Novo schema adicionado: {schema_name}")
+
+    # Atualizar dados
+    data["schemas"] = list(existing_schemas.values())
+
+def remove_specific_permissions(data, permissions_to_remove):
+    """Remove permissões específicas dos dados existentes."""
+    if "schemas" not in data:
+        return
+
+    existing_schemas = {schema["nome"]: schema for schema in data["schemas"]}
+
+    for schema_to_remove in permissions_to_remove:
+        schema_name = schema_to_remove["nome"]
+
+        if schema_name in existing_schemas:
+            existing_schema = existing_schemas[schema_name]
+
+            if "tipo" in schema_to_remove and schema_to_remove["tipo"] == "granular":
+                # Remover permissões granulares
+                if "tipo" in existing_schema and existing_schema["tipo"] == "granular":
+                    existing_tables = {t["nome"]: t for t in existing_schema.get("tabelas", [])}
+
+                    for table_to_remove in schema_to_remove["tabelas"]:
+                        table_name = table_to_remove["nome"]
+                        if table_name in existing_tables:
+                            existing_perms = set(existing_tables[table_name]["permissions"])
+                            perms_to_remove = set(table_to_remove["permissions"])
+                            remaining_perms = existing_perms - perms_to_remove
+
+                            if remaining_perms:
+                                existing_tables[table_name]["permissions"] = sorted(list(remaining_perms))
+                                logger.info(f"➖ Removidas permissões da tabela {table_name}")
+                            else:
+                                del existing_tables[table_name]
+                                logger.info(f"🗑️ Tabela {table_name} removida (sem permissões)")
+
+                    if existing_tables:
+                        existing_schema["tabelas"] = list(existing_tables.values())
+                    else:
+                        del existing_schemas[schema_name]
+                        logger.info(f"🗑️ Schema {schema_name} removido (sem tabelas)")
+            else:
+                # Remover permissões simples
+                if "tipo" not in existing_schema or existing_schema["tipo"] != "granular":
+                    existing_perms = set(existing_schema.get("permissions", []))
+                    perms_to_remove = set(schema_to_remove["permissions"])
+                    remaining_perms = existing_perms - perms_to_remove
+
+                    if remaining_perms:
+                        existing_schema["permissions"] = sorted(list(remaining_perms))
+                        logger.info(f"➖ Removidas permissões do schema {schema_name}")
+                    else:
+                        del existing_schemas[schema_name]
+                        logger.info(f"🗑️ Schema {schema_name} removido (sem permissões)")
+
+    # Atualizar dados
+    data["schemas"] = list(existing_schemas.values())
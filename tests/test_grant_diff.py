@@ -0,0 +1,151 @@
+"""
+Testes de Equivalência do grant_diff - Database Access Control
+Propriedades verificadas em listas de schemas geradas com semente fixa: as
+funções atuais de revogação e merge (modelo de grant_model) dão o mesmo
+resultado que as implementações com conjuntos de strings de antes
+(referencia_grant_diff), inclusive com nomes em minúsculas, duplicados e
+variações de ALL, e schemas e tabelas repetidos no mesmo arquivo. No merge,
+o modelo guarda a última ocorrência de cada schema/tabela e os privilégios
+sem repetição, em ordem alfabética: a referência é comparada com as
+entradas e a saída normalizadas da mesma forma
+"""
+
+import copy
+import random
+import logging
+
+import pytest
+
+import referencia_grant_diff as referencia
+from grant_model import PRIVILEGE_NAMES, UserAccess, schemas_by_name
+from merge_permissions import add_or_update_permissions, remove_specific_permissions
+from revoke_permissions import calcular_permissoes_revogadas, calcular_permissoes_concedidas
+
+PRIVILEGES = sorted(PRIVILEGE_NAMES.values())
+
+# Nomes fora da forma canônica, aceitos pelos arquivos e pelos conjuntos de antes
+NOMES_VARIANTES = [name.lower() for name in PRIVILEGES[:6]] + ["ALL", "all", "all privileges", "All Privileges"]
+
+SEMENTES = range(40)
+CASOS_POR_SEMENTE = 250
+
+@pytest.fixture(autouse=True)
+def sem_logs():
+    # Os logs por schema/tabela do merge poluiriam a saída
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+def nomes_aleatorios(rng, maximo):
+    """Lista de privilégios com repetições e, às vezes, nomes fora da forma canônica."""
+    universo = PRIVILEGES + NOMES_VARIANTES if rng.random() < 0.5 else PRIVILEGES
+    return rng.choices(universo, k=rng.randint(0, maximo))
+
+def schemas_aleatorios(rng, schemas=4, tabelas=6):
+    """Lista de schemas aleatória (nomes de um conjunto pequeno, para haver sobreposição e repetição)."""
+    resultado = []
+    for _ in range(rng.randint(0, schemas)):
+        nome = f"schema_{rng.randrange(schemas * 2)}"
+        if rng.random() < 0.5:
+            resultado.append({"nome": nome, "tipo": "granular", "tabelas": [
+                {"nome": f"tabela_{rng.randrange(tabelas * 2)}", "permissions": nomes_aleatorios(rng, 4)}
+                for _ in range(rng.randint(0, tabelas))
+            ]})
+        else:
+            resultado.append({"nome": nome, "permissions": nomes_aleatorios(rng, 5)})
+    return resultado
+
+def pares(semente):
+    """Pares (antes, depois) aleatórios da semente."""
+    rng = random.Random(semente)
+    return [(schemas_aleatorios(rng), schemas_aleatorios(rng)) for _ in range(CASOS_POR_SEMENTE)]
+
+def aplicar(funcao, antes, depois):
+    """Executa um merge/remoção do modelo; retorna os schemas resultantes no formato do YAML."""
+    dados = UserAccess(schemas=schemas_by_name(antes))
+    funcao(dados, schemas_by_name(depois))
+    return dados.get("schemas")
+
+def aplicar_referencia(funcao, antes, depois):
+    """Executa o merge/remoção de referência em cópias das entradas sem repetições; retorna os schemas normalizados."""
+    dados = {"schemas": copy.deepcopy(sem_repeticoes(antes))}
+    funcao(dados, copy.deepcopy(sem_repeticoes(depois)))
+    return [normalizado(schema) for schema in dados["schemas"]]
+
+def tipo(schema):
+    return schema.get("tipo", "simples")
+
+def sem_repeticoes(schemas):
+    """Última ocorrência de cada schema e tabela, na posição da primeira (como o modelo lê o arquivo)."""
+    resultado = {}
+    for schema in schemas:
+        if tipo(schema) == "granular":
+            tabelas = {tabela["nome"]: tabela for tabela in schema["tabelas"]}
+            schema = dict(schema, tabelas=list(tabelas.values()))
+        resultado[schema["nome"]] = schema
+    return list(resultado.values())
+
+def normalizado(schema):
+    """Schema com os privilégios sem repetição e em ordem alfabética."""
+    if tipo(schema) == "granular":
+        return dict(schema, tabelas=[dict(tabela, permissions=sorted(set(tabela["permissions"]))) for tabela in schema["tabelas"]])
+    return dict(schema, permissions=sorted(set(schema["permissions"])))
+
+def unicos(schemas):
+    """Última ocorrência de cada schema e tabela, sem privilégios vazios (como o arquivo é lido)."""
+    resultado = {}
+    for schema in schemas:
+        if tipo(schema) == "granular":
+            tabelas = {tabela["nome"]: tabela for tabela in schema["tabelas"] if tabela["permissions"]}
+            if tabelas:
+                resultado[schema["nome"]] = dict(schema, tabelas=list(tabelas.values()))
+            else:
+                resultado.pop(schema["nome"], None)
+        elif schema["permissions"]:
+            resultado[schema["nome"]] = schema
+        else:
+            resultado.pop(schema["nome"], None)
+    return list(resultado.values())
+
+def conjuntos(schemas):
+    """Schemas como {(schema, tabela): conjunto de privilégios}, para comparar sem a ordem."""
+    resultado = {}
+    for schema in schemas:
+        if tipo(schema) == "granular":
+            for tabela in schema["tabelas"]:
+                resultado[(schema["nome"], tabela["nome"])] = set(tabela["permissions"])
+        else:
+            resultado[(schema["nome"], None)] = set(schema["permissions"])
+    return {chave: privilegios for chave, privilegios in resultado.items() if privilegios}
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_revogar_igual_a_referencia(semente):
+    for antes, depois in pares(semente):
+        assert calcular_permissoes_revogadas(antes, depois) == referencia.calcular_permissoes_revogadas(antes, depois), (antes, depois)
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_conceder_igual_a_referencia(semente):
+    for antes, depois in pares(semente):
+        assert calcular_permissoes_concedidas(antes, depois) == referencia.calcular_permissoes_concedidas(antes, depois), (antes, depois)
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_merge_igual_a_referencia(semente):
+    for antes, depois in pares(semente):
+        assert aplicar(add_or_update_permissions, antes, depois) == aplicar_referencia(referencia.add_or_update_permissions, antes, depois), (antes, depois)
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_remocao_igual_a_referencia(semente):
+    for antes, depois in pares(semente):
+        assert aplicar(remove_specific_permissions, antes, depois) == aplicar_referencia(referencia.remove_specific_permissions, antes, depois), (antes, depois)
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_revogar_e_conceder_levam_de_antes_a_depois(semente):
+    # Sem repetições nem conversão de formato, remover o revogado e somar o concedido dá o estado de depois
+    for antes, depois in pares(semente):
+        antes, depois = unicos(antes), unicos(depois)
+        if any(tipo(schema) != tipo(outro) for schema in antes for outro in depois if schema["nome"] == outro["nome"]):
+            continue
+        dados = UserAccess(schemas=schemas_by_name(antes))
+        remove_specific_permissions(dados, schemas_by_name(calcular_permissoes_revogadas(antes, depois)))
+        add_or_update_permissions(dados, schemas_by_name(calcular_permissoes_concedidas(antes, depois)))
+        assert conjuntos(dados.get("schemas")) == conjuntos(depois), (antes, depois)
@@ -0,0 +1,71 @@
+"""
+Testes do Modelo de Permissões - Database Access Control
+Leitura e escrita dos arquivos pelo modelo (UserAccess, SchemaGrant,
+TableGrant): arquivo sem alterações volta idêntico, campos fora do formato
+são preservados e repetições colapsam na última ocorrência
+"""
+
+import json
+import pickle
+
+from grant_model import UserAccess, SchemaGrant, TableGrant, load_user_access, dump_user_access, json_default
+from yaml_io import dump
+
+ARQUIVO = {
+    "usuario": {"email": "ana@empresa.com", "departamento": "Financeiro"},
+    "host": "vendas.rds.amazonaws.com",
+    "user": "ana@empresa.com",
+    "database": "vendas",
+    "engine": "postgres",
+    "region": "us-east-1",
+    "port": 5432,
+    "schemas": [
+        {"nome": "public", "permissions": ["SELECT", "USAGE"]},
+        {"nome": "vendas", "tipo": "granular", "tabelas": [
+            {"nome": "pedidos", "permissions": ["INSERT", "SELECT"]},
+            {"nome": "clientes", "permissions": ["SELECT"]}
+        ]},
+        {"nome": "legado", "permissions": ["SELECT"], "tables": ["a", "b"]}
+    ],
+    "solicitacao": {"ticket": "ACC-1234"}
+}
+
+def test_arquivo_sem_alteracoes_volta_identico(tmp_path):
+    caminho = tmp_path / "ana@empresa.com.yml"
+    caminho.write_text(dump(ARQUIVO), encoding="utf-8")
+
+    access = load_user_access(str(caminho))
+
+    assert dump_user_access(access) == caminho.read_text(encoding="utf-8")
+    assert access.get("usuario") == ARQUIVO["usuario"]
+    assert access.get("metadata", {}) == {}
+
+def test_repeticoes_ficam_com_a_ultima_ocorrencia():
+    access = UserAccess.from_dict({"schemas": [
+        {"nome": "public", "permissions": ["SELECT"]},
+        {"nome": "vendas", "tipo": "granular", "tabelas": [
+            {"nome": "pedidos", "permissions": ["SELECT"]},
+            {"nome": "clientes", "permissions": ["SELECT"]},
+            {"nome": "pedidos", "permissions": ["UPDATE", "INSERT", "UPDATE"]}
+        ]},
+        {"nome": "public", "permissions": ["USAGE"]}
+    ]})
+
+    assert access.get("schemas") == [
+        {"nome": "public", "permissions": ["USAGE"]},
+        {"nome": "vendas", "tipo": "granular", "tabelas": [
+            {"nome": "pedidos", "permissions": ["INSERT", "UPDATE"]},
+            {"nome": "clientes", "permissions": ["SELECT"]}
+        ]}
+    ]
+
+def test_novo_arquivo_e_json_e_pickle():
+    access = UserAccess(host="h", user="u@empresa.com", port=5432, schemas={
+        "vendas": SchemaGrant("vendas", granular=True, tables={"pedidos": TableGrant("pedidos", 1)})
+    })
+
+    assert list(access.to_dict()) == ["host", "user", "port", "schemas"]
+    assert json.loads(json.dumps(access, default=json_default)) == access.to_dict()
+    copia = pickle.loads(pickle.dumps(access))
+    assert copia.schemas == access.schemas
+    assert copia.to_dict() == access.to_dict()
@@ -0,0 +1,159 @@
+"""
+Testes do Lote - Database Access Control
+Executa batch_permissions.processar_lote com o driver falso: aplicações,
+reconciliações e revogações totais em vários hosts, com locks ocupados e
+erros definitivos
+"""
+
+import logging
+
+import pytest
+import yaml
+
+import execucao
+from batch_permissions import OPERACAO_APLICAR, OPERACAO_REVOGAR_TUDO, agrupar_por_banco, processar_lote
+from driver_falso import DriverFalso
+
+HOSTS = 3
+
+# Lock ocupado duas vezes na mesma instrução de um lote PostgreSQL (retomada a partir dela)
+TRECHO_RETOMADA = 'ON vendas.pedidos TO "ana_0@empresa.com"'
+
+# Locks ocupados e um erro definitivo, para exercitar novas tentativas e falhas
+FALHAS = {
+    TRECHO_RETOMADA: ("55P03", 2),
+    "ON `loja`.`produtos` TO 'bruno_1@empresa.com'": (1205, 1),
+    'ON rh.folha TO "carla_2@empresa.com"': ("42501", -1),
+}
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    """As novas tentativas não esperam e os logs por instrução ficam de fora."""
+    monkeypatch.setattr(execucao, "ESPERA_BASE", 0.0)
+    monkeypatch.setattr(execucao, "ESPERA_MAXIMA", 0.0)
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+def resolver_credenciais(database, engine):
+    return "owner", "senha-de-teste"
+
+def escrever_yaml(diretorio, nome, dados):
+    caminho = diretorio / nome
+    caminho.write_text(yaml.safe_dump(dados, allow_unicode=True, sort_keys=False), encoding="utf-8")
+    return str(caminho)
+
+@pytest.fixture
+def entradas(tmp_path):
+    """Entradas de um lote com PostgreSQL e MySQL em vários hosts."""
+    entradas = []
+    for indice in range(HOSTS):
+        pg_host = f"pg-{indice}.rds.amazonaws.com"
+        my_host = f"mysql-{indice}.rds.amazonaws.com"
+
+        for numero, usuario in enumerate(["ana", "bruno", "carla"]):
+            dados = {
+                "host": pg_host, "user": f"{usuario}_{numero}@empresa.com", "database": "vendas",
+                "engine": "postgres", "region": "us-east-1", "port": 5432,
+                "schemas": [
+                    {"nome": "public", "permissions": ["SELECT", "USAGE"]},
+                    {"nome": "vendas", "tipo": "granular", "tabelas": [
+                        {"nome": "pedidos", "permissions": ["SELECT", "INSERT"]},
+                        {"nome": "clientes", "permissions": ["SELECT"]}
+                    ]},
+                    {"nome": "rh", "tipo": "granular", "tabelas": [{"nome": "folha", "permissions": ["SELECT"]}]}
+                ]
+            }
+            atual = escrever_yaml(tmp_path, f"pg-{indice}-{usuario}.yml", dados)
+            antes = None
+            if usuario == "bruno":
+                # Mesmo usuário e banco: reconciliação
+                anterior = dict(dados, schemas=[{"nome": "public", "permissions": ["SELECT", "INSERT"]}])
+                antes = escrever_yaml(tmp_path, f"pg-{indice}-{usuario}-antes.yml", anterior)
+            entradas.append({"arquivo": atual, "antes": antes, "operacao": OPERACAO_APLICAR})
+
+            dados_mysql = {
+                "host": my_host, "user": f"{usuario}_{numero}@empresa.com", "database": "loja",
+                "engine": "mysql", "region": "us-east-1", "port": 3306,
+                "schemas": [
+                    {"nome": "loja", "tipo": "granular", "tabelas": [
+                        {"nome": "produtos", "permissions": ["SELECT", "UPDATE"]},
+                        {"nome": "estoque", "permissions": ["SELECT"]}
+                    ]}
+                ]
+            }
+            entradas.append({
+                "arquivo": escrever_yaml(tmp_path, f"mysql-{indice}-{usuario}.yml", dados_mysql),
+                "antes": None, "operacao": OPERACAO_APLICAR
+            })
+
+        removido = {
+            "host": pg_host.upper(), "user": "desligado@empresa.com", "database": "vendas",
+            "engine": "aurora", "region": "us-east-1", "port": 5432,
+            "schemas": [
+                {"nome": "public", "permissions": ["ALL PRIVILEGES"]},
+                {"nome": "vendas", "tipo": "granular", "tabelas": [{"nome": "pedidos", "permissions": ["SELECT", "TRIGGER"]}]}
+            ]
+        }
+        entradas.insert(0, {
+            "arquivo": escrever_yaml(tmp_path, f"pg-{indice}-desligado.yml", removido),
+            "antes": None, "operacao": OPERACAO_REVOGAR_TUDO
+        })
+    return entradas
+
+def executar(entradas, diff=False, max_workers=8, max_por_host=2, falhas=FALHAS):
+    """Executa o lote com o driver falso; retorna (resultados, registros por banco)."""
+    driver = DriverFalso(falhas=falhas)
+    resultados = processar_lote(entradas, resolver_credenciais, diff, max_workers, max_por_host, driver)
+    return resultados, driver.registros()
+
+def test_um_grupo_por_banco_com_a_revogacao_primeiro(entradas):
+    # aurora (revogação total, host em maiúsculas) e postgres no mesmo banco formam um único grupo
+    grupos, falhas = agrupar_por_banco(entradas)
+
+    assert not falhas
+    assert len(grupos) == HOSTS * 2
+    for chave, itens in grupos.items():
+        if chave[0] == "postgres":
+            assert itens[0]["entrada"]["operacao"] == OPERACAO_REVOGAR_TUDO
+
+@pytest.mark.parametrize("diff", [False, True])
+def test_resultados_por_arquivo(entradas, diff):
+    resultados, registros = executar(entradas, diff)
+
+    assert [resultado["indice"] for resultado in resultados] == list(range(len(entradas)))
+    falhos = [resultado["arquivo"] for resultado in resultados if not resultado["sucesso"]]
+    # Só o erro definitivo (42501) falha; os locks ocupados são tentados de novo
+    assert sorted(falhos) == sorted(entrada["arquivo"] for entrada in entradas if entrada["arquivo"].endswith("-carla.yml")
+                                    and "/pg-" in entrada["arquivo"])
+    assert len(registros) == HOSTS * 2
+    assert all(registro[-1] == "CLOSE" for registro in registros.values())
+
+@pytest.mark.parametrize("diff", [False, True])
+def test_instrucoes_nao_dependem_do_paralelismo(entradas, diff):
+    # Os arquivos de um banco seguem sempre a ordem das entradas, com qualquer número de threads
+    serial = executar(entradas, diff, max_workers=1, max_por_host=1)
+    paralelo = executar(entradas, diff, max_workers=len(entradas), max_por_host=2)
+
+    assert serial == paralelo
+
+def test_lote_postgres_retomado_da_instrucao_que_falhou(entradas):
+    _, registros = executar(entradas)
+
+    retomados = [registro for registro in registros.values() if any(TRECHO_RETOMADA in sql for sql in registro)]
+    assert len(retomados) == HOSTS
+    for registro in retomados:
+        erros = [indice for indice, sql in enumerate(registro) if sql.startswith("ERRO") and TRECHO_RETOMADA in sql]
+        assert len(erros) == 2
+        # Na segunda falha o envio continua da instrução que falhou: a anterior a ela só é repetida uma vez
+        assert registro.count(registro[erros[0] - 1]) == 2
+        assert any(sql.endswith(TRECHO_RETOMADA + ";") for sql in registro)
+
+def test_lock_mysql_tentado_de_novo(entradas):
+    _, registros = executar(entradas)
+
+    trecho = "ON `loja`.`produtos` TO 'bruno_1@empresa.com'"
+    for chave, registro in registros.items():
+        if chave[0] == "mysql":
+            assert sum(1 for sql in registro if sql.startswith("ERRO") and trecho in sql) == 1
+            assert any(trecho in sql and not sql.startswith("ERRO") for sql in registro)
@@ -0,0 +1,123 @@
+"""
+Testes da Revogação Total - Database Access Control
+Revogação total a partir do catálogo (PostgreSQL: REVOKE ALL ... IN SCHEMA e
+REASSIGN/DROP OWNED; MySQL: SHOW GRANTS e um único REVOKE ALL) com o driver
+falso, comparada com a reprodução do YAML, e os caminhos alternativos
+(catálogo indisponível, usuário inexistente, DROP OWNED ou DROP ROLE negados)
+"""
+
+import logging
+
+import pytest
+
+from catalogo import CONSULTA_PRIVILEGIOS_ROLE_POSTGRES, CONSULTA_GRANTS_MYSQL
+from driver_falso import DriverFalso
+from revoke_all_permissions import revogar_dados
+
+USUARIO = "desligado@empresa.com"
+SCHEMAS = 3
+TABELAS = 50
+
+# Por engine: consulta do catálogo, instrução de remoção e erro de permissão negada na consulta
+ENGINES = {
+    "postgres": ("aclexplode", "DROP ROLE", ("42501", -1)),
+    "mysql": ("SHOW GRANTS", "DROP USER", (1142, -1)),
+}
+
+@pytest.fixture(autouse=True)
+def sem_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+def montar_dados(engine):
+    """YAML de um usuário com SELECT e INSERT em muitas tabelas de cada schema."""
+    return {
+        "host": f"{engine}-0.rds.amazonaws.com", "user": USUARIO, "database": "vendas",
+        "engine": engine, "region": "us-east-1", "port": 3306 if engine == "mysql" else 5432,
+        "schemas": [
+            {"nome": f"schema_{indice}", "tipo": "granular", "tabelas": [
+                {"nome": f"tabela_{numero}", "permissions": ["SELECT", "INSERT"]} for numero in range(TABELAS)
+            ]}
+            for indice in range(SCHEMAS)
+        ] + [{"nome": "public", "permissions": ["USAGE"]}]
+    }
+
+def linhas_catalogo(dados):
+    """Linhas que o catálogo devolve para o usuário do YAML (mais um grant feito fora dele)."""
+    def linhas(sql, parametros):
+        if sql == CONSULTA_PRIVILEGIOS_ROLE_POSTGRES:
+            resultado = [("role", None), ("schema", "public"), ("funcao", "relatorios"), ("banco", None)]
+            return resultado + [("tabela", schema["nome"]) for schema in dados["schemas"] if schema.get("tipo") == "granular"]
+        if sql == CONSULTA_GRANTS_MYSQL:
+            return [
+                (f"GRANT USAGE ON *.* TO `{USUARIO}`@`%`",),
+                (f"GRANT SELECT, INSERT ON `vendas`.* TO `{USUARIO}`@`%`",),
+                (f"GRANT EXECUTE ON `relatorios`.* TO `{USUARIO}`@`%`",)
+            ]
+        return []
+    return linhas
+
+def executar(dados, falhas=None, linhas=None):
+    """Revoga tudo do YAML em uma conexão do driver falso; retorna o registro do banco."""
+    driver = DriverFalso(falhas=falhas, linhas=linhas)
+    revogar_dados(driver.conectar(dados["engine"], dados["host"], dados["port"], "owner", "senha-de-teste", dados["database"]), dados)
+    registro, = driver.registros().values()
+    return registro
+
+def remove_e_confirma(registro, remocao):
+    """A remoção do usuário foi executada e a transação confirmada ao final."""
+    return any(sql.startswith(remocao) for sql in registro) and registro[-1] == "COMMIT"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_catalogo_remove_o_usuario_com_poucas_instrucoes(engine):
+    consulta, remocao, negado = ENGINES[engine]
+    dados = montar_dados(engine)
+    linhas = linhas_catalogo(dados)
+
+    catalogo = executar(dados, linhas=linhas)
+    # Catálogo indisponível (permissão negada): mesma revogação do YAML de antes
+    replay = executar(dados, falhas={consulta: negado}, linhas=linhas)
+
+    assert remove_e_confirma(catalogo, remocao)
+    assert remove_e_confirma(replay, remocao)
+    assert len(replay) > SCHEMAS * TABELAS
+    assert len(catalogo) < SCHEMAS * 10
+
+def test_mysql_um_unico_revoke():
+    dados = montar_dados("mysql")
+
+    catalogo = executar(dados, linhas=linhas_catalogo(dados))
+
+    assert sum(1 for sql in catalogo if sql.startswith("REVOKE")) == 1
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_usuario_inexistente_so_executa_a_remocao(engine):
+    consulta, remocao, _ = ENGINES[engine]
+    # Sem linhas o role não existe; no MySQL, SHOW GRANTS falha com ER_NONEXISTING_GRANT
+    falhas = None if engine == "postgres" else {consulta: (1141, -1)}
+
+    inexistente = executar(montar_dados(engine), falhas=falhas)
+
+    assert remove_e_confirma(inexistente, remocao)
+    assert not any(sql.startswith("REVOKE") for sql in inexistente)
+
+def test_drop_owned_negado_volta_ao_savepoint():
+    dados = montar_dados("postgres")
+
+    negado = executar(dados, falhas={"DROP OWNED": ("42501", -1)}, linhas=linhas_catalogo(dados))
+
+    posicao = next(indice for indice, sql in enumerate(negado) if sql.startswith("ERRO DROP OWNED"))
+    assert negado[posicao + 1].startswith("ROLLBACK TO SAVEPOINT")
+    assert remove_e_confirma(negado, "DROP ROLE")
+
+def test_drop_role_recusado_confirma_as_revogacoes():
+    # DROP ROLE recusado (ex.: o role possui objetos em outro banco): as revogações ainda são confirmadas
+    dados = montar_dados("postgres")
+
+    recusado = executar(dados, falhas={"DROP ROLE": ("2BP01", -1)}, linhas=linhas_catalogo(dados))
+
+    posicao = next(indice for indice, sql in enumerate(recusado) if sql.startswith("ERRO DROP ROLE"))
+    assert recusado[posicao + 1].startswith("ROLLBACK TO SAVEPOINT")
+    assert recusado[-1] == "COMMIT"
+    assert any(sql.startswith("REVOKE") for sql in recusado[:posicao])